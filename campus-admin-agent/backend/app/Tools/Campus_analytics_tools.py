@@ -1,12 +1,10 @@
 # Import required dependencies
 from dotenv import load_dotenv
-from sqlalchemy import func, desc, or_
-from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field, EmailStr, validator
-from backend.db import Student, ActivityLog, SessionLocal
+from ..models.models import SessionLocal
+from ..services import service
+from ..services.query_spec import run_query, QueryTimeout
 import logging
-import re
 import uuid
 
 # Try to import function_tool, with fallback to handle import errors
@@ -18,23 +16,13 @@ except ImportError as e:
 
 # Import from pydentic_model.py
 from ..utils.pydentic_model import (
-    RecentStudentsRequest, 
-    ApiResponse, 
-    student_to_response, 
-    get_pkt_time
+    QuerySpec,
+    ApiResponse
 )
+from ..utils.compaction import resolve_fields, to_columns, page_size, encode_cursor, decode_cursor
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('campus_analytics_tools.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -47,20 +35,12 @@ async def get_total_students() -> Dict[str, Any]:
     request_id = str(uuid.uuid4())
     try:
         logger.info(f"Agent request {request_id}: Getting total student count")
-        with SessionLocal() as db:
-            total = db.query(Student).count()
-            active = db.query(Student).filter(Student.is_active == True).count()
-            
-            return ApiResponse(
-                success=True,
-                message="Student count retrieved successfully",
-                data={
-                    "total_students": total,
-                    "active_students": active,
-                    "inactive_students": total - active
-                },
-                request_id=request_id
-            ).dict()
+        return ApiResponse(
+            success=True,
+            message="Student count retrieved successfully",
+            data=service.count_students(),
+            request_id=request_id
+        ).dict()
     except Exception as e:
         logger.error(f"Agent request {request_id}: Error getting student count: {str(e)}")
         return ApiResponse(success=False, message=f"Error getting student count: {str(e)}", request_id=request_id).dict()
@@ -71,47 +51,35 @@ async def get_students_by_department() -> Dict[str, Any]:
     request_id = str(uuid.uuid4())
     try:
         logger.info(f"Agent request {request_id}: Getting student count by department")
-        with SessionLocal() as db:
-            dept_counts = db.query(
-                Student.department,
-                func.count(Student.id).label('count')
-            ).group_by(Student.department).all()
-            
-            department_data = [{"department": dept, "count": count} for dept, count in dept_counts]
-            
-            return ApiResponse(
-                success=True,
-                message="Department counts retrieved successfully",
-                data={"departments": department_data},
-                request_id=request_id
-            ).dict()
+        return ApiResponse(
+            success=True,
+            message="Department counts retrieved successfully",
+            data={"departments": service.students_by_department()},
+            request_id=request_id
+        ).dict()
     except Exception as e:
         logger.error(f"Agent request {request_id}: Error getting department data: {str(e)}")
         return ApiResponse(success=False, message=f"Error getting department data: {str(e)}", request_id=request_id).dict()
 
 @function_tool
-async def get_recent_onboarded_students(limit: int = 5) -> Dict[str, Any]:
+async def get_recent_onboarded_students(limit: int = 5, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """Get recently onboarded students
     
     Args:
         limit: Maximum number of recent students to return (default: 5)
+        fields: Student fields to include (default: student_id, name, department, email, is_active, created_at)
     """
     request_id = str(uuid.uuid4())
     try:
-        request = RecentStudentsRequest(limit=limit)
-        logger.info(f"Agent request {request_id}: Getting recent students (limit: {request.limit})")
-        
-        with SessionLocal() as db:
-            recent_students = db.query(Student).order_by(
-                desc(Student.created_at)
-            ).limit(request.limit).all()
-            students = [student_to_response(s) for s in recent_students]
-            return ApiResponse(
-                success=True,
-                message="Recent students retrieved successfully",
-                data={"recent_students": students, "limit": request.limit},
-                request_id=request_id
-            ).dict()
+        columns = resolve_fields(fields)
+        logger.info(f"Agent request {request_id}: Getting recent students (limit: {limit})")
+        students = service.recent_students(limit)
+        return ApiResponse(
+            success=True,
+            message="Recent students retrieved successfully",
+            data={"recent_students": to_columns(students, columns), "limit": limit},
+            request_id=request_id
+        ).dict()
     except ValueError as e:
         logger.error(f"Agent request {request_id}: Validation error getting recent students: {str(e)}")
         return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
@@ -120,36 +88,68 @@ async def get_recent_onboarded_students(limit: int = 5) -> Dict[str, Any]:
         return ApiResponse(success=False, message=f"Error getting recent students: {str(e)}", request_id=request_id).dict()
 
 @function_tool
-async def get_active_students_last_7_days() -> Dict[str, Any]:
-    """Get students who were active in the last 7 days (based on activity logs)"""
+async def get_active_students_last_7_days(fields: Optional[List[str]] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Get students who were active in the last 7 days (based on activity logs), one page at a time
+
+    Args:
+        fields: Student fields to include (default: student_id, name, department, email, is_active, created_at)
+        cursor: next_cursor from a previous page to continue the list
+    """
     request_id = str(uuid.uuid4())
     try:
+        columns = resolve_fields(fields)
+        after = decode_cursor(cursor)
         logger.info(f"Agent request {request_id}: Getting active students for last 7 days")
-        with SessionLocal() as db:
-            seven_days_ago = get_pkt_time() - timedelta(days=7)
-            
-            active_students = db.query(ActivityLog.student_id).filter(
-                ActivityLog.timestamp >= seven_days_ago
-            ).distinct().all()
-            
-            student_ids = [student[0] for student in active_students]
-            
-            students = db.query(Student).filter(
-                Student.student_id.in_(student_ids)
-            ).all()
-            
-            student_list = [student_to_response(s) for s in students]
-            return ApiResponse(
-                success=True,
-                message="Active students retrieved successfully",
-                data={
-                    "active_students": student_list,
-                    "count": len(student_list),
-                    "period": "last_7_days"
-                },
-                request_id=request_id
-            ).dict()
+        page = service.active_students(days=7, after=after, limit=page_size())
+        data = {
+            "active_students": to_columns(page["students"], columns),
+            "returned": len(page["students"]),
+            "count": page["total_count"],
+            "period": "last_7_days",
+            "next_cursor": encode_cursor(page["last_id"]) if page["has_more"] else None,
+        }
+        if page["has_more"] and not cursor:
+            data["by_department"] = {d["department"]: d["count"] for d in service.students_by_department(active_days=7)}
+        return ApiResponse(
+            success=True,
+            message=f"Returned {data['returned']} of {data['count']} active students"
+                    + ("; pass next_cursor for more" if page["has_more"] else ""),
+            data=data,
+            request_id=request_id
+        ).dict()
+    except ValueError as e:
+        logger.error(f"Agent request {request_id}: Validation error getting active students: {str(e)}")
+        return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
     except Exception as e:
         logger.error(f"Agent request {request_id}: Error getting active students: {str(e)}")
         return ApiResponse(success=False, message=f"Error getting active students: {str(e)}", request_id=request_id).dict()
 
+@function_tool
+async def query_campus_data(spec: QuerySpec) -> Dict[str, Any]:
+    """Run a custom filter/group/aggregate query over students or activity_logs when no fixed analytics tool fits.
+    Prefer aggregates (count, count_distinct, avg, ...) with group_by over listing rows; results are capped.
+
+    Args:
+        spec: Query: source table, filters (AND-ed), group_by (with optional day/week/month/year bucket for
+            created_at, updated_at or timestamp), aggregates, select (columns when not aggregating), sort and limit.
+            students fields: id, student_id, name, department, email, is_active, created_at, updated_at.
+            activity_logs fields: id, student_id, activity_type, description, timestamp, and student.<students field>.
+    """
+    request_id = str(uuid.uuid4())
+    try:
+        logger.info(f"Agent request {request_id}: Running query spec on {spec.source}")
+        with SessionLocal() as db:
+            result = run_query(db, spec)
+        message = f"Query returned {result['row_count']} rows"
+        if result["truncated"]:
+            message += " (truncated; aggregate or add filters for the full picture)"
+        return ApiResponse(success=True, message=message, data=result, request_id=request_id).dict()
+    except ValueError as e:
+        logger.error(f"Agent request {request_id}: Invalid query spec: {str(e)}")
+        return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
+    except QueryTimeout as e:
+        logger.error(f"Agent request {request_id}: Query spec timed out: {str(e)}")
+        return ApiResponse(success=False, message=str(e), request_id=request_id).dict()
+    except Exception as e:
+        logger.error(f"Agent request {request_id}: Error running query spec: {str(e)}")
+        return ApiResponse(success=False, message=f"Error running query: {str(e)}", request_id=request_id).dict()
@@ -1,51 +1,53 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool, ModelSettings
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from agents import Agent, Runner, function_tool, ModelSettings
+
+from ..agent.llm import get_model
 
 # ------------------------
 # 1. Environment + Keys
 # -------------------------
 load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not set in .env")
 
 # -------------------------
-# 2. OpenAI Client
+# 2. RAG Setup
 # -------------------------
-client = AsyncOpenAI(
-    api_key=GEMINI_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+# The index is built on first use (or at server preload), not at import time:
+# langchain, FAISS and the embedding calls cost seconds.
+DATA_PATH = os.getenv("RAG_DATA_PATH", os.path.join(os.path.dirname(__file__), "data", "SMIT.txt"))
 
-# -------------------------
-# 3. RAG Setup
-# -------------------------
-DATA_PATH = "backend/app/Tools/data/SMIT.txt"
-if not os.path.exists(DATA_PATH):
-    raise FileNotFoundError(f"Missing {DATA_PATH}")
 
-loader = TextLoader(DATA_PATH)
-documents = loader.load()
+@lru_cache(maxsize=1)
+def get_retriever():
+    """Split SMIT.txt, embed it and build the FAISS retriever once per process"""
+    from langchain_community.document_loaders import TextLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain_community.vectorstores import FAISS
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-# Efficient splitting with adaptive logic
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=800, chunk_overlap=100, separators=["\n\n", "\n", ".", " "]
-)
-docs = splitter.split_documents(documents)
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY not set in .env")
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"Missing {DATA_PATH}")
+
+    loader = TextLoader(DATA_PATH)
+    documents = loader.load()
 
-# Build embeddings + FAISS index
-embeddings = GoogleGenerativeAIEmbeddings(model='gemini-embedding-001', api_key=GEMINI_API_KEY)
-vectorstore = FAISS.from_documents(docs, embeddings)
-retriever = vectorstore.as_retriever()
+    # Efficient splitting with adaptive logic
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=800, chunk_overlap=100, separators=["\n\n", "\n", ".", " "]
+    )
+    docs = splitter.split_documents(documents)
+
+    # Build embeddings + FAISS index
+    embeddings = GoogleGenerativeAIEmbeddings(model='gemini-embedding-001', api_key=GEMINI_API_KEY)
+    vectorstore = FAISS.from_documents(docs, embeddings)
+    return vectorstore.as_retriever()
 
 # -------------------------
-# 4. Retriever Tool
+# 3. Retriever Tool
 # -------------------------
 @function_tool
 def retrieve_info(query: str) -> str:
@@ -54,12 +56,12 @@ def retrieve_info(query: str) -> str:
     Args:
         query: The user question or topic to look up.
     """
-    results = retriever.get_relevant_documents(query)
+    results = get_retriever().get_relevant_documents(query)
     context = "\n\n".join([doc.page_content for doc in results[:3]])
     return context if context else "No relevant info found."
 
 # -------------------------
-# 5. Agent
+# 4. Agent
 # -------------------------
 rag_agent = Agent(
     name="smit_rag_agent",
@@ -70,10 +72,8 @@ rag_agent = Agent(
         "If no information is available, say no clearly. don't make up answers. "
         "Be concise, accurate, and professional."
     ),
-    model=OpenAIChatCompletionsModel(
-        model="gemini-1.5-flash",
-        openai_client=client,
-    ),
+    # Shares the pooled LLM client; override with LLM_AGENT_MODELS_JSON
+    model=get_model("smit_rag_agent", "gemini-1.5-flash"),
     tools=[retrieve_info],
     model_settings=ModelSettings(tool_choice="required")
 )
@@ -1,12 +1,9 @@
-# Import required dependencies
+  # Import required dependencies
 from dotenv import load_dotenv
-from sqlalchemy import func, desc, or_
-from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field, EmailStr, validator
-from backend.db import Student, ActivityLog, SessionLocal
+from ..services import service
+from ..services.service import StudentNotFound, StudentAlreadyExists
 import logging
-import re
 import uuid
 
 # Try to import function_tool, with fallback to handle import errors
@@ -18,27 +15,13 @@ except ImportError as e:
 
 # Import from pydentic_model.py
 from ..utils.pydentic_model import (
-    AddStudentRequest,
-    GetStudentRequest, 
-    UpdateStudentRequest,
-    DeleteStudentRequest,
     ApiResponse, 
-    student_to_response, 
-    get_pkt_time,
     sanitize_input
 )
+from ..utils.compaction import resolve_fields, to_columns, page_size, encode_cursor, decode_cursor
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('student_management_tools.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 # =============================================================================
 # STUDENT MANAGEMENT TOOLS
@@ -56,48 +39,18 @@ def add_student(name: str, student_id: str, department: str, email: str) -> Dict
     """
     request_id = str(uuid.uuid4())
     try:
-        request = AddStudentRequest(name=name, student_id=student_id, department=department, email=email)
-        logger.info(f"Agent request {request_id}: Adding student {request.student_id}")
-        
-        with SessionLocal() as db:
-            existing_student = db.query(Student).filter(
-                or_(Student.student_id == request.student_id, Student.email == request.email)
-            ).first()
-            
-            if existing_student:
-                return ApiResponse(
-                    success=False,
-                    message="Student with this ID or email already exists",
-                    request_id=request_id
-                ).dict()
-            
-            new_student = Student(
-                name=request.name,
-                student_id=request.student_id,
-                department=request.department,
-                email=request.email,
-                created_at=get_pkt_time(),
-                updated_at=get_pkt_time()
-            )
-            
-            db.add(new_student)
-            db.flush()
-            
-            activity = ActivityLog(
-                student_id=request.student_id,
-                activity_type="student_created",
-                description=f"New student {request.name} added to {request.department}",
-                timestamp=get_pkt_time()
-            )
-            db.add(activity)
-            db.commit()
-            
-            return ApiResponse(
-                success=True,
-                message=f"Student {request.name} added successfully",
-                    data={"student": student_to_response(new_student)},
-                request_id=request_id
-            ).dict()
+        logger.info(f"Agent request {request_id}: Adding student {student_id}")
+        student = service.create_student(
+            {"name": name, "student_id": student_id, "department": department, "email": email}
+        )
+        return ApiResponse(
+            success=True,
+            message=f"Student {student['name']} added successfully",
+            data={"student": student},
+            request_id=request_id
+        ).dict()
+    except StudentAlreadyExists as e:
+        return ApiResponse(success=False, message=str(e), request_id=request_id).dict()
     except ValueError as e:
         logger.error(f"Agent request {request_id}: Validation error adding student: {str(e)}")
         return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
@@ -114,21 +67,15 @@ async def get_student(student_id: str) -> Dict[str, Any]:
     """
     request_id = str(uuid.uuid4())
     try:
-        request = GetStudentRequest(student_id=student_id)
-        logger.info(f"Agent request {request_id}: Retrieving student {request.student_id}")
-        
-        with SessionLocal() as db:
-            student = db.query(Student).filter(Student.student_id == request.student_id).first()
-            
-            if not student:
-                return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
-            
-            return ApiResponse(
-                success=True,
-                message="Student retrieved successfully",
-                    data={"student": student_to_response(student)},
-                request_id=request_id
-            ).dict()
+        logger.info(f"Agent request {request_id}: Retrieving student {student_id}")
+        return ApiResponse(
+            success=True,
+            message="Student retrieved successfully",
+            data={"student": service.get_student_data(student_id)},
+            request_id=request_id
+        ).dict()
+    except StudentNotFound:
+        return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
     except ValueError as e:
         logger.error(f"Agent request {request_id}: Validation error getting student: {str(e)}")
         return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
@@ -147,36 +94,18 @@ async def update_student(student_id: str, field: str, new_value: str) -> Dict[st
     """
     request_id = str(uuid.uuid4())
     try:
-        request = UpdateStudentRequest(student_id=student_id, field=field, new_value=new_value)
-        logger.info(f"Agent request {request_id}: Updating student {request.student_id}")
-        
-        with SessionLocal() as db:
-            student = db.query(Student).filter(Student.student_id == request.student_id).first()
-            
-            if not student:
-                return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
-            
-            if request.field == "is_active":
-                request.new_value = request.new_value.lower() in ["true", "1", "yes", "active"]
-            
-            setattr(student, request.field, request.new_value)
-            student.updated_at = get_pkt_time()
-            
-            activity = ActivityLog(
-                student_id=request.student_id,
-                activity_type="profile_update",
-                description=f"Updated {request.field} to {request.new_value}",
-                timestamp=get_pkt_time()
-            )
-            db.add(activity)
-            db.commit()
-            
-            return ApiResponse(
-                success=True,
-                message=f"Student {request.student_id} updated successfully",
-                data={"updated_field": request.field, "new_value": request.new_value},
-                request_id=request_id
-            ).dict()
+        logger.info(f"Agent request {request_id}: Updating student {student_id}")
+        result = service.update_student(student_id, {field: new_value})
+        return ApiResponse(
+            success=True,
+            message=f"Student {result['student']['student_id']} updated successfully",
+            data={"updated_field": field, "new_value": result["updated"][field]},
+            request_id=request_id
+        ).dict()
+    except StudentNotFound:
+        return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
+    except StudentAlreadyExists as e:
+        return ApiResponse(success=False, message=str(e), request_id=request_id).dict()
     except ValueError as e:
         logger.error(f"Agent request {request_id}: Validation error updating student: {str(e)}")
         return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
@@ -193,32 +122,15 @@ async def delete_student(student_id: str) -> Dict[str, Any]:
     """
     request_id = str(uuid.uuid4())
     try:
-        request = DeleteStudentRequest(student_id=student_id)
-        logger.info(f"Agent request {request_id}: Deleting student {request.student_id}")
-        
-        with SessionLocal() as db:
-            student = db.query(Student).filter(Student.student_id == request.student_id).first()
-            
-            if not student:
-                return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
-            
-            student_name = student.name
-            db.delete(student)
-            
-            activity = ActivityLog(
-                student_id=request.student_id,
-                activity_type="student_deleted",
-                description=f"Student {student_name} deleted",
-                timestamp=get_pkt_time()
-            )
-            db.add(activity)
-            db.commit()
-            
-            return ApiResponse(
-                success=True,
-                message=f"Student {student_name} deleted successfully",
-                request_id=request_id
-            ).dict()
+        logger.info(f"Agent request {request_id}: Deleting student {student_id}")
+        deleted = service.delete_student(student_id)
+        return ApiResponse(
+            success=True,
+            message=f"Student {deleted['name']} deleted successfully",
+            request_id=request_id
+        ).dict()
+    except StudentNotFound:
+        return ApiResponse(success=False, message="Student not found", request_id=request_id).dict()
     except ValueError as e:
         logger.error(f"Agent request {request_id}: Validation error deleting student: {str(e)}")
         return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
@@ -227,20 +139,69 @@ async def delete_student(student_id: str) -> Dict[str, Any]:
         return ApiResponse(success=False, message=f"Error deleting student: {str(e)}", request_id=request_id).dict()
 
 @function_tool
-async def list_students() -> Dict[str, Any]:
-    """Get list of all students"""
+async def list_students(fields: Optional[List[str]] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Get the list of all students, one page at a time (prefer search_students to find specific students)
+
+    Args:
+        fields: Student fields to include (default: student_id, name, department, email, is_active, created_at)
+        cursor: next_cursor from a previous page to continue the list
+    """
     request_id = str(uuid.uuid4())
     try:
-        logger.info(f"Agent request {request_id}: Listing all students")
-        with SessionLocal() as db:
-            students = db.query(Student).all()
-            student_list = [student_to_response(s) for s in students]
-            return ApiResponse(
-                success=True,
-                message="List of all students retrieved successfully",
-                data={"students": student_list, "total_count": len(student_list)},
-                request_id=request_id
-            ).dict()
+        columns = resolve_fields(fields)
+        after = decode_cursor(cursor)
+        logger.info(f"Agent request {request_id}: Listing students after id {after}")
+        page = service.get_all_students(after=after, limit=page_size())
+        data = {
+            "students": to_columns(page["students"], columns),
+            "returned": len(page["students"]),
+            "total_count": page["total_count"],
+            "next_cursor": encode_cursor(page["last_id"]) if page["has_more"] else None,
+        }
+        if page["has_more"] and not cursor:
+            # Summary of the whole roster, so counting questions don't need every page
+            data["by_department"] = {d["department"]: d["count"] for d in service.students_by_department()}
+        return ApiResponse(
+            success=True,
+            message=f"Returned {data['returned']} of {data['total_count']} students"
+                    + ("; pass next_cursor for more" if page["has_more"] else ""),
+            data=data,
+            request_id=request_id
+        ).dict()
+    except ValueError as e:
+        logger.error(f"Agent request {request_id}: Validation error listing students: {str(e)}")
+        return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
     except Exception as e:
         logger.error(f"Agent request {request_id}: Error listing students: {str(e)}")
         return ApiResponse(success=False, message=f"Error retrieving students: {str(e)}", request_id=request_id).dict()
+
+SEARCH_RESULT_FIELDS = ("student_id", "name", "department", "email", "score", "matched_field")
+
+@function_tool
+async def search_students(query: str, limit: int = 5) -> Dict[str, Any]:
+    """Find students by partial or misspelled name, email, student ID or department, best matches first
+
+    Args:
+        query: Text to look for, e.g. part of a name or email
+        limit: Maximum number of matches to return (1-25)
+    """
+    request_id = str(uuid.uuid4())
+    try:
+        query = sanitize_input(query)
+        if not query:
+            raise ValueError("Search query cannot be empty")
+        limit = max(1, min(limit, 25))
+        logger.info(f"Agent request {request_id}: Searching students for '{query}'")
+        matches = service.search_students(query, limit)
+        return ApiResponse(
+            success=True,
+            message=f"Found {len(matches)} matching students" if matches else "No matching students found",
+            data={"students": to_columns(matches, SEARCH_RESULT_FIELDS), "total_count": len(matches)},
+            request_id=request_id
+        ).dict()
+    except ValueError as e:
+        logger.error(f"Agent request {request_id}: Validation error searching students: {str(e)}")
+        return ApiResponse(success=False, message=f"Validation error: {str(e)}", request_id=request_id).dict()
+    except Exception as e:
+        logger.error(f"Agent request {request_id}: Error searching students: {str(e)}")
+        return ApiResponse(success=False, message=f"Error searching students: {str(e)}", request_id=request_id).dict()
@@ -1,6 +1,6 @@
 import os
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, handoffs, ModelSettings
+import logging
+from agents import Agent, Runner, handoffs, ModelSettings
 from openai.types.responses import ResponseTextDeltaEvent
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
@@ -9,25 +9,30 @@ import asyncio
 # Import all the function tools
 from ..Tools.Campus_analytics_tools import (
     get_total_students, get_students_by_department, get_recent_onboarded_students,
-    get_active_students_last_7_days
+    get_active_students_last_7_days, query_campus_data
 )
 from ..Tools.student_management_tool import (
-    add_student, get_student, update_student, delete_student, list_students
+    add_student, get_student, update_student, delete_student, list_students, search_students
 )
 from ..Tools.FAQ_tools import (
     get_cafeteria_timings, get_library_hours, get_lunch_timing
 )
+from .tool_cache import enable_tool_cache
+from .llm import get_model
 
 load_dotenv()
 
-# ================= Initializing LLM ==================
+logger = logging.getLogger(__name__)
 
-gemini_api_key = os.getenv('GEMINI_API_KEY')
-
-client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+# ================= Tool Result Caching ==================
+# Reads are served from the request/session cache when one is attached to the
+# run context; successful writes invalidate it.
+enable_tool_cache([
+    get_total_students, get_students_by_department, get_recent_onboarded_students,
+    get_active_students_last_7_days, query_campus_data, get_student, list_students, search_students,
+    get_cafeteria_timings, get_library_hours, get_lunch_timing,
+], read_only=True)
+enable_tool_cache([add_student, update_student, delete_student], read_only=False)
 
 # ================= Student Management Agent ==================
 student_management_agent = Agent(
@@ -42,6 +47,10 @@ For student addition, always use the add_student tool with the provided paramete
 
 Handle errors gracefully. If an operation fails (such as duplicate ID or a non-existent student), provide clear, helpful feedback and suggest alternatives.
 
+To find a student from a partial or misspelled name, email, ID or department, use search_students instead of list_students. Use list_students only when the user asks for the full roster.
+
+List tools return one page as columns plus rows, with total_count and next_cursor. Request only the fields you need, and fetch further pages with next_cursor only when the user needs more than the first page.
+
 When listing or retrieving student information, format the output neatly as a bullet list or table for readability.
 
 Be polite and proactive. Offer related actions if appropriate, such as suggesting an update after adding a student.
@@ -51,17 +60,18 @@ Do not assume or fabricate data. Always use tools to interact with the database.
 Always provide clear confirmation messages for both successful and failed operations.
 
 If the query does not fit student management, politely redirect the user or hand off to the appropriate agent.""",
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("Student_Management_Agent"),
     tools=[
         add_student,
         get_student,
         update_student,
         delete_student,
         list_students,
+        search_students,
     ],
     output_type=str
 )
-print("Student Management Agent initialized.")
+logger.info("Student Management Agent initialized.")
 
 # ================= Campus Analytics Agent ==================
 
@@ -75,6 +85,8 @@ Confirm the exact analytics the user wants before proceeding (for example, total
 
 Always use tools to fetch accurate data; never estimate or fabricate numbers.
 
+When no fixed analytics tool answers the question (for example, "active CS students onboarded since March, by month"), use query_campus_data with filters, group_by and aggregates so the database does the counting. Do not list raw rows and count them yourself. Student lists come back one page at a time as columns plus rows, with total counts and a per-department breakdown; use those instead of paging through everything.
+
 Present data clearly using bullet points, tables, or short summaries. For complex data, suggest visualizations (for example, “This could be charted as a pie graph for departments”).
 
 Provide insights along with raw data (for example, “Computer Science has the highest enrollment at 40%”).
@@ -84,16 +96,17 @@ Handle edge cases carefully: if no data is available, inform the user clearly an
 Remain objective and accurate; rely only on data from tools.
 
 If the query is not related to analytics, suggest handing off to the appropriate agent.""",
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("Campus_Analytics_Agent"),
     tools=[
         get_total_students,
         get_students_by_department,
         get_recent_onboarded_students,
         get_active_students_last_7_days,
+        query_campus_data,
     ],
     output_type=str,
 )
-print("Campus Analytics Agent initialized.")
+logger.info("Campus Analytics Agent initialized.")
 
 # ================= Campus Info Agent ==================
 campus_info_agent = Agent(
@@ -117,7 +130,7 @@ If the requested information is not available, state this clearly and suggest re
 
 For queries outside your scope, recommend handing off to the appropriate agent.
 """,
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("Campus_Info_Agent"),
     tools=[
         get_cafeteria_timings, 
         get_library_hours,
@@ -125,7 +138,7 @@ For queries outside your scope, recommend handing off to the appropriate agent.
         ],
     model_settings=ModelSettings(tool_choice="required")
 )
-print("Campus Info Agent initialized.")
+logger.info("Campus Info Agent initialized.")
 
 # ================= Handoff Agent (Orchestrator) ==================
 handoff_agent = Agent(
@@ -156,14 +169,14 @@ After agent handoff, if needed, summarize or integrate results for the user.
 
 Available Agents and Tools:
 
-Student Management: add_student, get_student, update_student, delete_student, list_students
+Student Management: add_student, get_student, update_student, delete_student, list_students, search_students
 
-Analytics: get_total_students, get_students_by_department, get_recent_onboarded_students, get_active_students_last_7_days
+Analytics: get_total_students, get_students_by_department, get_recent_onboarded_students, get_active_students_last_7_days, query_campus_data
 
 Campus Info: get_cafeteria_timings, get_library_hours, get_lunch_timing
 
 Your goal is to ensure the user gets the most accurate and relevant information or assistance possible. Always be helpful, accurate, and provide clear responses.""",
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("Handoff_Agent"),
     handoffs=[student_management_agent, campus_analytics_agent, campus_info_agent],
 )
 
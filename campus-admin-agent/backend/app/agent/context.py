@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+import uuid
+
+
+@dataclass
+class RequestContext:
+    """Per-request state passed to `Runner.run(context=...)`.
+
+    The runner hands it to hooks and tool wrappers as `ctx.context`; tools
+    themselves never see it, so they stay callable outside an agent run.
+    """
+    request_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    session_id: Optional[str] = None
+    tool_cache: Optional[Any] = None  # see app.agent.tool_cache
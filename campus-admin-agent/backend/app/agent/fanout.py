@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agents import Agent, Runner, MaxTurnsExceeded
+from agents.usage import Usage
+
+from .agent import student_management_agent, campus_analytics_agent, campus_info_agent
+from ..services.usage import UsageTracker, TokenBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# PARALLEL FAN-OUT
+# =============================================================================
+# A multi-part question ("how many CS students are there and when does the
+# library close?") is split into parts, each part is routed to its specialist
+# by keyword, and the specialists run concurrently. The answers are joined in
+# question order, so latency is that of the slowest branch and no extra LLM
+# call is spent on routing or merging. Questions that map to a single
+# specialist go through the handoff agent as before.
+
+CHAT_FANOUT = os.getenv("CHAT_FANOUT", "true").lower() in ("1", "true", "yes")
+# Upper bound on concurrent specialists for one question
+FANOUT_MAX_BRANCHES = int(os.getenv("FANOUT_MAX_BRANCHES", "3"))
+
+# Checked in order: counts and statistics win over plain student lookups
+SPECIALIST_PATTERNS = [
+    (campus_analytics_agent, re.compile(
+        r"\b(how many|count|total|number of|statistics?|stats|distribution|per department|"
+        r"by department|breakdown|recent(ly)? (onboarded|joined|added)|onboard\w*|active|trend)\b", re.I)),
+    (campus_info_agent, re.compile(
+        r"\b(library|cafeteria|canteen|lunch|breakfast|dinner|timings?|hours|open|close[sd]?)\b", re.I)),
+    (student_management_agent, re.compile(
+        r"\b(students?|email|record|details|profile|add|update|delete|remove|list|search|find)\b", re.I)),
+]
+
+_SENTENCES = re.compile(r"[?;\n]+")
+_CONJUNCTIONS = re.compile(r"\b(?:and also|and then|and|also|plus)\b", re.I)
+
+
+@dataclass
+class Branch:
+    agent: Agent
+    query: str
+
+
+@dataclass
+class FanoutResult:
+    """Merged outcome of the specialist runs, shaped like the parts of a RunResult we use"""
+    final_output: str
+    last_agent: Agent
+    usage: Usage
+    branches: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def classify(text: str) -> Optional[Agent]:
+    for agent, pattern in SPECIALIST_PATTERNS:
+        if pattern.search(text):
+            return agent
+    return None
+
+
+def plan_fanout(query: str) -> List[Branch]:
+    """Split `query` into per-specialist branches; empty unless two or more specialists are needed"""
+    if not CHAT_FANOUT:
+        return []
+    branches: List[Branch] = []
+    for sentence in _SENTENCES.split(query):
+        for fragment in _CONJUNCTIONS.split(sentence):
+            fragment = fragment.strip(" ,.")
+            if not fragment:
+                continue
+            agent = classify(fragment)
+            if branches and (agent is None or agent is branches[-1].agent):
+                # "students in CS and IT": a fragment without its own intent belongs to the previous one
+                branches[-1].query += f" and {fragment}"
+            elif agent is not None:
+                branches.append(Branch(agent, fragment))
+
+    # One branch per specialist, keeping the order of first mention
+    merged: Dict[str, Branch] = {}
+    for branch in branches:
+        if branch.agent.name in merged:
+            merged[branch.agent.name].query += f"; {branch.query}"
+        else:
+            merged[branch.agent.name] = branch
+    plan = list(merged.values())
+    return plan if 2 <= len(plan) <= FANOUT_MAX_BRANCHES else []
+
+
+async def run_fanout(branches: List[Branch], context: Any, hooks: UsageTracker, **run_options) -> FanoutResult:
+    """Run every branch concurrently and merge the answers.
+
+    Each branch gets its own usage tracker with an equal share of the request's
+    token budget; their totals are folded into `hooks`. A failed branch is
+    reported in the answer instead of failing the whole request, unless every
+    branch failed.
+    """
+    trackers = [
+        UsageTracker(hooks.request_id, hooks.route, hooks.session_id, max_tokens=hooks.max_tokens // len(branches))
+        for _ in branches
+    ]
+
+    async def run_branch(branch: Branch, tracker: UsageTracker):
+        started = time.perf_counter()
+        result = await Runner.run(branch.agent, branch.query, context=context, hooks=tracker, **run_options)
+        return result, round((time.perf_counter() - started) * 1000, 2)
+
+    outcomes = await asyncio.gather(
+        *(run_branch(branch, tracker) for branch, tracker in zip(branches, trackers)),
+        return_exceptions=True,
+    )
+
+    usage = Usage()
+    answers: List[str] = []
+    report: List[Dict[str, Any]] = []
+    failures: List[BaseException] = []
+    for branch, tracker, outcome in zip(branches, trackers, outcomes):
+        hooks.merge(tracker)
+        entry = {"agent": branch.agent.name, "query": branch.query}
+        if isinstance(outcome, BaseException):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            logger.error(f"Fan-out branch {branch.agent.name} failed: {str(outcome)}")
+            failures.append(outcome)
+            budget = isinstance(outcome, (TokenBudgetExceeded, MaxTurnsExceeded))
+            answers.append(f"I couldn't complete this part of your request: \"{branch.query}\".")
+            entry["error"] = "budget_exceeded" if budget else str(outcome)
+        else:
+            result, wall_ms = outcome
+            usage.add(result.context_wrapper.usage)
+            answers.append(str(result.final_output).strip())
+            entry.update(response=str(result.final_output), wall_ms=wall_ms)
+        report.append(entry)
+
+    if len(failures) == len(branches):
+        raise failures[0]
+    logger.info(f"Fan-out answered {len(branches) - len(failures)}/{len(branches)} parts concurrently")
+    return FanoutResult(
+        final_output="\n\n".join(answers),
+        last_agent=branches[-1].agent,
+        usage=usage,
+        branches=report,
+    )
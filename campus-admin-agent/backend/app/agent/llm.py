@@ -0,0 +1,167 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+from agents import OpenAIChatCompletionsModel
+from dotenv import load_dotenv
+
+from ..services.scheduler import scheduler, THROTTLE_STATUSES
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+gemini_api_key = os.getenv('GEMINI_API_KEY')
+# Override to point the agents at any OpenAI-compatible endpoint (e.g. the benchmark mock)
+gemini_base_url = os.getenv('GEMINI_BASE_URL', "https://generativelanguage.googleapis.com/v1beta/openai/")
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+# Per-agent overrides, e.g. {"Campus_Analytics_Agent": "gemini-1.5-flash"}
+AGENT_MODELS: Dict[str, str] = json.loads(os.getenv("LLM_AGENT_MODELS_JSON", "{}"))
+
+# Seconds to connect, and to wait for each response (or each streamed chunk)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Connection pool shared by every agent
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "16"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 multiplexes calls over one connection; needs the optional `h2` package
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "auto").lower()
+# Retries for connection errors and 408/429/5xx, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def http2_enabled() -> bool:
+    if LLM_HTTP2 == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return LLM_HTTP2 in ("1", "true", "yes")
+
+
+def model_for(agent_name: str, default: Optional[str] = None) -> str:
+    """Model name for an agent: LLM_AGENT_MODELS_JSON, then `default`, then LLM_MODEL"""
+    return AGENT_MODELS.get(agent_name) or default or DEFAULT_MODEL
+
+
+# =============================================================================
+# RETRIES
+# =============================================================================
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    header = response.headers.get("retry-after")
+    try:
+        return max(0.0, float(header)) if header else None
+    except ValueError:
+        return None
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retries failed LLM calls below the OpenAI client.
+
+    Connection errors and retryable statuses are retried with full-jitter
+    backoff, honouring Retry-After up to LLM_RETRY_MAX_SECONDS. Every 429/503
+    is reported to the admission scheduler so new runs back off as well.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int = LLM_MAX_RETRIES):
+        self._transport = transport
+        self.retries = retries
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"LLM connection failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                retry_after = _retry_after(response)
+                if response.status_code in THROTTLE_STATUSES:
+                    scheduler.on_throttle(retry_after or 0.0)
+                if attempt >= self.retries or (retry_after or 0) > LLM_RETRY_MAX_SECONDS:
+                    return response
+                await response.aclose()
+                delay = max(retry_after or 0.0, self._backoff(attempt))
+                logger.warning(f"LLM call returned {response.status_code}, retrying in {delay:.2f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# =============================================================================
+# SHARED CLIENT
+# =============================================================================
+
+_http_client: Optional[httpx.AsyncClient] = None
+_llm_client: Optional[AsyncOpenAI] = None
+_models: Dict[str, OpenAIChatCompletionsModel] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The one pooled HTTP client used for every LLM call"""
+    global _http_client
+    if _http_client is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _http_client = httpx.AsyncClient(
+            transport=RetryTransport(transport),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        )
+    return _http_client
+
+
+def get_llm_client() -> AsyncOpenAI:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = AsyncOpenAI(
+            api_key=gemini_api_key,
+            base_url=gemini_base_url,
+            http_client=get_http_client(),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            max_retries=0,  # retried in RetryTransport
+        )
+    return _llm_client
+
+
+def get_model(agent_name: str, default: Optional[str] = None) -> OpenAIChatCompletionsModel:
+    """Chat-completions model for an agent; agents on the same model share one instance"""
+    name = model_for(agent_name, default)
+    if name not in _models:
+        _models[name] = OpenAIChatCompletionsModel(model=name, openai_client=get_llm_client())
+    return _models[name]
+
+
+async def close_llm_client():
+    """Close pooled connections (call on application shutdown)"""
+    if _http_client is not None:
+        await _http_client.aclose()
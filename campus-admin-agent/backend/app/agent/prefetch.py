@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents import FunctionTool
+from agents.tool_context import ToolContext
+
+from ..Tools.Campus_analytics_tools import (
+    get_total_students, get_students_by_department, get_recent_onboarded_students,
+    get_active_students_last_7_days
+)
+from ..Tools.FAQ_tools import get_cafeteria_timings, get_library_hours, get_lunch_timing
+from .tool_cache import schema_defaults, tool_cache_key
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# SPECULATIVE TOOL PREFETCH
+# =============================================================================
+# While the first LLM call of a run decides what to do, the cheap read-only
+# tools the question most likely needs are already running. Their results land
+# in a per-request cache that the cached tool wrapper consults, so when the
+# specialist asks for them they return immediately (or join the call already
+# in flight). Prefetches still running when the request ends are cancelled.
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+# At most this many speculative tool calls per request
+PREFETCH_MAX_TOOLS = int(os.getenv("PREFETCH_MAX_TOOLS", "2"))
+# Below this rolling hit rate a tool is only prefetched on every PREFETCH_PROBE_EVERY-th chance
+PREFETCH_MIN_HIT_RATE = float(os.getenv("PREFETCH_MIN_HIT_RATE", "0.25"))
+PREFETCH_PROBE_EVERY = int(os.getenv("PREFETCH_PROBE_EVERY", "10"))
+
+# (pattern, tool, arguments): only cheap tools without user-specific arguments
+PREFETCH_RULES: List[Tuple[re.Pattern, FunctionTool, Dict[str, Any]]] = [
+    (re.compile(r"\blibrary\b", re.I), get_library_hours, {}),
+    (re.compile(r"\b(cafeteria|canteen)\b", re.I), get_cafeteria_timings, {}),
+    (re.compile(r"\blunch\b", re.I), get_lunch_timing, {}),
+    (re.compile(r"\b(department|dept|distribution|breakdown)\b", re.I), get_students_by_department, {}),
+    (re.compile(r"\b(recent(ly)?|new|onboard\w*|joined)\b", re.I), get_recent_onboarded_students, {}),
+    (re.compile(r"\bactive\b.*\b(week|7 days|last)\b|\b(week|7 days)\b.*\bactive\b", re.I),
+     get_active_students_last_7_days, {}),
+    (re.compile(r"\b(how many|total|number of|count)\b", re.I), get_total_students, {}),
+]
+
+
+def predict_tools(query: str) -> List[Tuple[FunctionTool, Dict[str, Any]]]:
+    """Tools the query most likely needs, in rule order"""
+    return [(tool, arguments) for pattern, tool, arguments in PREFETCH_RULES if pattern.search(query)]
+
+
+class PrefetchStats:
+    """Process-wide prefetch outcomes, with a rolling hit rate per tool"""
+
+    def __init__(self, window: int = 50):
+        self._lock = threading.Lock()
+        self._recent: Dict[str, deque] = {}
+        self._skipped: Dict[str, int] = {}
+        self._window = window
+        self.issued = 0
+        self.used = 0
+
+    def hit_rate(self, tool_name: str) -> Optional[float]:
+        recent = self._recent.get(tool_name)
+        if not recent or len(recent) < 10:
+            return None
+        return sum(recent) / len(recent)
+
+    def should_prefetch(self, tool_name: str) -> bool:
+        with self._lock:
+            rate = self.hit_rate(tool_name)
+            if rate is None or rate >= PREFETCH_MIN_HIT_RATE:
+                return True
+            # Keep probing now and then so a tool can earn its way back
+            self._skipped[tool_name] = self._skipped.get(tool_name, 0) + 1
+            return self._skipped[tool_name] % PREFETCH_PROBE_EVERY == 0
+
+    def record(self, tool_name: str, used: bool):
+        with self._lock:
+            self.issued += 1
+            self.used += used
+            self._recent.setdefault(tool_name, deque(maxlen=self._window)).append(used)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "used": self.used,
+                "wasted": self.issued - self.used,
+                "hit_rate": round(self.used / self.issued, 3) if self.issued else None,
+                "tools": {
+                    name: round(sum(recent) / len(recent), 3) for name, recent in self._recent.items() if recent
+                },
+            }
+
+
+prefetch_stats = PrefetchStats()
+
+
+class RequestToolCache:
+    """In-memory tool cache for one request, layered over an optional session cache.
+
+    Prefetched calls are stored as pending tasks; a lookup for the same key
+    waits for that task instead of calling the tool again.
+    """
+
+    def __init__(self, parent: Optional[Any] = None):
+        self.parent = parent
+        self._values: Dict[str, Any] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.prefetched: Dict[str, str] = {}  # cache key -> tool name
+        self.used: set = set()
+        self.finished = False
+
+    async def get(self, key: str) -> Any:
+        task = self._pending.get(key)
+        if task is not None:
+            await asyncio.wait([task])
+        value = self._values.get(key)
+        if value is not None:
+            if key in self.prefetched:
+                self.used.add(key)
+            return value
+        return await self.parent.get(key) if self.parent else None
+
+    async def set(self, key: str, value: Any):
+        self._values[key] = value
+        if self.parent:
+            await self.parent.set(key, value)
+
+    async def clear(self):
+        self.cancel_pending()
+        self._values.clear()
+        if self.parent:
+            await self.parent.clear()
+
+    def prefetch(self, tool: FunctionTool, arguments: Dict[str, Any]):
+        # Called with the full argument object a strict-mode model would send
+        payload = json.dumps({**schema_defaults(tool), **arguments})
+        key = tool_cache_key(tool, payload)
+        if key in self._values or key in self._pending:
+            return
+
+        def invoke():
+            # No cache on this context, so the tool runs as-is instead of consulting us
+            ctx = ToolContext(context=None, tool_name=tool.name, tool_call_id=f"prefetch-{tool.name}")
+            return asyncio.run(tool.on_invoke_tool(ctx, payload))
+
+        async def call():
+            # The tool bodies make blocking database calls; run them on a worker
+            # thread so the first LLM call proceeds on the event loop meanwhile
+            result = await asyncio.to_thread(invoke)
+            if isinstance(result, dict) and result.get("success") is True:
+                self._values[key] = result
+
+        def done(task: asyncio.Task):
+            self._pending.pop(key, None)
+            if not task.cancelled() and task.exception():
+                logger.warning(f"Prefetch of {tool.name} failed: {str(task.exception())}")
+
+        task = asyncio.ensure_future(call())
+        task.add_done_callback(done)
+        self._pending[key] = task
+        self.prefetched[key] = tool.name
+
+    def cancel_pending(self):
+        for task in self._pending.values():
+            task.cancel()
+
+
+def start_prefetch(context: Any, query: str) -> Optional[RequestToolCache]:
+    """Install a request cache on `context` and start prefetching the likely tools"""
+    if not PREFETCH_ENABLED or context is None:
+        return None
+    cache = RequestToolCache(parent=getattr(context, "tool_cache", None))
+    context.tool_cache = cache
+    for tool, arguments in predict_tools(query)[:PREFETCH_MAX_TOOLS]:
+        if prefetch_stats.should_prefetch(tool.name):
+            cache.prefetch(tool, arguments)
+    return cache
+
+
+def finish_prefetch(cache: Any) -> Optional[Dict[str, Any]]:
+    """Cancel leftovers and record which prefetches were used (once per request)"""
+    if not isinstance(cache, RequestToolCache) or cache.finished or not cache.prefetched:
+        return None
+    cache.finished = True
+    cache.cancel_pending()
+    for key, tool_name in cache.prefetched.items():
+        prefetch_stats.record(tool_name, key in cache.used)
+    report = {"issued": len(cache.prefetched), "used": len(cache.used)}
+    logger.info(f"Prefetch: {report['used']}/{report['issued']} speculative tool calls used")
+    return report
@@ -0,0 +1,72 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from agents import FunctionTool
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# TOOL RESULT CACHING
+# =============================================================================
+# Read-only tools consult `ctx.context.tool_cache` before touching the database,
+# and successful write tools clear it so later reads in the same scope see the
+# change. Without a cache on the context (e.g. direct tool calls in benchmarks)
+# the original tool runs unchanged.
+
+
+def cache_key(tool_name: str, arguments: str, defaults: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for a tool call regardless of argument order, whitespace or omitted defaults"""
+    try:
+        normalized = json.dumps({**(defaults or {}), **(json.loads(arguments) if arguments else {})}, sort_keys=True)
+    except ValueError:
+        normalized = arguments
+    return f"{tool_name}:{normalized}"
+
+
+def schema_defaults(tool: FunctionTool) -> Dict[str, Any]:
+    """Every parameter of `tool` at its schema default, or None without one.
+
+    Strict schemas drop `None` defaults and mark those parameters required, so
+    a model's call carries them all, the unset ones as null.
+    """
+    properties = (tool.params_json_schema or {}).get("properties", {})
+    return {name: spec.get("default") for name, spec in properties.items()}
+
+
+def tool_cache_key(tool: FunctionTool, arguments: str) -> str:
+    """`cache_key` with the tool's schema defaults filled in, so `{}`, `{"limit": 5}` and `{"fields": null}` match"""
+    return cache_key(tool.name, arguments, schema_defaults(tool))
+
+
+def _succeeded(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("success") is True
+
+
+def enable_tool_cache(tools: Iterable[FunctionTool], read_only: bool) -> None:
+    """Wrap each tool's `on_invoke_tool` with cache lookups (reads) or invalidation (writes)"""
+    for tool in tools:
+        original = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx, arguments: str, _tool=tool, _original=original):
+            cache = getattr(ctx.context, "tool_cache", None)
+            if cache is None:
+                return await _original(ctx, arguments)
+
+            key = tool_cache_key(_tool, arguments)
+            if read_only:
+                cached = await cache.get(key)
+                if cached is not None:
+                    logger.info(f"Tool cache hit for {_tool.name}")
+                    return cached
+                result = await _original(ctx, arguments)
+                if _succeeded(result):
+                    await cache.set(key, result)
+                return result
+
+            result = await _original(ctx, arguments)
+            if _succeeded(result):
+                await cache.clear()
+            return result
+
+        tool.on_invoke_tool = on_invoke_tool
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Sequence, TypeVar
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# BATCH STREAMING
+# =============================================================================
+# A fixed pool of workers pulls items by index and pushes each outcome onto a
+# bounded queue; the response body drains the queue as NDJSON, one line per
+# item in completion order, followed by a summary line. A failed item becomes
+# an error line instead of ending the batch. Workers stall when the client
+# reads slowly, so memory stays flat however large the batch.
+
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "500"))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+CHAT_BATCH_MAX_CONCURRENCY = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "16"))
+
+NDJSON_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+T = TypeVar("T")
+
+
+def item_error(index: int, error: Exception) -> Dict[str, Any]:
+    if isinstance(error, HTTPException):
+        return {"index": index, "status": error.status_code, "error": str(error.detail)}
+    return {"index": index, "status": 500, "error": str(error) or type(error).__name__}
+
+
+async def stream_batch(items: Sequence[T], handle: Callable[[int, T], Awaitable[Dict[str, Any]]],
+                       concurrency: int = CHAT_BATCH_CONCURRENCY) -> AsyncIterator[str]:
+    """NDJSON lines with `handle(index, item)` for every item, at most `concurrency` at a time"""
+    started = time.perf_counter()
+    concurrency = max(1, min(concurrency, CHAT_BATCH_MAX_CONCURRENCY, len(items) or 1))
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    indexes = iter(range(len(items)))
+
+    async def worker():
+        # The iterator is shared, so every index is taken by exactly one worker
+        for index in indexes:
+            try:
+                result = {"index": index, "status": 200, **await handle(index, items[index])}
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Batch item {index} failed: {str(e)}")
+                result = item_error(index, e)
+            await results.put(result)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    errors = 0
+    try:
+        for _ in range(len(items)):
+            result = await results.get()
+            errors += result["status"] != 200
+            yield json.dumps(result, default=str) + "\n"
+        summary = {
+            "done": True,
+            "items": len(items),
+            "errors": errors,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        logger.info(f"Batch of {len(items)} finished with {errors} errors in {summary['wall_ms']}ms")
+        yield json.dumps(summary) + "\n"
+    finally:
+        # Client went away (or we are done): stop the remaining runs
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.schemas import StudentPage, StudentUpdate
+from app.services import export, service
+from app.models.models import consistency_key
+from app.services.service import ServiceError
+from app.utils.compaction import encode_cursor, decode_cursor
+from app.utils.pydentic_model import AddStudentRequest, StudentResponse
+
+# Typed CRUD and analytics over the service layer, without an LLM in the loop.
+# Endpoints are plain `def`: FastAPI runs them in its threadpool, so the
+# synchronous database calls never block the event loop.
+
+
+async def consistency_scope(x_session_id: Optional[str] = Header(None)):
+    """Calls sharing an X-Session-ID read their own writes, even with read replicas (models.py)"""
+    if x_session_id:
+        consistency_key.set(x_session_id)
+
+
+router = APIRouter(prefix="/api", dependencies=[Depends(consistency_scope)])
+
+
+async def service_error_handler(request: Request, exc: ServiceError) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+def _page(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "items": result["students"],
+        "total_count": result["total_count"],
+        "next_cursor": encode_cursor(result["last_id"]) if result["has_more"] else None,
+    }
+
+
+# =============================================================================
+# STUDENTS
+# =============================================================================
+
+@router.get("/students", response_model=StudentPage)
+def list_students(
+    department: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Fuzzy search on name, email, ID and department"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    if q:
+        matches = service.search_students(q, min(limit, 25), department=department, is_active=is_active)
+        return {"items": matches, "total_count": len(matches), "next_cursor": None}
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise ServiceError(str(e))
+    return _page(service.get_all_students(after=after, limit=limit, department=department, is_active=is_active))
+
+
+@router.get("/students/{student_id}", response_model=StudentResponse)
+def get_student(student_id: str):
+    return service.get_student_data(student_id)
+
+
+@router.post("/students", response_model=StudentResponse, status_code=201)
+def create_student(request: AddStudentRequest):
+    return service.create_student(request.dict())
+
+
+@router.patch("/students/{student_id}", response_model=StudentResponse)
+def update_student(student_id: str, request: StudentUpdate):
+    return service.update_student(student_id, request.dict(exclude_unset=True))["student"]
+
+
+@router.delete("/students/{student_id}")
+def delete_student(student_id: str):
+    deleted = service.delete_student(student_id)
+    return {"message": f"Student {deleted['student_id']} deleted."}
+
+
+# =============================================================================
+# ANALYTICS
+# =============================================================================
+
+@router.get("/analytics/summary")
+def analytics_summary() -> Dict[str, int]:
+    return service.count_students()
+
+
+@router.get("/analytics/departments")
+def analytics_departments(
+    active_days: Optional[int] = Query(None, ge=1, le=365, description="Only count students active in this many days"),
+) -> List[Dict[str, Any]]:
+    return service.students_by_department(active_days)
+
+
+@router.get("/analytics/recent", response_model=List[StudentResponse])
+def analytics_recent(limit: int = Query(5, ge=1, le=100)):
+    return service.recent_students(limit)
+
+
+@router.get("/analytics/active", response_model=StudentPage)
+def analytics_active(
+    days: int = Query(7, ge=1, le=365),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise ServiceError(str(e))
+    return _page(service.active_students(days=days, after=after, limit=limit))
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+@router.get("/export/{table}")
+def export_table(
+    table: str,
+    format: str = Query("csv", description="csv, ndjson, or parquet/arrow when pyarrow is installed"),
+    since: Optional[datetime] = Query(None, description="Only rows at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only rows before this time"),
+    gzip: bool = Query(False, description="Gzip CSV/NDJSON (Parquet and Arrow compress internally)"),
+):
+    """Stream a whole table (or a time range of it) as a file download"""
+    try:
+        export.check_export(table, format)
+    except ValueError as e:
+        raise ServiceError(str(e))
+    filename = export.file_name(table, format, gzip)
+    # A sync iterator: Starlette pulls each chunk in its threadpool
+    return StreamingResponse(
+        export.stream_export(table, format, since, until, gzip),
+        media_type="application/gzip" if filename.endswith(".gz") else export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,54 +1,138 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from agents import Runner
-from openai.types.responses import ResponseTextDeltaEvent
-from app.agent.agent import handoff_agent, student_management_agent, campus_analytics_agent
+from app.api.batch import NDJSON_HEADERS
+from app.api.schemas import ChatRequest, BatchChatRequest
+from app.api.sse import SSE_HEADERS, stream_activity
+from app.api.singleflight import singleflight
+from app.services.events import activity_feed
+from app.services.scheduler import scheduler
+
+router = APIRouter()
 
 
-class ChatRequest(BaseModel):
-    query: str
+def runs():
+    """Agent run machinery (app.api.runs), imported on first use.
+
+    Keeps the agents SDK, openai and the tool modules out of application
+    startup; the import is cached after the first request (or warm-up).
+    """
+    from app.api import runs as module
+    return module
+
 
-router = APIRouter()
 @router.post("/chat")
 async def chat_endpoint(request: ChatRequest):
-    result = await Runner.run(handoff_agent, request.query)
-    # Make sure it's JSON serializable
-    if hasattr(result, "output"):
-        return {"response": str(result.output)}
-    return {"response": str(result)}
+    return await runs().run_agent("/chat", request)
 
 # /chat/stream: Streaming chat responses (SSE)
+# Emits `delta`, `tool_call`, `tool_output`, `handoff` and `done`/`error` events with
+# keep-alive heartbeats; the agent run is cancelled as soon as the client disconnects.
+# Identical read-only streams in flight share one run whose events are fanned out.
 @router.post("/chat/stream")
-async def chat_stream_endpoint(request: ChatRequest):
-    result = Runner.run_streamed(handoff_agent, input=request.query)
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    return StreamingResponse(
+        await runs().open_stream(request, http_request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
-    async def event_generator():
-        async for event in result.stream_events():
-            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-                yield event.data.delta
+# /chat/batch: independent queries run concurrently (bounded by `concurrency`), one NDJSON
+# line per query as it finishes: {"index", "status", "response", ...} or {"index", "status", "error"},
+# then a {"done": true, ...} summary line. A failed query does not stop the others.
+@router.post("/chat/batch")
+async def chat_batch_endpoint(request: BatchChatRequest):
+    return StreamingResponse(
+        runs().run_batch(request),
+        media_type="application/x-ndjson",
+        headers=NDJSON_HEADERS,
+    )
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+# /events/activity: live activity_logs events and student-count changes (SSE), instead of
+# polling /analytics. Filters take comma-separated values; reconnects resume from Last-Event-ID.
+# A department filter lets every student_deleted event through: the deleted row held the department.
+@router.get("/events/activity")
+async def activity_events(
+    http_request: Request,
+    department: Optional[str] = None,
+    activity_type: Optional[str] = None,
+    summary: bool = True,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    if last_event_id is None and last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an activity id")
+    subscription = await activity_feed.subscribe(
+        last_event_id=last_event_id,
+        departments={d.strip().lower() for d in department.split(",") if d.strip()} if department else None,
+        activity_types={t.strip() for t in activity_type.split(",") if t.strip()} if activity_type else None,
+        summary=summary,
+    )
+    return StreamingResponse(
+        stream_activity(http_request, activity_feed, subscription),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 @router.post("/students")
 async def students(request: ChatRequest):
-    result = await Runner.run(student_management_agent, request.query)
-    # Make sure it's JSON serializable
-    if hasattr(result, "output"):
-        return {"response": str(result.output)}
-    return {"response": str(result)}
+    return await runs().run_agent("/students", request)
 
 
 # /analytics: Returns JSON with statistics
 @router.post("/analytics")
 async def analytics_endpoint(request: ChatRequest):
-    result = await Runner.run(campus_analytics_agent, request.query)
-    # Make sure it's JSON serializable
-    if hasattr(result, "output"):
-        return {"response": str(result.output)}
-    return {"response": str(result)}
+    return await runs().run_agent("/analytics", request)
+
+# Conversation sessions: history size and accumulated token usage
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    from app.services.sessions import get_session_store
+    state = get_session_store().get_state(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return state
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    from app.services.sessions import get_session_store
+    get_session_store().clear(session_id)
+    return {"message": f"Session {session_id} cleared."}
+
+# Token, latency and cost accounting aggregated over a time window
+@router.get("/admin/usage")
+async def usage_report(group_by: str = "agent", minutes: float = 60):
+    from app.services.usage import get_usage_store, GROUP_COLUMNS
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {sorted(GROUP_COLUMNS)}")
+    return {"group_by": group_by, "minutes": minutes, "rows": get_usage_store().aggregate(group_by, minutes)}
+
+# Runs started vs. requests that joined an identical run already in flight
+@router.get("/admin/singleflight")
+async def singleflight_report():
+    return singleflight.stats
+
+# Speculative tool calls issued vs. used, overall and per tool
+@router.get("/admin/prefetch")
+async def prefetch_report():
+    from app.agent.prefetch import prefetch_stats
+    return prefetch_stats.report()
+
+# Run slots, provider backoff and queue wait per priority lane
+@router.get("/admin/scheduler")
+async def scheduler_report():
+    return scheduler.stats()
+
+# Live activity feed: listeners, events delivered and subscribers that fell behind
+@router.get("/admin/events")
+async def events_report():
+    return activity_feed.report()
 
 # Example root endpoint
 @router.get("/")
 async def root():
-    return {"message": "Campus Admin Agent API is running."}
\ No newline at end of file
+    return {"message": "Campus Admin Agent API is running."}
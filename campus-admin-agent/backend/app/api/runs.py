@@ -0,0 +1,207 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import HTTPException
+from agents import Runner, RunConfig, ModelSettings, MaxTurnsExceeded
+from app.agent.agent import handoff_agent, student_management_agent, campus_analytics_agent
+from app.agent.context import RequestContext
+from app.agent.fanout import FanoutResult, plan_fanout, run_fanout
+from app.agent.prefetch import start_prefetch, finish_prefetch
+from app.api.batch import stream_batch
+from app.api.schemas import ChatRequest, BatchChatRequest
+from app.api.sse import stream_agent_run
+from app.models.models import consistency_key
+from app.api.singleflight import singleflight, coalesce_key, is_read_only
+from app.services.sessions import open_session, record_session_usage
+from app.services.usage import (
+    UsageTracker, TokenBudgetExceeded, RateBudgetExceeded, admit_run,
+    BUDGET_EXCEEDED_MESSAGE, DEGRADED_MAX_OUTPUT_TOKENS, DEGRADED_MAX_TURNS,
+)
+from app.services.scheduler import scheduler, Lane, Lease, Overloaded, throttle_delay
+
+# Agent run machinery behind the chat routes. Importing this module loads the
+# agents SDK, openai and every tool, so app.api.routes imports it on first use.
+
+ROUTE_AGENTS = {
+    "/chat": handoff_agent,
+    "/students": student_management_agent,
+    "/analytics": campus_analytics_agent,
+    "/chat/batch": handoff_agent,
+}
+# Batch items retry a 429 this many times, waiting out Retry-After (capped) in between
+BATCH_RETRIES = 2
+BATCH_MAX_RETRY_WAIT = 30
+
+
+def lane_for(request: ChatRequest, route: str) -> Lane:
+    """Interactive streams and student writes first, bulk analytics last"""
+    if route == "/chat/stream" or (route == "/students" and not is_read_only(request.query)):
+        return Lane.INTERACTIVE
+    if route in ("/analytics", "/chat/batch"):
+        return Lane.BULK
+    return Lane.STANDARD
+
+
+async def acquire_slot(request: ChatRequest, route: str) -> Lease:
+    """Wait for a run slot; a fast 429 with Retry-After when the scheduler is saturated"""
+    try:
+        return await scheduler.acquire(lane_for(request, route))
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def raise_if_throttled(error: Exception):
+    """Turn a provider 429/503 into our own 429 so clients back off too"""
+    if throttle_delay(error) is not None:
+        raise HTTPException(
+            status_code=429, detail="LLM provider is throttling requests",
+            headers={"Retry-After": str(scheduler.retry_after())},
+        ) from error
+
+
+def build_run_state(request: ChatRequest, route: str):
+    """Create the run context, (optional) session and run options for a request.
+
+    Raises 429 when the per-minute token budget is exhausted; close to the
+    budget the run is degraded to fewer turns and shorter completions.
+    """
+    try:
+        degraded = admit_run()
+    except RateBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    context = RequestContext(session_id=request.session_id)
+    # Reads after a write by this conversation (or this request) go to the primary database
+    consistency_key.set(request.session_id or context.request_id)
+    session = None
+    if request.session_id:
+        session, context.tool_cache = open_session(request.session_id)
+    if is_read_only(request.query):
+        # Likely tools start now and overlap the first LLM call
+        start_prefetch(context, request.query)
+    options = {
+        "context": context,
+        "session": session,
+        "hooks": UsageTracker(context.request_id, route, request.session_id),
+    }
+    if degraded:
+        options["run_config"] = RunConfig(model_settings=ModelSettings(max_tokens=DEGRADED_MAX_OUTPUT_TOKENS))
+        options["max_turns"] = DEGRADED_MAX_TURNS
+    return context, options
+
+
+def usage_to_dict(usage) -> Dict[str, int]:
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+async def finish_run(result, context: RequestContext, tracker: UsageTracker) -> Dict[str, Any]:
+    """Usage (and session totals) to report alongside a completed run"""
+    fanout = isinstance(result, FanoutResult)
+    usage = usage_to_dict(result.usage if fanout else result.context_wrapper.usage)
+    extra: Dict[str, Any] = {"usage": usage, "accounting": await tracker.finalize()}
+    if fanout:
+        extra["branches"] = result.branches
+    prefetch = finish_prefetch(context.tool_cache)
+    if prefetch:
+        extra["prefetch"] = prefetch
+    if context.session_id:
+        state = await record_session_usage(context.session_id, usage)
+        extra["session_id"] = context.session_id
+        extra["session_usage"] = {key: state[key] for key in ("turns", *usage.keys(), "history_tokens")}
+    return extra
+
+
+async def _run_agent(agent, request: ChatRequest, route: str) -> Dict[str, Any]:
+    lease = await acquire_slot(request, route)
+    error: Optional[BaseException] = None
+    context = None
+    try:
+        context, options = build_run_state(request, route)
+        tracker = options["hooks"]
+        # Multi-part read-only questions to the orchestrator run their specialists in parallel
+        branches = []
+        if agent is handoff_agent and not request.session_id and is_read_only(request.query):
+            branches = plan_fanout(request.query)
+        try:
+            if branches:
+                result = await run_fanout(branches, **options)
+            else:
+                result = await Runner.run(agent, request.query, **options)
+        except (TokenBudgetExceeded, MaxTurnsExceeded):
+            return {"response": BUDGET_EXCEEDED_MESSAGE, "budget_exceeded": True,
+                    "accounting": await tracker.finalize("budget_exceeded")}
+        except Exception as e:
+            error = e
+            await tracker.finalize("error")
+            raise_if_throttled(e)
+            raise
+        # Make sure it's JSON serializable
+        return {"response": str(result.final_output), "queue_wait_ms": lease.queue_wait_ms,
+                **await finish_run(result, context, tracker)}
+    finally:
+        if context is not None:
+            finish_prefetch(context.tool_cache)
+        lease.release(error)
+
+
+async def run_agent(route: str, request: ChatRequest) -> Dict[str, Any]:
+    """Run the route's agent, sharing the run with identical read-only requests already in flight"""
+    agent = ROUTE_AGENTS[route]
+    key = coalesce_key(route, request.query, request.session_id)
+    if key is None:
+        return await _run_agent(agent, request, route)
+    response, shared = await singleflight.run(key, lambda: _run_agent(agent, request, route))
+    return {**response, "coalesced": True} if shared else response
+
+
+async def start_stream(request: ChatRequest, client) -> AsyncIterator[str]:
+    lease = await acquire_slot(request, "/chat/stream")
+    try:
+        context, options = build_run_state(request, "/chat/stream")
+    except BaseException:
+        lease.release()
+        raise
+    tracker = options["hooks"]
+    result = Runner.run_streamed(handoff_agent, input=request.query, **options)
+
+    async def on_complete(result) -> Dict[str, Any]:
+        return {"queue_wait_ms": lease.queue_wait_ms, **await finish_run(result, context, tracker)}
+
+    async def on_close(outcome: str, error: Optional[BaseException]):
+        finish_prefetch(context.tool_cache)
+        lease.release(error)
+        # Successful runs are finalized in finish_run
+        if outcome != "ok":
+            budget = isinstance(error, (TokenBudgetExceeded, MaxTurnsExceeded))
+            await tracker.finalize("budget_exceeded" if budget else outcome)
+
+    return stream_agent_run(client, result, on_complete=on_complete, on_close=on_close)
+
+
+async def open_stream(request: ChatRequest, client) -> AsyncIterator[str]:
+    """SSE events for /chat/stream, joining an identical read-only stream already in flight"""
+    key = coalesce_key("/chat/stream", request.query, request.session_id)
+    if key is None:
+        return await start_stream(request, client)
+    return await singleflight.stream(key, lambda broadcast: start_stream(request, broadcast))
+
+
+def run_batch(request: BatchChatRequest) -> AsyncIterator[str]:
+    """NDJSON results for /chat/batch, running up to `request.concurrency` queries at a time"""
+
+    async def handle(index: int, query: str) -> Dict[str, Any]:
+        for attempt in range(BATCH_RETRIES + 1):
+            try:
+                return await run_agent("/chat/batch", ChatRequest(query=query))
+            except HTTPException as e:
+                if e.status_code != 429 or attempt == BATCH_RETRIES:
+                    raise
+                retry_after = int((e.headers or {}).get("Retry-After", "1"))
+                await asyncio.sleep(min(max(retry_after, 1), BATCH_MAX_RETRY_WAIT))
+
+    return stream_batch(request.queries, handle, request.concurrency)
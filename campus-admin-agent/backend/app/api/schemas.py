@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.api.batch import CHAT_BATCH_CONCURRENCY, CHAT_BATCH_MAX_CONCURRENCY, CHAT_BATCH_MAX_ITEMS
+from app.utils.pydentic_model import StudentResponse
+
+
+class ChatRequest(BaseModel):
+    query: str
+    session_id: Optional[str] = Field(
+        None, min_length=1, max_length=128,
+        description="Conversation ID; when set, history is kept server-side under a token budget",
+    )
+
+
+class BatchChatRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=CHAT_BATCH_MAX_ITEMS)
+    concurrency: int = Field(
+        CHAT_BATCH_CONCURRENCY, ge=1, le=CHAT_BATCH_MAX_CONCURRENCY,
+        description="Queries run at the same time",
+    )
+
+
+class StudentUpdate(BaseModel):
+    """Partial update for PATCH /api/students/{student_id}; omitted fields are left unchanged"""
+    name: Optional[str] = Field(None, min_length=2, max_length=100)
+    department: Optional[str] = Field(None, min_length=2, max_length=100)
+    email: Optional[str] = Field(None, max_length=100)
+    is_active: Optional[bool] = None
+
+
+class StudentPage(BaseModel):
+    items: List[StudentResponse]
+    total_count: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page")
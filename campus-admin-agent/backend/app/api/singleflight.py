@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import re
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Queries that may change data are never merged, even if the text is identical
+WRITE_INTENT = re.compile(
+    r"\b(add|create|register|enrol|enroll|insert|update|change|edit|modify|set|rename|"
+    r"delete|remove|drop|deactivate|activate|mark|move|transfer|assign|reassign|enable|disable|"
+    r"switch|replace)\b",
+    re.IGNORECASE,
+)
+# Only questions that start like a lookup are merged; a word list of writes
+# cannot catch every phrasing of one ("Ali is in CS now", "put Ali in CS")
+READ_ONLY_QUERY = re.compile(
+    r"^(how many|how much|what|which|who|whose|when|where|is|are|was|were|do|does|did|"
+    r"list|show|display|get|find|search|look up|count|give me|tell me|summari[sz]e|compare)\b"
+)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s@.-]", " ", query.lower()).split()).strip(" .")
+
+
+def is_read_only(query: str) -> bool:
+    return not WRITE_INTENT.search(query)
+
+
+def is_lookup(query: str) -> bool:
+    """True for questions that read like a lookup and mention no write"""
+    return bool(READ_ONLY_QUERY.match(normalize_query(query))) and is_read_only(query)
+
+
+def coalesce_key(route: str, query: str, session_id: Optional[str]) -> Optional[str]:
+    """Key under which identical concurrent requests share one run, or None if they must not.
+
+    Session requests depend on their own history and anything but a plain
+    lookup may have side effects, so neither is ever merged.
+    """
+    if not SINGLE_FLIGHT_ENABLED or session_id or not is_lookup(query):
+        return None
+    return f"{route}:{normalize_query(query)}"
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """Fans the chunks of one producer out to every subscriber.
+
+    Chunks are kept for the lifetime of the flight, so a subscriber that joins
+    late replays the stream from the start and sees exactly what the first
+    caller saw.
+    """
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def is_disconnected(self) -> bool:
+        # Used as the producer's "client": it is gone once every subscriber left
+        return self.subscribers == 0
+
+    def leave(self):
+        self.subscribers -= 1
+        if self.subscribers == 0 and self.task and not self.task.done():
+            self.task.cancel()
+
+    async def produce(self, source: AsyncIterator[Any]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        finally:
+            self.done = True
+            self._notify()
+
+    async def changed(self):
+        """Wait for the next chunk or the end of the stream"""
+        await self._changed.wait()
+
+
+class _Subscription:
+    """One subscriber's replay of a broadcast.
+
+    Leaves the broadcast once, when exhausted, closed or garbage-collected,
+    even if it was never iterated (e.g. the client went away before the
+    response started).
+    """
+
+    def __init__(self, broadcast: _Broadcast):
+        self._broadcast = broadcast
+        self._index = 0
+        self._leave = weakref.finalize(self, broadcast.leave)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        broadcast = self._broadcast
+        try:
+            while self._index >= len(broadcast.chunks):
+                if broadcast.done or not self._leave.alive:
+                    raise StopAsyncIteration
+                await broadcast.changed()
+        except BaseException:
+            self._leave()
+            raise
+        self._index += 1
+        return broadcast.chunks[self._index - 1]
+
+    async def aclose(self):
+        self._leave()
+
+
+class SingleFlight:
+    """Share one in-flight agent run between identical concurrent requests"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.stats = {"runs": 0, "coalesced": 0}
+
+    def _forget(self, registry: Dict[str, Any], key: str, entry: Any):
+        if registry.get(key) is entry:
+            del registry[key]
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> tuple:
+        """Await `factory()` once per key; returns (result, shared)"""
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(self._calls, key, call))
+            self.stats["runs"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"Coalesced request onto in-flight run for '{key}'")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            call.waiters -= 1
+            # Nobody is waiting any more: stop the run instead of finishing it for no one
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    async def stream(self, key: str, factory: Callable[[Any], Awaitable[AsyncIterator[Any]]]) -> AsyncIterator[Any]:
+        """Subscribe to the stream for `key`, starting it with `await factory(client)` if needed.
+
+        `factory` receives an object whose `is_disconnected()` turns true when all
+        subscribers have left. Errors raised by `factory` (e.g. admission
+        rejections) are raised to every caller waiting on that flight.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._produce(key, broadcast, factory))
+            self.stats["runs"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            logger.info(f"Coalesced stream onto in-flight run for '{key}'")
+
+        broadcast.subscribers += 1
+        try:
+            await asyncio.shield(broadcast.ready)
+        except BaseException:
+            broadcast.leave()
+            raise
+        return _Subscription(broadcast)
+
+    async def _produce(self, key: str, broadcast: _Broadcast, factory: Callable[[Any], Awaitable[AsyncIterator[Any]]]):
+        try:
+            try:
+                source = await factory(broadcast)
+            except asyncio.CancelledError:
+                broadcast.ready.cancel()
+                raise
+            except Exception as e:
+                broadcast.ready.set_exception(e)
+                return
+            broadcast.ready.set_result(None)
+            await broadcast.produce(source)
+        finally:
+            self._forget(self._streams, key, broadcast)
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+# Seconds of silence before a keep-alive comment is sent to the client
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+}
+
+_END = object()
+
+
+def format_sse(data: Any, event: Optional[str] = None, event_id: Optional[Any] = None) -> str:
+    """Frame a payload as a Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data, default=str)
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+def format_heartbeat() -> str:
+    return ": keep-alive\n\n"
+
+
+def run_event_to_sse(event) -> Optional[tuple]:
+    """Map an agents stream event to an (event name, payload) pair, or None to skip it"""
+    if event.type == "raw_response_event":
+        # ResponseTextDeltaEvent, matched by type so openai is not imported at startup
+        if getattr(event.data, "type", None) == "response.output_text.delta" and event.data.delta:
+            return "delta", {"delta": event.data.delta}
+        return None
+
+    if event.type == "run_item_stream_event":
+        item = event.item
+        if event.name == "tool_called":
+            raw = item.raw_item
+            return "tool_call", {
+                "agent": item.agent.name,
+                "tool": getattr(raw, "name", None),
+                "arguments": getattr(raw, "arguments", None),
+            }
+        if event.name == "tool_output":
+            return "tool_output", {"agent": item.agent.name, "output": str(item.output)}
+        if event.name == "handoff_occured":
+            return "handoff", {"from": item.source_agent.name, "to": item.target_agent.name}
+    return None
+
+
+# Strong references to fire-and-forget cleanup tasks
+_background_tasks: set = set()
+
+
+async def stream_agent_run(request: Request, result, heartbeat: float = SSE_HEARTBEAT_SECONDS,
+                           on_complete: Optional[Callable[[Any], Awaitable[Dict[str, Any]]]] = None,
+                           on_close: Optional[Callable[[str, Optional[BaseException]], Awaitable[None]]] = None) -> AsyncIterator[str]:
+    """Stream a `Runner.run_streamed` result as SSE.
+
+    Events are `delta`, `tool_call`, `tool_output`, `handoff`, then `done` or
+    `error`. A keep-alive comment is sent after `heartbeat` seconds of silence.
+    If the client goes away the agent run is cancelled, which aborts its
+    in-flight LLM request and releases tool resources instead of running to
+    completion for nobody. `on_complete(result)` may add fields to `done`;
+    `on_close(outcome, error)` runs last with outcome "ok", "error" or "cancelled".
+    `request` only needs an async `is_disconnected()`, so a fan-out broadcaster
+    can stand in for the HTTP request.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+    outcome = {"status": "cancelled", "error": None}
+
+    async def pump():
+        try:
+            async for event in result.stream_events():
+                mapped = run_event_to_sse(event)
+                if mapped:
+                    await queue.put(mapped)
+            done = {
+                "final_output": str(result.final_output) if result.final_output is not None else "",
+                "last_agent": result.last_agent.name,
+            }
+            if on_complete:
+                done.update(await on_complete(result))
+            outcome["status"] = "ok"
+            await queue.put(("done", done))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming run failed: {str(e)}")
+            outcome.update(status="error", error=e)
+            await queue.put(("error", {"message": str(e)}))
+        await queue.put(_END)
+
+    pump_task = asyncio.create_task(pump())
+    event_id = 0
+    completed = False
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield format_heartbeat()
+                continue
+            if item is _END:
+                completed = True
+                break
+            event_id += 1
+            name, payload = item
+            yield format_sse(payload, event=name, event_id=event_id)
+    finally:
+        if not completed:
+            logger.info("Client disconnected from stream, cancelling agent run")
+            outcome["status"] = "cancelled"
+        result.cancel()
+        pump_task.cancel()
+        if on_close:
+            # Scheduled separately: this generator may itself be cancelled right now
+            task = asyncio.ensure_future(on_close(outcome["status"], outcome["error"]))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        await asyncio.gather(pump_task, return_exceptions=True)
+
+
+async def stream_activity(request: Request, feed, subscription, heartbeat: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Stream a live activity feed subscription (app/services/events.py) as SSE.
+
+    Events are `activity` (id = the activity_logs id, so a reconnecting client
+    resumes with Last-Event-ID) and `summary` (student counts, sent on connect
+    and whenever they change). The subscription is dropped when the client goes.
+    """
+    from app.services.events import iter_events
+    try:
+        async for item in iter_events(feed, subscription, heartbeat):
+            if item is None:
+                if await request.is_disconnected():
+                    break
+                yield format_heartbeat()
+                continue
+            name, payload, event_id = item
+            yield format_sse(payload, event=name, event_id=event_id)
+    finally:
+        feed.unsubscribe(subscription)
@@ -0,0 +1,82 @@
+"""Export students or activity logs to CSV, NDJSON, Parquet or Arrow files.
+
+Rows are streamed from the database in fixed-size chunks (see
+app/services/export.py), so memory stays flat for any table size. With
+`--partition` the export is split into one file per day, month or year of the
+table's time column. `--output -` writes a single file to stdout.
+
+Run from the backend directory:
+    python -m app.export activity_logs --format csv --gzip --partition month --output exports/
+    python -m app.export students --format parquet --since 2025-01-01 --output exports/
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from app.utils.logging_config import configure_logging
+
+logger = logging.getLogger("app.export")
+
+
+def parse_time(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not an ISO date or datetime (e.g. 2025-01-31 or 2025-01-31T08:00)")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    from app.services.export import EXPORT_CHUNK_ROWS, EXPORT_TABLES, FORMAT_EXTENSIONS, PARTITION_FORMATS
+    parser = argparse.ArgumentParser(prog="python -m app.export", description=__doc__.splitlines()[0])
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", dest="fmt", choices=list(FORMAT_EXTENSIONS), default="csv",
+                        help="parquet and arrow need pyarrow (default: csv)")
+    parser.add_argument("--output", default="exports", help="Directory to write into, or - for stdout (default: exports)")
+    parser.add_argument("--since", type=parse_time, help="Only rows at or after this time")
+    parser.add_argument("--until", type=parse_time, help="Only rows before this time")
+    parser.add_argument("--partition", choices=list(PARTITION_FORMATS), help="One file per time period")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Gzip CSV/NDJSON; Parquet and Arrow use their internal compression instead")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS,
+                        help=f"Rows fetched and encoded at a time (default: {EXPORT_CHUNK_ROWS})")
+    args = parser.parse_args(argv)
+    if args.output == "-" and args.partition:
+        parser.error("--partition writes several files and needs an --output directory")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_logging()
+    from app.services.export import check_export, export_to_directory, stream_export
+
+    try:
+        check_export(args.table, args.fmt, args.partition)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    started = time.perf_counter()
+    if args.output == "-":
+        out = sys.stdout.buffer
+        for data in stream_export(args.table, args.fmt, args.since, args.until, args.gzip, args.chunk_rows):
+            out.write(data)
+        out.flush()
+        return 0
+
+    files = export_to_directory(args.table, args.output, args.fmt, args.since, args.until,
+                                args.partition, args.gzip, args.chunk_rows)
+    for f in files:
+        print(f"{f['path']}\t{f['rows']} rows\t{f['bytes']} bytes")
+    rows = sum(f["rows"] for f in files)
+    elapsed = time.perf_counter() - started
+    print(f"Exported {rows} {args.table} rows into {len(files)} file(s) under "
+          f"{os.path.abspath(args.output)} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
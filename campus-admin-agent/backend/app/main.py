@@ -1,18 +1,117 @@
+import asyncio
+import logging
+import math
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
 
 from app.api.routes import router as api_router
+from app.api.rest import router as rest_router, service_error_handler
+from app.models.models import READ_YOUR_WRITES_COOKIE, open_request_window
+from app.services import service
+from app.services.service import ServiceError
+from app.utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# When to load the agents SDK, openai, the tools and the agent definitions:
+#   background - right after startup, in a thread, without delaying readiness (default)
+#   eager      - before the server accepts requests
+#   none       - on the first request that needs them
+APP_WARMUP = os.getenv("APP_WARMUP", "background").lower()
+
+
+def warm_up():
+    """Import the agent run machinery so the first request does not pay for it"""
+    from app.api import runs  # noqa: F401
+
+
+def clear_session_tool_caches():
+    """Write listener: cached tool results of every conversation session are stale after a write"""
+    # The sessions module loads the agents SDK, so it is imported on the first write, not at startup
+    from app.services.sessions import clear_tool_caches
+    clear_tool_caches()
+
+
+def register_write_listeners():
+    """Hook cache invalidation into the service layer's committed writes; safe to call more than once.
+
+    The session store is one file shared by all workers, so a write in any
+    worker clears the cached reads of every session.
+    """
+    if clear_session_tool_caches not in service.write_listeners:
+        service.write_listeners.append(clear_session_tool_caches)
+
+
+def _log_warmup(task: asyncio.Future):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Warm-up failed: {str(task.exception())}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    register_write_listeners()
+    if APP_WARMUP == "eager":
+        warm_up()
+    elif APP_WARMUP == "background":
+        app.state.warmup = asyncio.ensure_future(asyncio.to_thread(warm_up))
+        app.state.warmup.add_done_callback(_log_warmup)
+    yield
+    # Only close the LLM connection pool if something created it
+    llm = sys.modules.get("app.agent.llm")
+    if llm is not None:
+        await llm.close_llm_client()
+
+
+class ReadYourWritesMiddleware:
+    """Hands a request's read-your-writes window to the client as a cookie, so every worker sees it (models.py)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        window = open_request_window(HTTPConnection(scope).cookies.get(READ_YOUR_WRITES_COOKIE))
+
+        async def send_with_window(message):
+            # A write made after the headers went out (mid-stream) only holds within this worker
+            if message["type"] == "http.response.start" and window["wrote"]:
+                max_age = max(1, math.ceil(window["wrote"] - time.time()))
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={window['wrote']:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_window)
+
 
-app = FastAPI()
+def create_app() -> FastAPI:
+    """Build the API application; heavy modules load lazily (see APP_WARMUP)"""
+    configure_logging()
+    app = FastAPI(title="Campus Admin Agent API", lifespan=lifespan)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(ReadYourWritesMiddleware)
 
-app.include_router(api_router)
+    app.include_router(api_router)
+    app.include_router(rest_router)
+    app.add_exception_handler(ServiceError, service_error_handler)
+    return app
 
 
+app = create_app()
@@ -1,9 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, Boolean, Text, Insert, Update, Delete
+from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
+from contextvars import ContextVar
+import itertools
 import os
+import threading
+import time
 from datetime import datetime
+from typing import Dict, Optional
 
 load_dotenv()  # Load environment variables from a .env file
 # Accept multiple env var names: DATABASE-URI (preferred), DATABASE_URI, DATABASE_URL
@@ -17,7 +22,127 @@ if not DATABASE_URL:
     raise ValueError("Database URL not set. Define DATABASE-URI, DATABASE_URI, or DATABASE_URL in .env")
 
 engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# =============================================================================
+# READ/WRITE ROUTING
+# =============================================================================
+# Optional read replicas, comma-separated. Sessions send reads to one of them
+# (picked round-robin, then kept for the session) and writes to the primary.
+# A session that has written (flush or DML) stays on the primary after that.
+# After a commit that changed data, reads for the same consistency key (the
+# conversation session, or the X-Session-ID of a REST call) go to the primary
+# for READ_YOUR_WRITES_SECONDS, so a caller never reads around its own write.
+# That map lives in one process, and app.serve runs several workers, so the
+# window also travels with the client: the response to a request that wrote
+# sets the READ_YOUR_WRITES_COOKIE cookie to the window's end (wall clock),
+# and whichever worker gets the next request reads from the primary until then.
+# A local stand-in for a replica: python -m app.models.replica --help
+DATABASE_READ_URIS = [u.strip() for u in os.getenv("DATABASE_READ_URIS", "").split(",") if u.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+read_engines = [create_engine(url) for url in DATABASE_READ_URIS]
+_replicas = itertools.cycle(read_engines)
+_replica_lock = threading.Lock()
+
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+consistency_key: ContextVar[Optional[str]] = ContextVar("consistency_key", default=None)
+_recent_writes: Dict[str, float] = {}
+# Per HTTP request: {"until": window end from the cookie, "wrote": window end opened by this request}
+_request_window: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_window", default=None)
+
+
+def open_request_window(cookie: Optional[str]) -> Dict[str, float]:
+    """Start a request's window from its cookie; the returned dict shows whether the request wrote"""
+    try:
+        until = float(cookie) if cookie else 0.0
+    except ValueError:
+        until = 0.0
+    window = {"until": until, "wrote": 0.0}
+    _request_window.set(window)
+    return window
+
+
+def note_write() -> None:
+    """Open the read-your-writes window for the current consistency key and HTTP request"""
+    if not read_engines:
+        return
+    window = _request_window.get()
+    if window is not None:
+        window["until"] = window["wrote"] = time.time() + READ_YOUR_WRITES_SECONDS
+    key = consistency_key.get()
+    if key is None:
+        return
+    now = time.monotonic()
+    if len(_recent_writes) > 1000:
+        for stale in [k for k, until in _recent_writes.items() if until <= now]:
+            _recent_writes.pop(stale, None)
+    _recent_writes[key] = now + READ_YOUR_WRITES_SECONDS
+
+
+def in_write_window() -> bool:
+    window = _request_window.get()
+    if window is not None and window["until"] > time.time():
+        return True
+    key = consistency_key.get()
+    return key is not None and _recent_writes.get(key, 0) > time.monotonic()
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica unless it is pinned to the primary (info={"primary": True}),
+    has written anything, or the caller wrote recently"""
+
+    def primary_bind(self):
+        return super().get_bind()
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if isinstance(clause, (Insert, Update, Delete)):
+            _pin_to_primary(self)
+        if not read_engines or self.info.get("primary") or self.info.get("wrote"):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        replica = self.info.get("replica")
+        if replica is None:
+            # Decided once per session, so its statements never straddle two databases
+            if in_write_window():
+                self.info["primary"] = True
+                return super().get_bind(mapper=mapper, clause=clause, **kw)
+            with _replica_lock:
+                replica = self.info["replica"] = next(_replicas)
+        return replica
+
+
+def _pin_to_primary(session: Session) -> None:
+    # From the first write on, the session reads and writes on the primary only;
+    # "unannounced" opens the read-your-writes window when the write commits
+    session.info["wrote"] = True
+    session.info["unannounced"] = True
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flushing_write(session, flush_context, instances):
+    # Fires before any statement of a flush that has changes to write
+    _pin_to_primary(session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _committed_write(session):
+    if session.info.pop("unannounced", False):
+        note_write()
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _rolled_back_write(session, previous_transaction):
+    session.info.pop("unannounced", None)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+
+def primary_session() -> RoutingSession:
+    """Session pinned to the primary, for writes and the reads they depend on"""
+    return SessionLocal(info={"primary": True})
+
+
 Base = declarative_base()
 
 # Database Models
@@ -60,4 +185,10 @@ if __name__ == "__main__":
     print("Creating tables...")
     Base.metadata.create_all(engine)
     print("Tables created.")
+
+    # Run as a script (python app/models/models.py), the backend directory is not on the path
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from app.services.search import ensure_search_index
+    print("Student search index ready." if ensure_search_index(engine) else "Student search index unavailable.")
   
\ No newline at end of file
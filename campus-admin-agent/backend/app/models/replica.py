@@ -0,0 +1,76 @@
+"""Keep a local SQLite copy of the database to stand in for a read replica.
+
+Copies the primary with SQLite's online backup API, once or every
+`--interval` seconds. The copy lags the primary by up to that interval, much
+like asynchronous replication, which makes read-your-writes routing easy to
+observe. Point DATABASE_READ_URIS at the copy:
+
+    python -m app.models.replica --target ./replica.db --interval 5
+    DATABASE_READ_URIS=sqlite:///./replica.db uvicorn app.main:app
+
+Postgres replicas come from streaming replication instead; this is SQLite only.
+"""
+import argparse
+import logging
+import sqlite3
+import time
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger("app.models.replica")
+
+
+def sqlite_path(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or not parsed.database or parsed.database == ":memory:":
+        raise ValueError(f"Not a SQLite database file: {url}")
+    return parsed.database
+
+
+def copy_database(source_url: str, target: str) -> float:
+    """Copy the SQLite database at `source_url` into the file `target`; returns the seconds taken.
+
+    The copy is written in place, so connections already open on `target` see
+    the new contents on their next read.
+    """
+    started = time.perf_counter()
+    source = sqlite3.connect(sqlite_path(source_url))
+    destination = sqlite3.connect(target)
+    try:
+        source.backup(destination)
+    finally:
+        destination.close()
+        source.close()
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[list] = None) -> int:
+    from app.models.models import DATABASE_URL
+    from app.utils.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(prog="python -m app.models.replica", description=__doc__.splitlines()[0])
+    parser.add_argument("--target", required=True, help="SQLite file to write the copy to")
+    parser.add_argument("--source", default=DATABASE_URL, help="Primary database URL (default: DATABASE-URI)")
+    parser.add_argument("--interval", type=float, default=0, help="Seconds between copies; 0 copies once")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    try:
+        sqlite_path(args.source)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    while True:
+        elapsed = copy_database(args.source, args.target)
+        logger.info(f"Copied {args.source} to {args.target} in {elapsed:.2f}s")
+        if args.interval <= 0:
+            return 0
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
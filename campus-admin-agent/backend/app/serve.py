@@ -0,0 +1,212 @@
+"""Production server: N uvicorn workers forked from one preloaded master.
+
+The master imports the app, the agent definitions, the tools and the FAQ data
+(optionally also building the RAG/FAISS index) once, freezes the garbage
+collector so those objects stay in shared copy-on-write pages, binds the
+listening socket and forks the workers. It restarts workers that exit, e.g.
+after `--max-requests` requests, and on SIGTERM/SIGINT drains them: workers
+stop accepting, finish in-flight requests within `--graceful-timeout`, and
+anything left after that is killed.
+
+Run from the backend directory:
+    python -m app.serve --workers 16 --port 8000 --max-requests 5000
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Tuple
+
+from app.utils.logging_config import configure_logging
+
+logger = logging.getLogger("app.serve")
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+# Recycle a worker after this many requests (0 never), plus up to the jitter so they don't restart together
+SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", "0"))
+SERVE_MAX_REQUESTS_JITTER = int(os.getenv("SERVE_MAX_REQUESTS_JITTER", "0"))
+# Seconds a draining worker gets to finish in-flight requests
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+# A worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_UPTIME = 1.0
+
+
+def preload(rag: bool = False):
+    """Import everything read-only that workers would otherwise load separately"""
+    # Workers inherit the loaded modules, so there is nothing left to warm up after fork
+    os.environ["APP_WARMUP"] = "none"
+    started = time.perf_counter()
+    import app.main  # noqa: F401
+    from app.api import runs  # noqa: F401  agents SDK, openai, tools, FAQ data, agent definitions
+    if rag:
+        from app.Tools.RAG_tool import get_retriever
+        get_retriever()
+    logger.info(f"Preloaded application state in {time.perf_counter() - started:.2f}s")
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def run_worker(sock: socket.socket, args: argparse.Namespace):
+    import uvicorn
+
+    # The master's handlers and RNG state must not leak into the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()
+    gc.enable()
+    # Database connections must never be shared across processes
+    models = sys.modules.get("app.models.models")
+    if models is not None:
+        for engine in [models.engine, *models.read_engines]:
+            engine.dispose(close=False)
+
+    from app.main import app
+
+    limit = None
+    if args.max_requests:
+        limit = args.max_requests + random.randint(0, args.max_requests_jitter)
+    config = uvicorn.Config(
+        app,
+        limit_max_requests=limit,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+# =============================================================================
+# MASTER
+# =============================================================================
+
+def serve(args: argparse.Namespace):
+    configure_logging(args.log_level.upper())
+    sock = bind_socket(args.host, args.port)
+
+    if args.preload:
+        # Objects created from here on are frozen so worker GCs never touch (and copy) their pages
+        gc.disable()
+        preload(rag=args.preload_rag)
+        gc.collect()
+        gc.freeze()
+
+    workers: Dict[int, Tuple[int, float]] = {}  # pid -> (slot, started)
+    stopping = False
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(sock, args)
+            except BaseException:
+                logger.exception(f"Worker {slot} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        workers[pid] = (slot, time.monotonic())
+        logger.info(f"Started worker {slot} (pid {pid})")
+
+    def kill_remaining(signum, frame):
+        for pid in list(workers):
+            logger.warning(f"Worker pid {pid} did not drain in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def drain(signum, frame):
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        logger.info(f"Received {signal.Signals(signum).name}, draining {len(workers)} workers")
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        signal.signal(signal.SIGALRM, kill_remaining)
+        signal.alarm(args.graceful_timeout + 5)
+
+    signal.signal(signal.SIGTERM, drain)
+    signal.signal(signal.SIGINT, drain)
+
+    for slot in range(args.workers):
+        spawn(slot)
+    logger.info(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in workers:
+            continue
+        slot, started = workers.pop(pid)
+        if stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        # Exit code 0 is a recycled worker (--max-requests); anything else is a crash
+        logger.info(f"Worker {slot} (pid {pid}) exited with {code}, starting a replacement")
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            time.sleep(MIN_WORKER_UPTIME)
+        spawn(slot)
+
+    signal.alarm(0)
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Campus Admin Agent API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="Let each worker load the agents itself instead of sharing the master's copy")
+    parser.add_argument("--preload-rag", action="store_true", help="Also build the RAG/FAISS index before forking")
+    parser.add_argument("--max-requests", type=int, default=SERVE_MAX_REQUESTS,
+                        help="Recycle a worker after this many requests (0 never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=SERVE_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=SERVE_GRACEFUL_TIMEOUT,
+                        help="Seconds workers get to finish in-flight requests on shutdown")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info").lower())
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): uvicorn's own spawn-based workers, without shared preload
+        import uvicorn
+        uvicorn.run(
+            "app.main:app", host=args.host, port=args.port, workers=args.workers,
+            limit_max_requests=args.max_requests or None,
+            timeout_graceful_shutdown=args.graceful_timeout, log_level=args.log_level,
+        )
+        return
+    serve(args)
+
+
+if __name__ == "__main__":
+    main()
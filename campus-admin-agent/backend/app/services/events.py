@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from sqlalchemy import func, or_
+
+from ..models.models import Student, ActivityLog, primary_session
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# LIVE ACTIVITY FEED
+# =============================================================================
+# One tailer per process reads new activity_logs rows (id > cursor) and fans
+# them out to every subscriber, so the database sees one small indexed query
+# per wake-up however many dashboards are connected. The service layer wakes
+# the tailer right after it commits a write. A slow poll picks up writes made
+# by other workers or processes. The tailer only runs while someone listens.
+#
+# Event ids are activity_logs ids. A subscriber resuming from a Last-Event-ID,
+# or one that fell too far behind, reads the rows it missed straight from the
+# table. No subscriber queue grows past EVENTS_QUEUE_SIZE. Reads go to the
+# primary, so a wake-up never races replication lag.
+#
+# An event's department comes from the student row, which a deletion removes
+# before the event is read. Deletions therefore reach every department-filtered
+# subscriber instead of none.
+
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "2"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_REPLAY_LIMIT = int(os.getenv("EVENTS_REPLAY_LIMIT", "1000"))
+
+# Activity types that can change the student counts
+SUMMARY_ACTIVITY = {"student_created", "student_deleted", "profile_update"}
+
+
+def _read_events(after: int, limit: int, departments: Optional[Set[str]] = None,
+                 activity_types: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """Activity rows with id > `after`, oldest first, with the student's department when they still exist"""
+    with primary_session() as db:
+        query = db.query(ActivityLog, Student.department) \
+            .outerjoin(Student, Student.student_id == ActivityLog.student_id) \
+            .filter(ActivityLog.id > after)
+        if departments:
+            query = query.filter(or_(func.lower(Student.department).in_(departments),
+                                     ActivityLog.activity_type == "student_deleted"))
+        if activity_types:
+            query = query.filter(ActivityLog.activity_type.in_(activity_types))
+        rows = query.order_by(ActivityLog.id).limit(limit).all()
+        return [{
+            "id": log.id,
+            "student_id": log.student_id,
+            "department": department,
+            "activity_type": log.activity_type,
+            "description": log.description,
+            "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+        } for log, department in rows]
+
+
+def _latest_id() -> int:
+    with primary_session() as db:
+        return db.query(func.max(ActivityLog.id)).scalar() or 0
+
+
+def _summary() -> Dict[str, int]:
+    from . import service
+    return service.count_students()
+
+
+class Subscription:
+    """One listener: its filters, a bounded queue and the last event id it was given"""
+
+    def __init__(self, after: int, departments: Optional[Set[str]], activity_types: Optional[Set[str]],
+                 summary: bool):
+        self.after = after
+        self.departments = departments
+        self.activity_types = activity_types
+        self.summary = summary
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        # Set by the feed when the queue was full; the reader catches up from the table
+        self.lagging = False
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        if self.activity_types and event["activity_type"] not in self.activity_types:
+            return False
+        if self.departments and event["activity_type"] != "student_deleted" \
+                and (event["department"] or "").lower() not in self.departments:
+            return False
+        return True
+
+    def offer(self, item: tuple) -> None:
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+    async def replay(self) -> AsyncIterator[Dict[str, Any]]:
+        """Rows after `self.after` that match the filters, read from the table a page at a time"""
+        while True:
+            page = await asyncio.to_thread(_read_events, self.after, EVENTS_QUEUE_SIZE,
+                                           self.departments, self.activity_types)
+            for event in page:
+                self.after = event["id"]
+                yield event
+            if len(page) < EVENTS_QUEUE_SIZE:
+                return
+
+
+class ActivityFeed:
+    def __init__(self):
+        self.subscribers: Set[Subscription] = set()
+        self.cursor = 0
+        self.last_summary: Optional[Dict[str, int]] = None
+        self.stats = {"started": 0, "wakeups": 0, "events": 0, "lagged": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._starting: Optional[asyncio.Lock] = None
+
+    def notify(self) -> None:
+        """Wake the tailer; safe from any thread, a no-op while nobody listens"""
+        with self._lock:
+            loop, wake = self._loop, self._wake
+        if loop is None or wake is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def subscribe(self, last_event_id: Optional[int] = None, departments: Optional[Set[str]] = None,
+                        activity_types: Optional[Set[str]] = None, summary: bool = True) -> Subscription:
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if self._task is None or self._task.done():
+                await self._start()
+        start = self.cursor if last_event_id is None \
+            else max(self.cursor - EVENTS_REPLAY_LIMIT, last_event_id)
+        subscription = Subscription(start, departments, activity_types, summary)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+        if not self.subscribers and self._task is not None:
+            # Stop tailing once the last listener is gone; the next subscribe starts afresh
+            self._task.cancel()
+            self._task = None
+            with self._lock:
+                self._loop = self._wake = None
+
+    async def _start(self) -> None:
+        self.stats["started"] += 1
+        self.cursor = await asyncio.to_thread(_latest_id)
+        self.last_summary = await asyncio.to_thread(_summary)
+        wake = asyncio.Event()
+        with self._lock:
+            self._loop, self._wake = asyncio.get_running_loop(), wake
+        self._task = asyncio.create_task(self._tail(wake))
+
+    async def _tail(self, wake: asyncio.Event) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Activity feed poll failed: {str(e)}")
+
+    async def _poll(self) -> None:
+        self.stats["wakeups"] += 1
+        while True:
+            events = await asyncio.to_thread(_read_events, self.cursor, EVENTS_QUEUE_SIZE)
+            if not events:
+                return
+            self.cursor = events[-1]["id"]
+            self.stats["events"] += len(events)
+            for subscription in list(self.subscribers):
+                was_lagging = subscription.lagging
+                for event in events:
+                    if subscription.wants(event):
+                        subscription.offer(("activity", event))
+                self.stats["lagged"] += subscription.lagging and not was_lagging
+            if any(event["activity_type"] in SUMMARY_ACTIVITY for event in events):
+                summary = await asyncio.to_thread(_summary)
+                if summary != self.last_summary:
+                    self.last_summary = summary
+                    for subscription in list(self.subscribers):
+                        if subscription.summary:
+                            subscription.offer(("summary", summary))
+            if len(events) < EVENTS_QUEUE_SIZE:
+                return
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "lagging": sum(s.lagging for s in self.subscribers),
+            "cursor": self.cursor,
+            **self.stats,
+        }
+
+
+async def iter_events(feed: ActivityFeed, subscription: Subscription, timeout: float) -> AsyncIterator[Optional[tuple]]:
+    """(name, payload, event id) for a subscription, or None after `timeout` seconds of silence"""
+    if subscription.summary and feed.last_summary is not None:
+        yield "summary", feed.last_summary, None
+    async for event in subscription.replay():
+        yield "activity", event, event["id"]
+    while True:
+        if subscription.lagging and subscription.queue.empty():
+            # Dropped events are still in the table: read them from there, then go live again
+            subscription.lagging = False
+            async for event in subscription.replay():
+                yield "activity", event, event["id"]
+            if subscription.summary and feed.last_summary is not None:
+                yield "summary", feed.last_summary, None
+        try:
+            name, payload = await asyncio.wait_for(subscription.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        if name == "activity":
+            # Already delivered by a replay
+            if payload["id"] <= subscription.after:
+                continue
+            subscription.after = payload["id"]
+            yield name, payload, payload["id"]
+        else:
+            yield name, payload, None
+
+
+activity_feed = ActivityFeed()
@@ -0,0 +1,298 @@
+import csv
+import importlib.util
+import io
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from ..models.models import Student, ActivityLog, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# STREAMING EXPORT
+# =============================================================================
+# Tables are read in primary-key (or time) order through a server-side cursor
+# (`stream_results`), `EXPORT_CHUNK_ROWS` rows at a time, from a read replica
+# when one is configured. Each chunk is encoded and handed on before the next
+# is fetched, so memory depends on the chunk size, not the table size. Used by
+# the `python -m app.export` CLI and the GET /api/export/{table} download.
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+
+# table name -> (model, exported columns, time column for ranges and partitions)
+EXPORT_TABLES: Dict[str, Tuple[Any, Tuple[str, ...], str]] = {
+    "students": (
+        Student,
+        ("id", "student_id", "name", "department", "email", "is_active", "created_at", "updated_at"),
+        "created_at",
+    ),
+    "activity_logs": (
+        ActivityLog,
+        ("id", "student_id", "activity_type", "description", "timestamp"),
+        "timestamp",
+    ),
+}
+
+FORMAT_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "parquet": "parquet", "arrow": "arrows"}
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+# Columnar formats need pyarrow
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+PARTITION_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def available_formats() -> List[str]:
+    return [f for f in FORMAT_EXTENSIONS if f not in COLUMNAR_FORMATS or pyarrow_available()]
+
+
+def check_export(table: str, fmt: str, partition: Optional[str] = None) -> None:
+    """Raise ValueError for an unknown table, format or partition, or a columnar format without pyarrow"""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table '{table}'. Available: {', '.join(EXPORT_TABLES)}")
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown format '{fmt}'. Available: {', '.join(FORMAT_EXTENSIONS)}")
+    if fmt in COLUMNAR_FORMATS and not pyarrow_available():
+        raise ValueError(f"Format '{fmt}' needs the optional pyarrow package (pip install pyarrow)")
+    if partition and partition not in PARTITION_FORMATS:
+        raise ValueError(f"Unknown partition '{partition}'. Available: {', '.join(PARTITION_FORMATS)}")
+
+
+def file_name(table: str, fmt: str, compress: bool = False, partition_key: Optional[str] = None) -> str:
+    name = f"{table}-{partition_key}" if partition_key else table
+    return f"{name}.{FORMAT_EXTENSIONS[fmt]}" + (".gz" if compress and fmt not in COLUMNAR_FORMATS else "")
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def iter_chunks(table: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS, by_time: bool = False) -> Iterator[List[tuple]]:
+    """Rows of `table` with the time column in [since, until), in lists of at most `chunk_rows`.
+
+    Ordered by id, or by time then id with `by_time` (the database does that
+    sort, spilling to disk if it must).
+    """
+    model, columns, time_column = EXPORT_TABLES[table]
+    time_col = getattr(model, time_column)
+    stmt = select(*(getattr(model, c) for c in columns))
+    if since is not None:
+        stmt = stmt.where(time_col >= since)
+    if until is not None:
+        stmt = stmt.where(time_col < until)
+    stmt = stmt.order_by(time_col, model.id) if by_time else stmt.order_by(model.id)
+    with SessionLocal() as db:
+        result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": chunk_rows})
+        for partition in result.partitions(chunk_rows):
+            yield [tuple(row) for row in partition]
+
+
+def partition_chunks(table: str, partition: str, chunks: Iterable[List[tuple]]) -> Iterator[Tuple[str, List[tuple]]]:
+    """Split time-ordered chunks at partition boundaries: (partition key, rows) pairs"""
+    _, columns, time_column = EXPORT_TABLES[table]
+    position = columns.index(time_column)
+    pattern = PARTITION_FORMATS[partition]
+    for rows in chunks:
+        start = 0
+        key = None
+        for i, row in enumerate(rows):
+            row_key = row[position].strftime(pattern) if row[position] else "unknown"
+            if row_key != key:
+                if key is not None:
+                    yield key, rows[start:i]
+                key, start = row_key, i
+        if key is not None:
+            yield key, rows[start:]
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _text(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last `drain()`"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_schema(table: str):
+    import pyarrow as pa
+    types = {"id": pa.int64(), "is_active": pa.bool_(), "created_at": pa.timestamp("us"),
+             "updated_at": pa.timestamp("us"), "timestamp": pa.timestamp("us")}
+    _, columns, _ = EXPORT_TABLES[table]
+    return pa.schema([(c, types.get(c, pa.string())) for c in columns])
+
+
+class ChunkEncoder:
+    """Encodes row chunks of one table into one output file, piece by piece.
+
+    `encode(rows)` returns the bytes for those rows and `finish()` the trailing
+    bytes (Parquet footer, gzip trailer). CSV and NDJSON are gzipped as a
+    stream with `compress`; Parquet and Arrow compress internally instead.
+    """
+
+    def __init__(self, table: str, fmt: str, compress: bool = False):
+        check_export(table, fmt)
+        self.table = table
+        self.fmt = fmt
+        self.columns = EXPORT_TABLES[table][1]
+        self.rows = 0
+        self.bytes = 0
+        self._started = False
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress and fmt not in COLUMNAR_FORMATS else None
+        self._sink: Optional[_Sink] = None
+        self._writer = None
+        if fmt in COLUMNAR_FORMATS:
+            import pyarrow as pa
+            import pyarrow.ipc
+            import pyarrow.parquet as pq
+            self._schema = _arrow_schema(table)
+            self._sink = _Sink()
+            if fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._sink, self._schema,
+                                                compression="gzip" if compress else "snappy")
+            else:
+                options = pa.ipc.IpcWriteOptions(compression="zstd" if compress else None)
+                self._writer = pa.ipc.new_stream(self._sink, self._schema, options=options)
+
+    def _out(self, data: bytes) -> bytes:
+        if self._gzip is not None:
+            data = self._gzip.compress(data)
+        self.bytes += len(data)
+        return data
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        self.rows += len(rows)
+        if self.fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not self._started:
+                writer.writerow(self.columns)
+            writer.writerows([[_text(v) for v in row] for row in rows])
+            data = buffer.getvalue().encode()
+        elif self.fmt == "ndjson":
+            data = "".join(
+                json.dumps(dict(zip(self.columns, (_text(v) for v in row))), default=str) + "\n" for row in rows
+            ).encode()
+        else:
+            import pyarrow as pa
+            if rows:
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(self._schema)],
+                    schema=self._schema,
+                )
+                if self.fmt == "parquet":
+                    # One row group per chunk
+                    self._writer.write_batch(batch, row_group_size=len(rows))
+                else:
+                    self._writer.write_batch(batch)
+            data = self._sink.drain()
+        self._started = True
+        return self._out(data)
+
+    def finish(self) -> bytes:
+        data = b""
+        if self._writer is not None:
+            self._writer.close()
+            data = self._sink.drain()
+        data = self._out(data)
+        if self._gzip is not None:
+            tail = self._gzip.flush()
+            self.bytes += len(tail)
+            data += tail
+        return data
+
+
+def stream_export(table: str, fmt: str = "csv", since: Optional[datetime] = None, until: Optional[datetime] = None,
+                  compress: bool = False, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """One export file as a stream of byte chunks"""
+    encoder = ChunkEncoder(table, fmt, compress)
+    for rows in iter_chunks(table, since, until, chunk_rows):
+        data = encoder.encode(rows)
+        if data:
+            yield data
+    if not encoder.rows:
+        # An empty export still gets its CSV header or schema
+        yield encoder.encode([])
+    tail = encoder.finish()
+    if tail:
+        yield tail
+    logger.info(f"Exported {encoder.rows} {table} rows as {fmt} ({encoder.bytes} bytes)")
+
+
+def export_to_directory(table: str, directory: str, fmt: str = "csv", since: Optional[datetime] = None,
+                        until: Optional[datetime] = None, partition: Optional[str] = None,
+                        compress: bool = False, chunk_rows: int = EXPORT_CHUNK_ROWS) -> List[Dict[str, Any]]:
+    """Write `table` into `directory`, one file per time partition (or one file); returns a row per file"""
+    check_export(table, fmt, partition)
+    os.makedirs(directory, exist_ok=True)
+    chunks = iter_chunks(table, since, until, chunk_rows, by_time=bool(partition))
+    pieces = partition_chunks(table, partition, chunks) if partition else ((None, rows) for rows in chunks)
+
+    files: List[Dict[str, Any]] = []
+    current: Optional[Tuple[Optional[str], Any, ChunkEncoder]] = None
+
+    def close():
+        key, handle, encoder = current
+        handle.write(encoder.finish())
+        handle.close()
+        files.append({"path": handle.name, "partition": key, "rows": encoder.rows, "bytes": encoder.bytes})
+
+    try:
+        for key, rows in pieces:
+            if current is None or current[0] != key:
+                if current is not None:
+                    close()
+                path = os.path.join(directory, file_name(table, fmt, compress, key))
+                current = (key, open(path, "wb"), ChunkEncoder(table, fmt, compress))
+            current[1].write(current[2].encode(rows))
+        if current is None and not partition:
+            # Empty table: still write a file with the header / schema
+            path = os.path.join(directory, file_name(table, fmt, compress))
+            current = (None, open(path, "wb"), ChunkEncoder(table, fmt, compress))
+            current[1].write(current[2].encode([]))
+        if current is not None:
+            close()
+            current = None
+    finally:
+        if current is not None:
+            current[1].close()
+    return files
@@ -0,0 +1,281 @@
+import calendar
+import logging
+import operator
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Boolean, DateTime, Integer, and_, cast, func, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from ..models.models import Student, ActivityLog
+from ..utils.pydentic_model import QuerySpec, QueryFilter, get_pkt_time
+from ..utils.compaction import COMPACT_TOOL_OUTPUT
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# STRUCTURED QUERY COMPILER
+# =============================================================================
+# Compiles a QuerySpec into one parameterized SELECT. Only whitelisted columns
+# of students and activity_logs are reachable (activity_logs can reach student
+# columns as `student.<column>` through a join on student_id); values are
+# always bound parameters. Results are capped at QUERY_MAX_ROWS rows and the
+# statement is aborted after QUERY_TIMEOUT_SECONDS.
+
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "200"))
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "5"))
+MAX_FILTERS = 10
+MAX_GROUP_BY = 3
+MAX_AGGREGATES = 5
+MAX_LIST_VALUES = 100
+
+_STUDENT_COLUMNS = {
+    name: getattr(Student, name)
+    for name in ("id", "student_id", "name", "department", "email", "is_active", "created_at", "updated_at")
+}
+_ACTIVITY_COLUMNS = {
+    name: getattr(ActivityLog, name) for name in ("id", "student_id", "activity_type", "description", "timestamp")
+}
+SOURCES = {
+    "students": (Student, _STUDENT_COLUMNS),
+    "activity_logs": (ActivityLog, {
+        **_ACTIVITY_COLUMNS,
+        **{f"student.{name}": column for name, column in _STUDENT_COLUMNS.items()},
+    }),
+}
+# Returned when a non-aggregate query selects nothing explicitly
+DEFAULT_SELECT = {
+    "students": ["student_id", "name", "department", "email", "is_active", "created_at"],
+    "activity_logs": ["id", "student_id", "activity_type", "timestamp"],
+}
+
+# Weeks are labelled by their Monday (YYYY-MM-DD) on every dialect, see _bucket
+_BUCKET_FORMATS = {
+    "sqlite": {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"},
+    "postgresql": {"day": "YYYY-MM-DD", "month": "YYYY-MM", "year": "YYYY"},
+}
+# now-Nh/d/w, or now-Nmo for calendar months; a bare "m" (minutes or months?) is rejected
+_RELATIVE_DATE = re.compile(r"^now(?:\s*-\s*(\d+)\s*(h|d|w|mo|m))?$", re.I)
+_RELATIVE_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1)}
+_COMPARISONS = {
+    "eq": operator.eq, "ne": operator.ne, "lt": operator.lt, "lte": operator.le, "gt": operator.gt, "gte": operator.ge,
+}
+
+
+class QueryTimeout(Exception):
+    """The statement ran longer than QUERY_TIMEOUT_SECONDS"""
+
+
+def _column(source: str, field: str):
+    columns = SOURCES[source][1]
+    if field not in columns:
+        raise ValueError(f"Unknown field '{field}' for {source}. Allowed: {', '.join(columns)}")
+    return columns[field]
+
+
+def _months_before(moment: datetime, months: int) -> datetime:
+    """The same day and time `months` calendar months earlier; the day is clamped in shorter months"""
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    month += 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def _coerce(column, value: Any) -> Any:
+    """Convert a JSON value to the column's Python type"""
+    if isinstance(value, list):
+        return [_coerce(column, v) for v in value]
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return value if isinstance(value, bool) else str(value).strip().lower() in ("true", "1", "yes", "active")
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, DateTime):
+        raw = str(value).strip()
+        relative = _RELATIVE_DATE.match(raw)
+        if relative:
+            amount, unit = relative.groups()
+            now = get_pkt_time().replace(tzinfo=None)
+            if not amount:
+                return now
+            unit = unit.lower()
+            if unit == "m":
+                raise ValueError(f"Ambiguous relative date '{raw}': use 'mo' for calendar months (now-3mo)")
+            if unit == "mo":
+                return _months_before(now, int(amount))
+            return now - int(amount) * _RELATIVE_UNITS[unit]
+        parsed = datetime.fromisoformat(raw)
+        return parsed.replace(tzinfo=None)
+    return str(value)
+
+
+def _condition(source: str, spec_filter: QueryFilter):
+    column = _column(source, spec_filter.field)
+    op, value = spec_filter.op, spec_filter.value
+    if op == "is_null":
+        return column.is_(None)
+    if op == "not_null":
+        return column.is_not(None)
+    if value is None:
+        raise ValueError(f"Filter on '{spec_filter.field}' with op '{op}' needs a value")
+
+    if op in ("in", "not_in", "between"):
+        values = value if isinstance(value, list) else [value]
+        if not values or len(values) > MAX_LIST_VALUES:
+            raise ValueError(f"'{op}' on '{spec_filter.field}' needs 1-{MAX_LIST_VALUES} values")
+        values = _coerce(column, values)
+        if op == "between":
+            if len(values) != 2:
+                raise ValueError(f"'between' on '{spec_filter.field}' needs exactly two values")
+            return column.between(values[0], values[1])
+        return column.in_(values) if op == "in" else column.not_in(values)
+
+    if isinstance(value, list):
+        raise ValueError(f"'{op}' on '{spec_filter.field}' takes a single value")
+    if op in ("contains", "starts_with"):
+        pattern = str(value).replace("%", "").replace("_", "")
+        pattern = f"%{pattern}%" if op == "contains" else f"{pattern}%"
+        return func.lower(column).like(pattern.lower())
+    return _COMPARISONS[op](column, _coerce(column, value))
+
+
+def _bucket(column, unit: str, dialect: str):
+    formats = _BUCKET_FORMATS.get(dialect)
+    if formats is None:
+        raise ValueError(f"Date buckets are not supported on {dialect}")
+    # Formats and modifiers are constants; inlining them keeps the SELECT and GROUP BY expressions identical
+    if unit == "week":
+        # Monday of the week: SQLite moves to the next Sunday (or stays on one) and steps back six days
+        if dialect == "sqlite":
+            return func.date(column, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+        return func.to_char(func.date_trunc(literal_column("'week'"), column), literal_column("'YYYY-MM-DD'"))
+    fmt = literal_column(f"'{formats[unit]}'")
+    if dialect == "sqlite":
+        return func.strftime(fmt, column)
+    return func.to_char(column, fmt)
+
+
+def compile_query(spec: QuerySpec, dialect: str) -> Tuple[Any, List[str], int]:
+    """Build the SELECT for `spec`; returns (statement, column names, row limit)"""
+    model, _ = SOURCES[spec.source]
+    if len(spec.filters) > MAX_FILTERS or len(spec.group_by) > MAX_GROUP_BY or len(spec.aggregates) > MAX_AGGREGATES:
+        raise ValueError(f"At most {MAX_FILTERS} filters, {MAX_GROUP_BY} group keys and {MAX_AGGREGATES} aggregates")
+
+    fields = [f.field for f in spec.filters] + [g.field for g in spec.group_by] + \
+        [a.field for a in spec.aggregates if a.field] + list(spec.select)
+    labelled: Dict[str, Any] = {}
+    aggregating = bool(spec.group_by or spec.aggregates)
+    if aggregating:
+        if spec.select:
+            raise ValueError("Use either select or group_by/aggregates, not both")
+        for group in spec.group_by:
+            column = _column(spec.source, group.field)
+            if group.bucket:
+                if not isinstance(column.type, DateTime):
+                    raise ValueError(f"Date buckets need a timestamp field, not '{group.field}'")
+                labelled[f"{group.field}_{group.bucket}"] = _bucket(column, group.bucket, dialect)
+            else:
+                labelled[group.field] = column
+        for aggregate in spec.aggregates or [None]:
+            if aggregate is None or (aggregate.func == "count" and not aggregate.field):
+                labelled["count"] = func.count()
+                continue
+            if not aggregate.field:
+                raise ValueError(f"Aggregate '{aggregate.func}' needs a field")
+            column = _column(spec.source, aggregate.field)
+            name = f"{aggregate.func}_{aggregate.field.replace('.', '_')}"
+            if aggregate.func == "count_distinct":
+                labelled[name] = func.count(column.distinct())
+            elif aggregate.func in ("sum", "avg") and not isinstance(column.type, (Integer, Boolean)):
+                raise ValueError(f"'{aggregate.func}' needs a numeric field, not '{aggregate.field}'")
+            else:
+                if isinstance(column.type, Boolean) and aggregate.func in ("sum", "avg"):
+                    column = cast(column, Integer)
+                labelled[name] = getattr(func, aggregate.func)(column)
+    else:
+        for field in spec.select or DEFAULT_SELECT[spec.source]:
+            labelled[field] = _column(spec.source, field)
+
+    labels = {name: expr.label(name) for name, expr in labelled.items()}
+    statement = select(*labels.values()).select_from(model)
+    if any(field.startswith("student.") for field in fields):
+        statement = statement.join(Student, Student.student_id == ActivityLog.student_id)
+    if spec.filters:
+        statement = statement.where(and_(*(_condition(spec.source, f) for f in spec.filters)))
+    if spec.group_by:
+        statement = statement.group_by(*(labelled[name] for name in list(labelled)[:len(spec.group_by)]))
+
+    for sort in spec.sort:
+        if sort.field in labels:
+            key = labels[sort.field]
+        elif not aggregating:
+            key = _column(spec.source, sort.field)
+        else:
+            raise ValueError(f"Sort field '{sort.field}' must be one of: {', '.join(labels)}")
+        statement = statement.order_by(key.desc() if sort.direction == "desc" else key.asc())
+    if not spec.sort:
+        # Deterministic output: by group keys, or by primary key for row listings
+        statement = statement.order_by(*list(labels.values())[:len(spec.group_by)]) \
+            if aggregating else statement.order_by(model.id)
+
+    limit = max(1, min(spec.limit, QUERY_MAX_ROWS))
+    # One extra row tells us whether the result was truncated
+    return statement.limit(limit + 1), list(labelled), limit
+
+
+@contextmanager
+def statement_timeout(db: Session, seconds: float):
+    """Abort the statements run inside the block after `seconds`"""
+    conn = db.connection()
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        db.execute(text(f"SET LOCAL statement_timeout = {int(seconds * 1000)}"))
+        yield
+        return
+    if dialect != "sqlite":
+        yield
+        return
+    raw = conn.connection.dbapi_connection
+    deadline = time.monotonic() + seconds
+    raw.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, 10_000)
+    try:
+        yield
+    finally:
+        raw.set_progress_handler(None, 0)
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def run_query(db: Session, spec: QuerySpec) -> Dict[str, Any]:
+    """Compile and execute `spec`; raises ValueError for invalid specs and QueryTimeout when over time"""
+    statement, columns, limit = compile_query(spec, db.get_bind().dialect.name)
+    started = time.perf_counter()
+    try:
+        with statement_timeout(db, QUERY_TIMEOUT_SECONDS):
+            rows = db.execute(statement).all()
+    except Exception as e:
+        if time.perf_counter() - started >= QUERY_TIMEOUT_SECONDS or "interrupted" in str(e) or "statement timeout" in str(e):
+            raise QueryTimeout(f"Query exceeded {QUERY_TIMEOUT_SECONDS:g}s; narrow the filters or aggregate instead") from e
+        raise
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"Query spec on {spec.source}: {min(len(rows), limit)} rows in {elapsed_ms}ms")
+    values = [[_json_value(value) for value in row] for row in rows[:limit]]
+    return {
+        "columns": columns,
+        "rows": values if COMPACT_TOOL_OUTPUT else [dict(zip(columns, row)) for row in values],
+        "row_count": min(len(rows), limit),
+        "truncated": len(rows) > limit,
+        "elapsed_ms": elapsed_ms,
+    }
@@ -0,0 +1,277 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Agent runs allowed to talk to the LLM at the same time
+LLM_MAX_CONCURRENT_RUNS = int(os.getenv("LLM_MAX_CONCURRENT_RUNS", "8"))
+# Provider request quota (LLM calls per minute, 0 disables) and how many may burst at once
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+# Runs waiting for a slot; beyond this new requests are rejected straight away
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+# Longest a request waits in the queue before it gets a 429
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+# First pause after the provider answers 429/503; doubles on repeats up to the max
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "2"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class Lane(IntEnum):
+    """Priority lanes, lowest value is served first"""
+    INTERACTIVE = 0  # /chat/stream and /students writes
+    STANDARD = 1     # /chat and /students reads
+    BULK = 2         # /analytics
+
+
+class Overloaded(Exception):
+    """Raised at admission when a run cannot be scheduled in time"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"{reason}, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def throttle_delay(error: BaseException) -> Optional[float]:
+    """Seconds to back off if `error` is a provider 429/503, else None (0 when no Retry-After)"""
+    if getattr(error, "status_code", None) not in THROTTLE_STATUSES:
+        return None
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(header)) if header else 0.0
+    except ValueError:
+        return 0.0
+
+
+# =============================================================================
+# TOKEN BUCKET
+# =============================================================================
+
+class TokenBucket:
+    """Paces LLM calls to the provider quota; one token per call"""
+
+    def __init__(self, per_minute: float, capacity: int):
+        self.rate = per_minute / 60
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def take(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            delay = self.try_take()
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+class Lease:
+    """A run slot; release it exactly once when the run is over"""
+
+    def __init__(self, scheduler: "AdmissionScheduler", lane: Lane, queue_wait: float):
+        self.scheduler = scheduler
+        self.lane = lane
+        self.queue_wait_ms = round(queue_wait * 1000, 2)
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self, error: Optional[BaseException] = None):
+        if not self.released:
+            self.released = True
+            self.scheduler._release(self, error)
+
+
+class AdmissionScheduler:
+    """Admission control in front of agent runs.
+
+    Caps concurrent runs and serves waiting runs by lane priority, then arrival.
+    When the provider throttles (429/503) the concurrency limit is halved and
+    new runs pause for a jittered, growing backoff; successful runs grow the
+    limit back one slot at a time. Requests that cannot be served in time are
+    rejected with a Retry-After hint instead of waiting indefinitely.
+    """
+
+    def __init__(self, max_concurrent: int = LLM_MAX_CONCURRENT_RUNS, per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 burst: int = LLM_BURST, max_queue: int = LLM_MAX_QUEUE, queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.max_concurrent = max(1, max_concurrent)
+        self.limit = float(self.max_concurrent)
+        self.bucket = TokenBucket(per_minute, burst) if per_minute else None
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: List[tuple] = []
+        self._queued = {lane: 0 for lane in Lane}
+        self._seq = itertools.count()
+        self._backoff_until = 0.0
+        self._throttles = 0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._avg_run = 1.0
+        self._stats = {lane: {"admitted": 0, "rejected": 0, "waits": deque(maxlen=500)} for lane in Lane}
+
+    # ---- state ---------------------------------------------------------------
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    def backoff_remaining(self) -> float:
+        return max(0.0, self._backoff_until - time.monotonic())
+
+    def queued(self) -> int:
+        return sum(self._queued.values())
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new request would get a slot"""
+        drain = self._avg_run * (self.queued() + 1) / self.capacity
+        return max(1, math.ceil(max(self.backoff_remaining(), drain)))
+
+    def _reject(self, lane: Lane, reason: str):
+        self._stats[lane]["rejected"] += 1
+        logger.warning(f"Rejected {lane.name.lower()} run: {reason}")
+        raise Overloaded(reason, self.retry_after())
+
+    # ---- admission -----------------------------------------------------------
+
+    async def acquire(self, lane: Lane) -> Lease:
+        """Wait for a run slot in `lane`; raises Overloaded when it cannot be had in time"""
+        if not self.backoff_remaining() and not self.queued() and self.active < self.capacity:
+            self.active += 1
+            return self._admitted(lane, 0.0)
+
+        if self.queued() >= self.max_queue:
+            self._reject(lane, "LLM queue is full")
+        if lane == Lane.BULK and self.backoff_remaining():
+            self._reject(lane, "LLM provider is throttling")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), future))
+        self._queued[lane] += 1
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(lane, f"no LLM slot within {self.queue_timeout:g}s")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the caller went away
+            if future.done() and not future.cancelled():
+                self._release(None, None)
+            raise
+        finally:
+            self._queued[lane] -= 1
+        return self._admitted(lane, time.monotonic() - started)
+
+    def _admitted(self, lane: Lane, waited: float) -> Lease:
+        stats = self._stats[lane]
+        stats["admitted"] += 1
+        stats["waits"].append(waited * 1000)
+        return Lease(self, lane, waited)
+
+    def _dispatch(self):
+        remaining = self.backoff_remaining()
+        if remaining:
+            if self._waiters and self._wake_handle is None:
+                self._wake_handle = asyncio.get_running_loop().call_later(remaining, self._wake)
+            return
+        while self._waiters and self.active < self.capacity:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # timed out or cancelled while queued
+                continue
+            self.active += 1
+            future.set_result(None)
+
+    def _wake(self):
+        self._wake_handle = None
+        self._dispatch()
+
+    def _release(self, lease: Optional[Lease], error: Optional[BaseException]):
+        self.active -= 1
+        # A run that failed on a 429/503 was already reported by the LLM
+        # transport (RetryTransport) when the response came in
+        if lease is not None and error is None:
+            self._avg_run = 0.8 * self._avg_run + 0.2 * (time.monotonic() - lease.started)
+            self.on_success()
+        self._dispatch()
+
+    # ---- adaptive backoff ----------------------------------------------------
+
+    def on_throttle(self, retry_after: float = 0.0):
+        """The provider answered 429/503: halve concurrency and pause new runs"""
+        self._throttles += 1
+        self.limit = max(1.0, self.limit / 2)
+        backoff = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_SECONDS * 2 ** (self._throttles - 1))
+        delay = max(retry_after, backoff * random.uniform(0.5, 1.0))
+        self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+        logger.warning(f"LLM provider throttled; limit now {self.capacity}, pausing new runs for {delay:.1f}s")
+
+    def on_success(self):
+        self._throttles = 0
+        self.limit = min(float(self.max_concurrent), self.limit + 1 / self.limit)
+
+    async def pace(self) -> float:
+        """Wait for the provider quota before an LLM call; returns seconds waited"""
+        return await self.bucket.take() if self.bucket else 0.0
+
+    # ---- reporting -----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        lanes = {}
+        for lane, stats in self._stats.items():
+            waits = sorted(stats["waits"])
+            lanes[lane.name.lower()] = {
+                "admitted": stats["admitted"],
+                "rejected": stats["rejected"],
+                "queued": self._queued[lane],
+                "avg_wait_ms": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "p95_wait_ms": round(waits[math.ceil(0.95 * len(waits)) - 1], 2) if waits else 0.0,
+            }
+        return {
+            "active": self.active,
+            "limit": self.capacity,
+            "max_concurrent": self.max_concurrent,
+            "backoff_seconds": round(self.backoff_remaining(), 2),
+            "tokens_available": round(self.bucket.tokens, 2) if self.bucket else None,
+            "lanes": lanes,
+        }
+
+
+scheduler = AdmissionScheduler()
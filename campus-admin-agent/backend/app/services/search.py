@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# FUZZY STUDENT SEARCH
+# =============================================================================
+# Trigram index over name, email, student_id and department, so partial or
+# misspelled lookups touch a handful of index entries instead of the roster.
+#   SQLite:   FTS5 virtual table (trigram tokenizer) over `students`, kept in
+#             sync by triggers. The query is split into trigrams that are OR-ed,
+#             so a typo only loses the trigrams it touches.
+#   Postgres: pg_trgm GIN indexes on the four columns, ranked by similarity.
+# Other databases fall back to a LIKE scan. Every backend reports the same
+# 0..1 trigram similarity score. The index is only ever created on the
+# primary; a read replica uses it once replication has brought it over, and
+# scans with LIKE until then.
+
+SEARCH_FIELDS = ("name", "email", "student_id", "department")
+# Candidates fetched from the index per requested result, before re-ranking
+CANDIDATE_FACTOR = 5
+MIN_SCORE = 0.1
+# Seconds before a replica found without the index is checked again
+INDEX_RECHECK_SECONDS = 60
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        name, email, student_id, department,
+        content='students', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+        INSERT INTO students_fts(rowid, name, email, student_id, department)
+        VALUES (new.id, new.name, new.email, new.student_id, new.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, name, email, student_id, department)
+        VALUES ('delete', old.id, old.name, old.email, old.student_id, old.department);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+        INSERT INTO students_fts(students_fts, rowid, name, email, student_id, department)
+        VALUES ('delete', old.id, old.name, old.email, old.student_id, old.department);
+        INSERT INTO students_fts(rowid, name, email, student_id, department)
+        VALUES (new.id, new.name, new.email, new.student_id, new.department);
+    END""",
+]
+
+_POSTGRES_SETUP = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_students_{field}_trgm ON students USING gin ({field} gin_trgm_ops)"
+    for field in SEARCH_FIELDS
+]
+
+_ready: Set[str] = set()
+_ready_lock = threading.Lock()
+# url -> when a read-only engine was last found without the index
+_missing: Dict[str, float] = {}
+
+
+def trigrams(value: str) -> Set[str]:
+    value = " ".join(value.lower().split())
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def similarity(query: str, value: str) -> float:
+    """Share of the query's trigrams found in `value` (1.0 for an exact substring)"""
+    wanted = trigrams(query)
+    if not wanted or not value:
+        return 1.0 if value and query.lower() in value.lower() else 0.0
+    return len(wanted & trigrams(value)) / len(wanted)
+
+
+def _create_sqlite_index(conn: Connection):
+    # The triggers go away with the students table (e.g. a reset), leaving a stale index behind
+    synced = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'students_fts_insert'"
+    ).first()
+    for statement in _SQLITE_SETUP:
+        conn.exec_driver_sql(statement)
+    if not synced:
+        # Index the rows written while no triggers were in place
+        conn.exec_driver_sql("INSERT INTO students_fts(students_fts) VALUES ('rebuild')")
+        logger.info("Built students_fts trigram index")
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the search index for `engine` if needed; False when the database has no trigram support"""
+    key = str(engine.url)
+    if key in _ready:
+        return True
+    with _ready_lock:
+        if key in _ready:
+            return True
+        dialect = engine.dialect.name
+        try:
+            with engine.begin() as conn:
+                if dialect == "sqlite":
+                    _create_sqlite_index(conn)
+                elif dialect == "postgresql":
+                    for statement in _POSTGRES_SETUP:
+                        conn.exec_driver_sql(statement)
+                else:
+                    return False
+        except Exception as e:
+            # e.g. SQLite built without FTS5, or no permission to create the extension
+            logger.warning(f"Student search index unavailable on {dialect}, using LIKE scan: {str(e)}")
+            return False
+        _ready.add(key)
+        return True
+
+
+def has_search_index(engine: Engine) -> bool:
+    """Whether `engine` already has the search index; never creates it (safe on a read replica)"""
+    key = str(engine.url)
+    if key in _ready:
+        return True
+    checked = _missing.get(key)
+    if checked is not None and time.monotonic() - checked < INDEX_RECHECK_SECONDS:
+        return False
+    dialect = engine.dialect.name
+    present = False
+    try:
+        with engine.connect() as conn:
+            if dialect == "sqlite":
+                present = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'"
+                ).first() is not None
+            elif dialect == "postgresql":
+                present = conn.execute(
+                    text("SELECT count(*) FROM pg_indexes WHERE tablename = 'students' AND indexname = ANY(:names)"),
+                    {"names": [f"ix_students_{field}_trgm" for field in SEARCH_FIELDS]},
+                ).scalar() == len(SEARCH_FIELDS)
+    except Exception as e:
+        logger.warning(f"Could not check the student search index on {dialect}: {str(e)}")
+    if present:
+        _ready.add(key)
+        _missing.pop(key, None)
+    else:
+        _missing[key] = time.monotonic()
+    return present
+
+
+def _fts_query(query: str) -> str:
+    return " OR ".join(f'"{gram}"' for gram in sorted(trigrams(query.replace('"', ""))))
+
+
+def _candidates(db: Session, query: str, limit: int, department: Optional[str] = None,
+                is_active: Optional[bool] = None) -> List[Dict[str, Any]]:
+    # The engine that runs the query: a read replica unless the session is on the primary
+    engine = db.get_bind()
+    primary = db.primary_bind() if hasattr(db, "primary_bind") else engine
+    indexed = ensure_search_index(primary)
+    if engine is not primary:
+        indexed = has_search_index(engine)
+    columns = "s.id, s.student_id, s.name, s.department, s.email, s.is_active, s.created_at, s.updated_at"
+    dialect = engine.dialect.name
+    # Filters go into the SQL so the candidate limit applies to matching students only
+    filters = ""
+    params: Dict[str, Any] = {"limit": limit}
+    if department:
+        filters += " AND lower(s.department) = lower(:department)"
+        params["department"] = department
+    if is_active is not None:
+        filters += " AND s.is_active = :is_active"
+        params["is_active"] = is_active
+
+    if indexed and dialect == "sqlite" and len(query) >= 3:
+        sql = text(
+            f"SELECT {columns} FROM students_fts JOIN students s ON s.id = students_fts.rowid "
+            f"WHERE students_fts MATCH :match{filters} ORDER BY bm25(students_fts, 4.0, 3.0, 3.0, 1.0) LIMIT :limit"
+        )
+        params["match"] = _fts_query(query)
+    elif indexed and dialect == "postgresql":
+        sql = text(
+            f"SELECT {columns} FROM students s "
+            f"WHERE (:q <% s.name OR :q <% s.email OR :q <% s.student_id OR :q <% s.department){filters} "
+            "ORDER BY GREATEST(word_similarity(:q, s.name), word_similarity(:q, s.email), "
+            "word_similarity(:q, s.student_id), word_similarity(:q, s.department)) DESC LIMIT :limit"
+        )
+        params["q"] = query
+    else:
+        sql = text(
+            f"SELECT {columns} FROM students s WHERE (lower(s.name) LIKE lower(:p) OR lower(s.email) LIKE lower(:p) "
+            f"OR lower(s.student_id) LIKE lower(:p) OR lower(s.department) LIKE lower(:p)){filters} LIMIT :limit"
+        )
+        params["p"] = f"%{query.replace('%', '').replace('_', '')}%"
+    # Typed columns, so SQLite's stored timestamps come back as datetimes too
+    sql = sql.columns(created_at=DateTime, updated_at=DateTime)
+    return [dict(row._mapping) for row in db.execute(sql, params)]
+
+
+def search_students(db: Session, query: str, limit: int = 5, department: Optional[str] = None,
+                    is_active: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """Top `limit` students matching `query`, best first, each with `score` and `matched_field`.
+
+    `department` (case-insensitive) and `is_active` narrow the students searched.
+    """
+    query = " ".join(query.split())
+    if not query:
+        return []
+    results = []
+    for row in _candidates(db, query, limit * CANDIDATE_FACTOR, department, is_active):
+        scores = {field: similarity(query, str(row[field] or "")) for field in SEARCH_FIELDS}
+        field = max(scores, key=scores.get)
+        if scores[field] >= MIN_SCORE:
+            row["is_active"] = bool(row["is_active"]) if row["is_active"] is not None else None
+            for stamp in ("created_at", "updated_at"):
+                row[stamp] = row[stamp].isoformat() if row[stamp] else None
+            results.append({**row, "score": round(scores[field], 3), "matched_field": field})
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results[:limit]
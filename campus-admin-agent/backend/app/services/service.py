@@ -1,19 +1,242 @@
-def get_student_data(student_id: int):
-    # Logic to retrieve student data from the database
-    pass
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
 
-def create_student(data: dict):
-    # Logic to create a new student record in the database
-    pass
+from pydantic import ValidationError
+from sqlalchemy import desc, func, or_
+from sqlalchemy.orm import Session
 
-def update_student(student_id: int, data: dict):
-    # Logic to update an existing student record in the database
-    pass
+from ..models.models import Student, ActivityLog, SessionLocal, primary_session
+from . import search
+from .events import activity_feed
+from ..utils.pydentic_model import (
+    AddStudentRequest,
+    GetStudentRequest,
+    UpdateStudentRequest,
+    RecentStudentsRequest,
+    student_to_response,
+    get_pkt_time
+)
 
-def delete_student(student_id: int):
-    # Logic to delete a student record from the database
-    pass
+logger = logging.getLogger(__name__)
 
-def get_all_students():
-    # Logic to retrieve all student records from the database
-    pass
\ No newline at end of file
+# =============================================================================
+# STUDENT DATA ACCESS
+# =============================================================================
+# Shared by the agent tools and the typed REST endpoints (app/api/rest.py).
+# Functions are synchronous, open their own session and return plain dicts;
+# failures are raised as ServiceError subclasses that carry an HTTP status.
+# Reads may be served by a replica; writes open a primary session (see
+# models.py). Every committed write wakes the live activity feed (services/events.py)
+# and calls the registered write listeners (e.g. the session tool caches).
+
+UPDATABLE_FIELDS = ("name", "department", "email", "is_active")
+
+# Called with no arguments after every committed write
+write_listeners: List[Callable[[], None]] = []
+
+
+def _committed() -> None:
+    activity_feed.notify()
+    for listener in write_listeners:
+        try:
+            listener()
+        except Exception as e:
+            logger.error(f"Write listener failed: {str(e)}")
+
+
+class ServiceError(Exception):
+    """Base class for expected data-access failures"""
+    status_code = 400
+
+
+class StudentNotFound(ServiceError):
+    status_code = 404
+
+    def __init__(self, student_id: str):
+        super().__init__(f"Student {student_id} not found")
+        self.student_id = student_id
+
+
+class StudentAlreadyExists(ServiceError):
+    status_code = 409
+
+    def __init__(self, message: str = "Student with this ID or email already exists"):
+        super().__init__(message)
+
+
+class InvalidStudentData(ServiceError, ValueError):
+    """Input failed validation; also a ValueError so callers can treat it as one"""
+    status_code = 422
+
+
+def _validated(model, **values):
+    try:
+        return model(**values)
+    except ValidationError as e:
+        raise InvalidStudentData("; ".join(err["msg"] for err in e.errors())) from e
+
+
+def _find(db: Session, student_id: str) -> Student:
+    request = _validated(GetStudentRequest, student_id=student_id)
+    student = db.query(Student).filter(Student.student_id == request.student_id).first()
+    if not student:
+        raise StudentNotFound(request.student_id)
+    return student
+
+
+def _log_activity(db: Session, student_id: str, activity_type: str, description: str):
+    db.add(ActivityLog(
+        student_id=student_id,
+        activity_type=activity_type,
+        description=description,
+        timestamp=get_pkt_time()
+    ))
+
+
+def _page(query, after: int, limit: Optional[int]) -> Dict[str, Any]:
+    """Keyset page of `query` after database id `after`, with the total count of the unpaged query"""
+    total = query.count()
+    page = query.filter(Student.id > after).order_by(Student.id)
+    students = page.limit(limit + 1).all() if limit else page.all()
+    has_more = bool(limit) and len(students) > limit
+    students = students[:limit] if limit else students
+    return {
+        "students": [student_to_response(s) for s in students],
+        "total_count": total,
+        "last_id": students[-1].id if students else None,
+        "has_more": has_more,
+    }
+
+
+def get_student_data(student_id: str) -> Dict[str, Any]:
+    with SessionLocal() as db:
+        return student_to_response(_find(db, student_id))
+
+
+def create_student(data: Dict[str, Any]) -> Dict[str, Any]:
+    request = _validated(AddStudentRequest, **data)
+    with primary_session() as db:
+        existing = db.query(Student.id).filter(
+            or_(Student.student_id == request.student_id, Student.email == request.email)
+        ).first()
+        if existing:
+            raise StudentAlreadyExists()
+
+        student = Student(
+            name=request.name,
+            student_id=request.student_id,
+            department=request.department,
+            email=request.email,
+            created_at=get_pkt_time(),
+            updated_at=get_pkt_time()
+        )
+        db.add(student)
+        db.flush()
+        _log_activity(db, request.student_id, "student_created",
+                      f"New student {request.name} added to {request.department}")
+        db.commit()
+        _committed()
+        logger.info(f"Created student {request.student_id}")
+        return student_to_response(student)
+
+
+def update_student(student_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply `data` ({field: value} for name, department, email, is_active); returns the student and the changes"""
+    changes = {field: value for field, value in data.items() if value is not None}
+    if not changes:
+        raise InvalidStudentData(f"Nothing to update. Valid fields: {', '.join(UPDATABLE_FIELDS)}")
+    updates: Dict[str, Any] = {}
+    for field, value in changes.items():
+        value = str(value).lower() if isinstance(value, bool) else str(value)
+        request = _validated(UpdateStudentRequest, student_id=student_id, field=field, new_value=value)
+        updates[field] = request.new_value.lower() in ["true", "1", "yes", "active"] \
+            if field == "is_active" else request.new_value
+
+    with primary_session() as db:
+        student = _find(db, student_id)
+        if "email" in updates and updates["email"] != student.email:
+            taken = db.query(Student.id).filter(Student.email == updates["email"], Student.id != student.id).first()
+            if taken:
+                raise StudentAlreadyExists("Another student already uses this email")
+        for field, value in updates.items():
+            setattr(student, field, value)
+        student.updated_at = get_pkt_time()
+        _log_activity(db, student.student_id, "profile_update",
+                      ", ".join(f"Updated {field} to {value}" for field, value in updates.items()))
+        db.commit()
+        _committed()
+        logger.info(f"Updated student {student.student_id}: {', '.join(updates)}")
+        return {"student": student_to_response(student), "updated": updates}
+
+
+def delete_student(student_id: str) -> Dict[str, Any]:
+    """Delete the student; returns the deleted record"""
+    with primary_session() as db:
+        student = _find(db, student_id)
+        deleted = student_to_response(student)
+        db.delete(student)
+        _log_activity(db, student.student_id, "student_deleted", f"Student {student.name} deleted")
+        db.commit()
+        _committed()
+        logger.info(f"Deleted student {student.student_id}")
+        return deleted
+
+
+def get_all_students(after: int = 0, limit: Optional[int] = None, department: Optional[str] = None,
+                     is_active: Optional[bool] = None) -> Dict[str, Any]:
+    """One page of students ordered by id, starting after database id `after` (all of them without `limit`)"""
+    with SessionLocal() as db:
+        query = db.query(Student)
+        if department:
+            query = query.filter(func.lower(Student.department) == department.lower())
+        if is_active is not None:
+            query = query.filter(Student.is_active == is_active)
+        return _page(query, after, limit)
+
+
+def search_students(query: str, limit: int = 5, department: Optional[str] = None,
+                    is_active: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """Ranked fuzzy matches on name, email, student ID and department (see services/search.py)"""
+    with SessionLocal() as db:
+        return search.search_students(db, query, limit, department, is_active)
+
+
+# =============================================================================
+# ANALYTICS
+# =============================================================================
+
+def _active_query(db: Session, days: int):
+    since = get_pkt_time() - timedelta(days=days)
+    active_ids = db.query(ActivityLog.student_id).filter(ActivityLog.timestamp >= since).distinct().scalar_subquery()
+    return db.query(Student).filter(Student.student_id.in_(active_ids))
+
+
+def count_students() -> Dict[str, int]:
+    with SessionLocal() as db:
+        total = db.query(func.count(Student.id)).scalar()
+        active = db.query(func.count(Student.id)).filter(Student.is_active == True).scalar()
+        return {"total_students": total, "active_students": active, "inactive_students": total - active}
+
+
+def students_by_department(active_days: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Student count per department, optionally only students active in the last `active_days` days"""
+    with SessionLocal() as db:
+        query = _active_query(db, active_days) if active_days else db.query(Student)
+        rows = query.with_entities(Student.department, func.count(Student.id)).group_by(Student.department).all()
+        return [{"department": department, "count": count} for department, count in rows]
+
+
+def recent_students(limit: int = 5) -> List[Dict[str, Any]]:
+    request = _validated(RecentStudentsRequest, limit=limit)
+    with SessionLocal() as db:
+        students = db.query(Student).order_by(desc(Student.created_at)).limit(request.limit).all()
+        return [student_to_response(s) for s in students]
+
+
+def active_students(days: int = 7, after: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Students with activity in the last `days` days, paged like `get_all_students`"""
+    if days < 1:
+        raise InvalidStudentData("days must be at least 1")
+    with SessionLocal() as db:
+        return {**_page(_active_query(db, days), after, limit), "days": days}
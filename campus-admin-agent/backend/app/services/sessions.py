@@ -0,0 +1,326 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from agents.memory import SessionABC
+
+from .sqlite_store import SQLiteStore
+from ..utils.compaction import estimate_tokens
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+# Maximum estimated tokens of history replayed into each prompt
+SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", "4000"))
+# Share of the budget reserved for the summary of compacted turns
+SESSION_SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", "600"))
+SESSION_TOOL_CACHE_TTL = float(os.getenv("SESSION_TOOL_CACHE_TTL", "120"))
+
+SUMMARY_LINE_CHARS = 240
+# Opens the summary message. It is sent as an assistant message, since some
+# OpenAI-compatible endpoints (Gemini's among them) reject system messages
+# after the first turn; the marker keeps it from reading as a real reply.
+SUMMARY_MARKER = "[Summary of the earlier conversation, not a reply]"
+
+
+def item_text(item: Dict[str, Any]) -> Optional[str]:
+    """Readable text of a user/assistant message item, or None for tool traffic"""
+    role = item.get("role")
+    if role not in ("user", "assistant"):
+        return None
+    content = item.get("content")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or None
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class SessionStore(SQLiteStore):
+    """SQLite store for conversation history, compaction summaries, cached tool
+    results and token usage (see sqlite_store.py for connection handling)
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS session_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            item TEXT NOT NULL,
+            tokens INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_items_session ON session_items (session_id, id);
+        CREATE TABLE IF NOT EXISTS session_state (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT,
+            compacted_items INTEGER NOT NULL DEFAULT 0,
+            turns INTEGER NOT NULL DEFAULT 0,
+            requests INTEGER NOT NULL DEFAULT 0,
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            total_tokens INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS session_tool_cache (
+            session_id TEXT NOT NULL,
+            cache_key TEXT NOT NULL,
+            result TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (session_id, cache_key)
+        );
+    """
+
+    def __init__(self, db_path: str = SESSION_DB_PATH):
+        super().__init__(db_path)
+
+    # ---- history ----------------------------------------------------------
+
+    def load_items(self, session_id: str) -> List[tuple]:
+        rows = self._connect().execute(
+            "SELECT id, item, tokens FROM session_items WHERE session_id = ? ORDER BY id",
+            (session_id,),
+        ).fetchall()
+        return [(row_id, json.loads(item), tokens) for row_id, item, tokens in rows]
+
+    def append_items(self, session_id: str, items: List[Dict[str, Any]]):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO session_items (session_id, item, tokens) VALUES (?, ?, ?)",
+                [(session_id, json.dumps(item, default=str), estimate_tokens(item)) for item in items],
+            )
+            turns = sum(1 for item in items if item.get("role") == "user")
+            self._upsert_state(conn, session_id)
+            conn.execute(
+                "UPDATE session_state SET turns = turns + ?, updated_at = ? WHERE session_id = ?",
+                (turns, time.time(), session_id),
+            )
+
+    def pop_item(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, item FROM session_items WHERE session_id = ? ORDER BY id DESC LIMIT 1",
+                (session_id,),
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("DELETE FROM session_items WHERE id = ?", (row[0],))
+            return json.loads(row[1])
+
+    def compact(self, session_id: str, up_to_id: int, summary: str, count: int):
+        """Replace items with id <= `up_to_id` by `summary`"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_items WHERE session_id = ? AND id <= ?", (session_id, up_to_id))
+            self._upsert_state(conn, session_id)
+            conn.execute(
+                "UPDATE session_state SET summary = ?, compacted_items = compacted_items + ?, updated_at = ? "
+                "WHERE session_id = ?",
+                (summary, count, time.time(), session_id),
+            )
+
+    def clear(self, session_id: str):
+        with self._connect() as conn:
+            for table in ("session_items", "session_state", "session_tool_cache"):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    # ---- state and usage --------------------------------------------------
+
+    @staticmethod
+    def _upsert_state(conn: sqlite3.Connection, session_id: str):
+        conn.execute("INSERT OR IGNORE INTO session_state (session_id, updated_at) VALUES (?, ?)",
+                     (session_id, time.time()))
+
+    def get_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
+            stored = conn.execute(
+                "SELECT COUNT(*) AS items, COALESCE(SUM(tokens), 0) AS tokens FROM session_items WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        finally:
+            conn.row_factory = None
+        if row is None:
+            return None
+        state = dict(row)
+        state["history_items"] = stored["items"]
+        state["history_tokens"] = stored["tokens"] + (estimate_tokens(state["summary"]) if state["summary"] else 0)
+        return state
+
+    def add_usage(self, session_id: str, usage: Dict[str, int]):
+        with self._connect() as conn:
+            self._upsert_state(conn, session_id)
+            conn.execute(
+                "UPDATE session_state SET requests = requests + ?, input_tokens = input_tokens + ?, "
+                "output_tokens = output_tokens + ?, total_tokens = total_tokens + ?, updated_at = ? "
+                "WHERE session_id = ?",
+                (usage.get("requests", 0), usage.get("input_tokens", 0), usage.get("output_tokens", 0),
+                 usage.get("total_tokens", 0), time.time(), session_id),
+            )
+
+    # ---- tool result cache ------------------------------------------------
+
+    def cache_get(self, session_id: str, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT result FROM session_tool_cache WHERE session_id = ? AND cache_key = ? AND expires_at > ?",
+            (session_id, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache_set(self, session_id: str, key: str, value: Any, ttl: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_tool_cache (session_id, cache_key, result, expires_at) VALUES (?, ?, ?, ?)",
+                (session_id, key, json.dumps(value, default=str), time.time() + ttl),
+            )
+
+    def cache_clear(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_tool_cache WHERE session_id = ?", (session_id,))
+
+    def cache_clear_all(self):
+        """Drop every session's cached tool results; called after each committed data write"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_tool_cache")
+
+
+# =============================================================================
+# SESSION
+# =============================================================================
+
+class BudgetedSession(SessionABC):
+    """Agents SDK session whose replayed history never exceeds a token budget.
+
+    When the stored history outgrows the budget, the oldest turns are folded
+    into a running summary (user/assistant text, truncated; tool traffic is
+    dropped since results are cached separately) and deleted from the store.
+    The cut is always made at a user message so tool calls stay paired with
+    their outputs.
+    """
+
+    def __init__(self, session_id: str, store: SessionStore,
+                 token_budget: int = SESSION_TOKEN_BUDGET, summary_tokens: int = SESSION_SUMMARY_TOKENS):
+        self.session_id = session_id
+        self.store = store
+        self.token_budget = token_budget
+        self.summary_tokens = min(summary_tokens, token_budget // 2)
+
+    def _compact_sync(self) -> List[Dict[str, Any]]:
+        rows = self.store.load_items(self.session_id)
+        state = self.store.get_state(self.session_id) or {}
+        summary = state.get("summary")
+        history_budget = self.token_budget - self.summary_tokens
+
+        total = sum(tokens for _, _, tokens in rows)
+        if total > history_budget:
+            # Keep the newest suffix that starts at a user message and fits the budget
+            keep_from = len(rows)
+            running = 0
+            for index in range(len(rows) - 1, -1, -1):
+                running += rows[index][2]
+                if running > history_budget:
+                    break
+                if rows[index][1].get("role") == "user":
+                    keep_from = index
+            dropped = rows[:keep_from]
+            if dropped:
+                summary = self._summarize(summary, [item for _, item, _ in dropped])
+                self.store.compact(self.session_id, dropped[-1][0], summary, len(dropped))
+                logger.info(f"Session {self.session_id}: compacted {len(dropped)} items into summary")
+                rows = rows[keep_from:]
+
+        items = [item for _, item, _ in rows]
+        if summary:
+            items.insert(0, {"role": "assistant", "content": f"{SUMMARY_MARKER}\n{summary}"})
+        return items
+
+    def _summarize(self, previous: Optional[str], items: List[Dict[str, Any]]) -> str:
+        lines = previous.splitlines() if previous else []
+        for item in items:
+            text = item_text(item)
+            if text:
+                text = " ".join(text.split())
+                if len(text) > SUMMARY_LINE_CHARS:
+                    text = text[:SUMMARY_LINE_CHARS] + "..."
+                lines.append(f"{item['role']}: {text}")
+        # Keep the most recent lines that fit the summary budget
+        kept: List[str] = []
+        used = 0
+        for line in reversed(lines):
+            used += estimate_tokens(line)
+            if used > self.summary_tokens:
+                break
+            kept.append(line)
+        return "\n".join(reversed(kept))
+
+    async def get_items(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        items = await asyncio.to_thread(self._compact_sync)
+        return items[-limit:] if limit else items
+
+    async def add_items(self, items: List[Dict[str, Any]]) -> None:
+        if items:
+            await asyncio.to_thread(self.store.append_items, self.session_id, items)
+
+    async def pop_item(self) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.pop_item, self.session_id)
+
+    async def clear_session(self) -> None:
+        await asyncio.to_thread(self.store.clear, self.session_id)
+
+
+class SessionToolCache:
+    """`RequestContext.tool_cache` backed by the session store"""
+
+    def __init__(self, session_id: str, store: SessionStore, ttl: float = SESSION_TOOL_CACHE_TTL):
+        self.session_id = session_id
+        self.store = store
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.store.cache_get, self.session_id, key)
+
+    async def set(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.store.cache_set, self.session_id, key, value, self.ttl)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self.store.cache_clear, self.session_id)
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    global _store
+    if _store is None:
+        _store = SessionStore()
+    return _store
+
+
+def clear_tool_caches():
+    """Drop every session's cached tool results; app.main registers this as a service write listener"""
+    get_session_store().cache_clear_all()
+
+
+def open_session(session_id: str) -> tuple:
+    """Return the (session, tool cache) pair for `session_id`"""
+    store = get_session_store()
+    return BudgetedSession(session_id, store), SessionToolCache(session_id, store)
+
+
+async def record_session_usage(session_id: str, usage: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """Add a run's token usage to the session and return the session totals"""
+    store = get_session_store()
+    await asyncio.to_thread(store.add_usage, session_id, usage)
+    return await asyncio.to_thread(store.get_state, session_id)
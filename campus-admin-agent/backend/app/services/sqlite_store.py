@@ -0,0 +1,32 @@
+import sqlite3
+import threading
+
+# =============================================================================
+# LOCAL SQLITE STORES
+# =============================================================================
+# Base for the small SQLite files kept next to the app (sessions, usage). Each
+# thread gets its own connection, opened on first use in WAL mode so readers
+# never block the writer; calls are made from worker threads via
+# `asyncio.to_thread`.
+
+
+class SQLiteStore:
+    """SQLite file with one connection per thread; `schema` is run once when the store is created"""
+
+    schema = ""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        if self.schema:
+            with self._connect() as conn:
+                conn.executescript(self.schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
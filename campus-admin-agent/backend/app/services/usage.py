@@ -0,0 +1,335 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from agents import RunHooks
+
+from .scheduler import scheduler
+from .sqlite_store import SQLiteStore
+from ..utils.compaction import estimate_tokens
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+USAGE_DB_PATH = os.getenv("USAGE_DB_PATH", "usage.db")
+# Hard cap on tokens a single request may consume (0 disables)
+MAX_TOKENS_PER_REQUEST = int(os.getenv("MAX_TOKENS_PER_REQUEST", "0"))
+# Process-wide token budget per rolling minute (0 disables)
+MAX_TOKENS_PER_MINUTE = int(os.getenv("MAX_TOKENS_PER_MINUTE", "0"))
+# Above this share of the per-minute budget, new runs are degraded instead of rejected
+USAGE_DEGRADE_RATIO = float(os.getenv("USAGE_DEGRADE_RATIO", "0.8"))
+DEGRADED_MAX_OUTPUT_TOKENS = int(os.getenv("DEGRADED_MAX_OUTPUT_TOKENS", "512"))
+DEGRADED_MAX_TURNS = int(os.getenv("DEGRADED_MAX_TURNS", "4"))
+
+# USD per 1M tokens: {"model": {"input": x, "output": y}}
+DEFAULT_PRICING = {
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
+}
+LLM_PRICING = {**DEFAULT_PRICING, **json.loads(os.getenv("LLM_PRICING_JSON", "{}"))}
+
+BUDGET_EXCEEDED_MESSAGE = (
+    "This request used up its processing budget before an answer was complete. "
+    "Please narrow the question (for example a single student or department) and try again."
+)
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised from the run hooks when a request crosses MAX_TOKENS_PER_REQUEST"""
+
+
+class RateBudgetExceeded(Exception):
+    """Raised at admission when the per-minute token budget is exhausted"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Token budget per minute exhausted, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def model_name(agent) -> str:
+    model = getattr(agent, "model", None)
+    return getattr(model, "model", None) or str(model or "unknown")
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    pricing = LLM_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    return (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+
+
+# =============================================================================
+# ROLLING BUDGET
+# =============================================================================
+
+class MinuteWindow:
+    """Tokens consumed by this process over the last 60 seconds"""
+
+    def __init__(self):
+        self._events: deque = deque()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._events and self._events[0][0] <= now - 60:
+            self._total -= self._events.popleft()[1]
+
+    def add(self, tokens: int):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._events.append((now, tokens))
+            self._total += tokens
+
+    def total(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._total
+
+    def seconds_until_below(self, limit: int) -> int:
+        """How long until enough tokens age out of the window to go under `limit`"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            excess = self._total - limit
+            for ts, tokens in self._events:
+                excess -= tokens
+                if excess < 0:
+                    return max(1, int(ts + 60 - now) + 1)
+            return 60
+
+
+minute_window = MinuteWindow()
+
+
+def admit_run() -> bool:
+    """Check the per-minute budget before starting a run.
+
+    Returns True when the run should be degraded (capped output and turns),
+    raises RateBudgetExceeded when the budget is exhausted.
+    """
+    if not MAX_TOKENS_PER_MINUTE:
+        return False
+    used = minute_window.total()
+    if used >= MAX_TOKENS_PER_MINUTE:
+        raise RateBudgetExceeded(minute_window.seconds_until_below(MAX_TOKENS_PER_MINUTE))
+    return used >= MAX_TOKENS_PER_MINUTE * USAGE_DEGRADE_RATIO
+
+
+# =============================================================================
+# PER-RUN ACCOUNTING
+# =============================================================================
+
+class UsageTracker(RunHooks):
+    """Run hooks that account tokens, LLM calls, tool calls and wall time per agent"""
+
+    def __init__(self, request_id: str, route: str, session_id: Optional[str] = None,
+                 max_tokens: int = MAX_TOKENS_PER_REQUEST):
+        self.request_id = request_id
+        self.route = route
+        self.session_id = session_id
+        self.max_tokens = max_tokens
+        self.started = time.perf_counter()
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[str] = None
+        self._current_since = self.started
+
+    def _stats(self, agent) -> Dict[str, Any]:
+        if agent.name not in self.agents:
+            self.agents[agent.name] = {
+                "agent": agent.name, "model": model_name(agent), "llm_calls": 0, "tool_calls": 0,
+                "input_tokens": 0, "output_tokens": 0, "tool_output_tokens": 0, "wall_ms": 0.0,
+            }
+        return self.agents[agent.name]
+
+    def _switch_to(self, name: Optional[str]):
+        now = time.perf_counter()
+        if self._current:
+            self.agents[self._current]["wall_ms"] += (now - self._current_since) * 1000
+        self._current, self._current_since = name, now
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(a["input_tokens"] + a["output_tokens"] for a in self.agents.values())
+
+    async def on_agent_start(self, context, agent):
+        self._stats(agent)
+        self._switch_to(agent.name)
+
+    async def on_agent_end(self, context, agent, output):
+        self._switch_to(None)
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        if self.max_tokens and self.total_tokens >= self.max_tokens:
+            logger.warning(f"Request {self.request_id}: token budget of {self.max_tokens} exceeded")
+            raise TokenBudgetExceeded(f"Request exceeded {self.max_tokens} tokens")
+        waited = await scheduler.pace()
+        if waited:
+            logger.info(f"Request {self.request_id}: waited {waited:.2f}s for LLM quota")
+
+    async def on_llm_end(self, context, agent, response):
+        stats = self._stats(agent)
+        stats["llm_calls"] += 1
+        stats["input_tokens"] += response.usage.input_tokens or 0
+        stats["output_tokens"] += response.usage.output_tokens or 0
+        minute_window.add((response.usage.input_tokens or 0) + (response.usage.output_tokens or 0))
+
+    async def on_tool_start(self, context, agent, tool):
+        self._stats(agent)["tool_calls"] += 1
+
+    async def on_tool_end(self, context, agent, tool, result):
+        # The model receives str(result); this is what the tool adds to the next prompt
+        tokens = estimate_tokens(result)
+        self._stats(agent)["tool_output_tokens"] += tokens
+        logger.info(f"Request {self.request_id}: {tool.name} output ~{tokens} tokens")
+
+    def merge(self, other: "UsageTracker"):
+        """Fold another tracker's per-agent totals (e.g. a parallel branch) into this one"""
+        other._switch_to(None)
+        for name, stats in other.agents.items():
+            if name not in self.agents:
+                self.agents[name] = dict(stats)
+                continue
+            for key in ("llm_calls", "tool_calls", "input_tokens", "output_tokens", "tool_output_tokens", "wall_ms"):
+                self.agents[name][key] += stats[key]
+
+    def summary(self) -> Dict[str, Any]:
+        agents = []
+        for stats in self.agents.values():
+            agents.append({
+                **stats,
+                "wall_ms": round(stats["wall_ms"], 2),
+                "cost_usd": round(estimate_cost(stats["model"], stats["input_tokens"], stats["output_tokens"]), 8),
+            })
+        return {
+            "request_id": self.request_id,
+            "input_tokens": sum(a["input_tokens"] for a in agents),
+            "output_tokens": sum(a["output_tokens"] for a in agents),
+            "llm_calls": sum(a["llm_calls"] for a in agents),
+            "tool_calls": sum(a["tool_calls"] for a in agents),
+            "tool_output_tokens": sum(a["tool_output_tokens"] for a in agents),
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "cost_usd": round(sum(a["cost_usd"] for a in agents), 8),
+            "agents": agents,
+        }
+
+    async def finalize(self, status: str = "ok") -> Dict[str, Any]:
+        """Close the books on the run and persist it to the usage store"""
+        self._switch_to(None)
+        summary = self.summary()
+        try:
+            await asyncio.to_thread(get_usage_store().record, self.route, self.session_id, status, summary)
+        except Exception as e:
+            logger.error(f"Request {self.request_id}: failed to record usage: {str(e)}")
+        return summary
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+GROUP_COLUMNS = {"agent": "agent", "model": "model", "route": "route", "session": "session_id", "status": "status"}
+
+
+class UsageStore(SQLiteStore):
+    """SQLite store of per-request and per-agent usage"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS usage_requests (
+            request_id TEXT PRIMARY KEY,
+            ts REAL NOT NULL,
+            route TEXT NOT NULL,
+            session_id TEXT,
+            status TEXT NOT NULL,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            llm_calls INTEGER NOT NULL,
+            tool_calls INTEGER NOT NULL,
+            wall_ms REAL NOT NULL,
+            cost_usd REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_usage_requests_ts ON usage_requests (ts);
+        CREATE TABLE IF NOT EXISTS usage_agents (
+            request_id TEXT NOT NULL,
+            ts REAL NOT NULL,
+            route TEXT NOT NULL,
+            session_id TEXT,
+            status TEXT NOT NULL,
+            agent TEXT NOT NULL,
+            model TEXT NOT NULL,
+            input_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            llm_calls INTEGER NOT NULL,
+            tool_calls INTEGER NOT NULL,
+            wall_ms REAL NOT NULL,
+            cost_usd REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_usage_agents_ts ON usage_agents (ts);
+    """
+
+    def __init__(self, db_path: str = USAGE_DB_PATH):
+        super().__init__(db_path)
+
+    def record(self, route: str, session_id: Optional[str], status: str, summary: Dict[str, Any]):
+        ts = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO usage_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (summary["request_id"], ts, route, session_id, status, summary["input_tokens"],
+                 summary["output_tokens"], summary["llm_calls"], summary["tool_calls"],
+                 summary["wall_ms"], summary["cost_usd"]),
+            )
+            conn.executemany(
+                "INSERT INTO usage_agents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(summary["request_id"], ts, route, session_id, status, a["agent"], a["model"],
+                  a["input_tokens"], a["output_tokens"], a["llm_calls"], a["tool_calls"],
+                  a["wall_ms"], a["cost_usd"]) for a in summary["agents"]],
+            )
+
+    def aggregate(self, group_by: str = "agent", since_minutes: float = 60) -> List[Dict[str, Any]]:
+        """Totals per `group_by` (agent, model, route, session, status) over a time window"""
+        column = GROUP_COLUMNS[group_by]
+        # Agent and model live on per-agent rows; other groupings use per-request rows
+        table = "usage_agents" if group_by in ("agent", "model") else "usage_requests"
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT {column} AS key, COUNT(DISTINCT request_id) AS requests,
+                       SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens,
+                       SUM(llm_calls) AS llm_calls, SUM(tool_calls) AS tool_calls,
+                       ROUND(SUM(wall_ms), 2) AS wall_ms, ROUND(AVG(wall_ms), 2) AS avg_wall_ms,
+                       ROUND(SUM(cost_usd), 6) AS cost_usd
+                FROM {table}
+                WHERE ts >= ?
+                GROUP BY {column}
+                ORDER BY SUM(input_tokens) + SUM(output_tokens) DESC
+                """,
+                (time.time() - since_minutes * 60,),
+            ).fetchall()
+        finally:
+            conn.row_factory = None
+        return [dict(row) for row in rows]
+
+
+_store: Optional[UsageStore] = None
+
+
+def get_usage_store() -> UsageStore:
+    global _store
+    if _store is None:
+        _store = UsageStore()
+    return _store
@@ -0,0 +1,79 @@
+import base64
+import json
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# =============================================================================
+# TOOL OUTPUT COMPACTION
+# =============================================================================
+# Tool results are pasted into the prompt verbatim, so row lists are sent as a
+# header plus value rows instead of one dict per row (no repeated key names),
+# with only the fields the caller asked for and timestamps cut to the minute.
+# Long lists are capped at TOOL_OUTPUT_MAX_ROWS and carry a keyset cursor that
+# fetches the next page.
+
+COMPACT_TOOL_OUTPUT = os.getenv("COMPACT_TOOL_OUTPUT", "true").lower() in ("1", "true", "yes")
+TOOL_OUTPUT_MAX_ROWS = int(os.getenv("TOOL_OUTPUT_MAX_ROWS", "25"))
+
+STUDENT_FIELDS = ("id", "student_id", "name", "department", "email", "is_active", "created_at", "updated_at")
+# What a student row carries when the caller doesn't pick fields
+DEFAULT_STUDENT_FIELDS = ("student_id", "name", "department", "email", "is_active", "created_at")
+
+_ISO_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})[\d:.]*(?:[+-]\d{2}:\d{2}|Z)?$")
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count of `value` as the model sees it (~4 characters per token, JSON for non-strings).
+
+    The one estimate used for every token budget (tool output, session history).
+    """
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return max(1, math.ceil(len(text) / 4))
+
+
+def resolve_fields(fields: Optional[Sequence[str]], allowed: Sequence[str] = STUDENT_FIELDS,
+                   default: Sequence[str] = DEFAULT_STUDENT_FIELDS) -> List[str]:
+    """Validate the requested fields, keeping their order; the default set when none are given"""
+    if not fields:
+        return list(default)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return list(dict.fromkeys(fields))
+
+
+def _compact_value(value: Any) -> Any:
+    if isinstance(value, str):
+        match = _ISO_TIMESTAMP.match(value)
+        if match:
+            return f"{match.group(1)} {match.group(2)}"
+    return value
+
+
+def to_columns(rows: Iterable[Dict[str, Any]], fields: Sequence[str]) -> Any:
+    """`{"columns": [...], "rows": [[...], ...]}` for `rows`, or plain dicts with compaction disabled"""
+    if not COMPACT_TOOL_OUTPUT:
+        return [{f: row.get(f) for f in fields} for row in rows]
+    return {"columns": list(fields), "rows": [[_compact_value(row.get(f)) for f in fields] for row in rows]}
+
+
+def page_size(requested: Optional[int] = None) -> int:
+    return max(1, min(requested or TOOL_OUTPUT_MAX_ROWS, TOOL_OUTPUT_MAX_ROWS))
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque continuation token: rows after primary key `last_id`"""
+    return base64.urlsafe_b64encode(json.dumps({"after": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Primary key to continue after (0 for the first page)"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["after"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor; pass the next_cursor value from the previous result") from e
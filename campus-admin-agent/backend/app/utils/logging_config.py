@@ -0,0 +1,16 @@
+import logging
+import os
+
+# One logging setup for the whole process; modules only call logging.getLogger(__name__)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Optional log file in addition to stderr
+LOG_FILE = os.getenv("LOG_FILE")
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Configure the root logger; a no-op if it already has handlers"""
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
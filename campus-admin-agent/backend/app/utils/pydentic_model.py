@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Literal, Optional, Union
 from pydantic import BaseModel, Field, EmailStr, validator
 import logging
 import re
@@ -20,15 +20,6 @@ def student_to_response(student):
         "updated_at": student.updated_at.isoformat() if student.updated_at else None,
     }
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('student_management_tools.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # PKT timezone (UTC+5)
@@ -155,3 +146,52 @@ class ApiResponse(BaseModel):
     data: Optional[Dict[str, Any]] = Field(None, description="Response data")
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique request identifier")
 
+# =============================================================================
+# QUERY SPEC MODELS
+# =============================================================================
+# Structured query accepted by the query_campus_data tool; fields are checked
+# against a whitelist and compiled to SQL in services/query_spec.py.
+
+QueryValue = Union[str, float, bool, List[Union[str, float]]]
+
+class QueryFilter(BaseModel):
+    """One condition; all filters of a spec are combined with AND"""
+    field: str = Field(..., description="Column, e.g. department, created_at, activity_type or student.department")
+    op: Literal["eq", "ne", "lt", "lte", "gt", "gte", "in", "not_in", "contains", "starts_with", "between", "is_null", "not_null"] = Field(
+        "eq", description="Comparison operator"
+    )
+    value: Optional[QueryValue] = Field(
+        None, description="Value to compare with; a list for in/not_in/between. Dates are ISO (2025-03-01) or relative: now-12h, now-7d, now-2w, now-3mo"
+    )
+
+class QueryGroupBy(BaseModel):
+    """Group key, optionally bucketing a timestamp column"""
+    field: str = Field(..., description="Column to group by")
+    bucket: Optional[Literal["day", "week", "month", "year"]] = Field(None, description="Date bucket for timestamp columns")
+
+class QueryAggregate(BaseModel):
+    """Aggregate computed per group (or over all matching rows without group_by)"""
+    func: Literal["count", "count_distinct", "min", "max", "sum", "avg"] = Field(..., description="Aggregate function")
+    field: Optional[str] = Field(None, description="Column to aggregate; omit for count(*)")
+
+class QuerySort(BaseModel):
+    """Sort key: a column, a group field or an aggregate name such as count or count_distinct_student_id"""
+    field: str = Field(..., description="Column or result name to sort by")
+    direction: Literal["asc", "desc"] = Field("asc", description="Sort direction")
+
+class QuerySpec(BaseModel):
+    """Whitelisted filter/aggregate query over students or activity_logs"""
+    source: Literal["students", "activity_logs"] = Field(..., description="Table to query")
+    filters: List[QueryFilter] = Field(default_factory=list, description="Conditions, combined with AND")
+    group_by: List[QueryGroupBy] = Field(default_factory=list, description="Group keys")
+    aggregates: List[QueryAggregate] = Field(default_factory=list, description="Aggregates; required with group_by")
+    select: List[str] = Field(default_factory=list, description="Columns to return when not aggregating (default: a compact set)")
+    sort: List[QuerySort] = Field(default_factory=list, description="Sort keys, in order")
+    limit: int = Field(50, description="Maximum rows to return (capped server-side)")
+
+    @validator('group_by')
+    def validate_group_by(cls, v):
+        keys = [(group.field, group.bucket) for group in v]
+        if len(set(keys)) != len(keys):
+            raise ValueError('Each group_by field (and bucket) may appear only once')
+        return v
@@ -0,0 +1,88 @@
+"""NDJSON batch checks for POST /chat/batch.
+
+Agent runs are replaced by stubs, so no LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_batch.py
+"""
+import asyncio
+import json
+
+from fastapi import HTTPException
+
+from app.api.batch import stream_batch
+
+
+def collect(items, handle, concurrency):
+    async def run():
+        return [json.loads(line) async for line in stream_batch(items, handle, concurrency)]
+    return asyncio.run(run())
+
+
+def test_failed_items_become_error_lines():
+    async def handle(index, query):
+        if query == "boom":
+            raise ValueError("bad query")
+        if query == "busy":
+            raise HTTPException(status_code=503, detail="LLM unavailable")
+        return {"response": query.upper()}
+
+    lines = collect(["a", "boom", "b", "busy", "c"], handle, concurrency=2)
+    results, summary = {line["index"]: line for line in lines[:-1]}, lines[-1]
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert results[1] == {"index": 1, "status": 500, "error": "bad query"}
+    assert results[3] == {"index": 3, "status": 503, "error": "LLM unavailable"}
+    assert [results[i]["response"] for i in (0, 2, 4)] == ["A", "B", "C"]
+    assert summary["done"] and summary["items"] == 5 and summary["errors"] == 2
+
+
+def test_lines_arrive_as_items_finish_with_their_index():
+    delays = [0.06, 0.0, 0.03, 0.0]
+
+    async def handle(index, delay):
+        await asyncio.sleep(delay)
+        return {"response": f"item {index}"}
+
+    lines = collect(delays, handle, concurrency=4)[:-1]
+    assert [line["index"] for line in lines] == [1, 3, 2, 0]
+    assert all(line["response"] == f"item {line['index']}" for line in lines)
+
+
+def test_concurrency_limit():
+    running, peak = 0, 0
+
+    async def handle(index, query):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"response": query}
+
+    lines = collect([str(i) for i in range(20)], handle, concurrency=3)
+    assert peak == 3
+    assert len(lines) == 21 and lines[-1]["errors"] == 0
+
+
+def test_batch_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.api import runs
+    from app.main import app
+
+    async def run_agent(route, request):
+        if request.query == "fail":
+            raise HTTPException(status_code=400, detail="cannot answer")
+        return {"response": f"answer to {request.query}"}
+
+    monkeypatch.setattr(runs, "run_agent", run_agent)
+    client = TestClient(app)
+    response = client.post("/chat/batch", json={"queries": ["one", "fail", "two"], "concurrency": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert by_index[0]["response"] == "answer to one" and by_index[2]["response"] == "answer to two"
+    assert by_index[1] == {"index": 1, "status": 400, "error": "cannot answer"}
+    assert lines[-1]["errors"] == 1
+
+    assert client.post("/chat/batch", json={"queries": ["one"], "concurrency": 1000}).status_code == 422
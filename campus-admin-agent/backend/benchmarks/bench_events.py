@@ -0,0 +1,129 @@
+"""Live activity feed checks: the tailer, slow subscribers and department filters.
+
+Each test runs on a private copy of the small dataset; no HTTP server is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_events.py
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def feed(writable_db, monkeypatch):
+    """A fresh feed that the service layer wakes on every write; the slow poll never fires"""
+    from app.services import events, service
+
+    feed = events.ActivityFeed()
+    monkeypatch.setattr(events, "EVENTS_POLL_SECONDS", 60)
+    monkeypatch.setattr(service, "activity_feed", feed)
+    return feed
+
+
+def first_student(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT student_id, department FROM students ORDER BY id LIMIT 1").one()
+
+
+async def next_activity(feed, subscription, timeout=2.0):
+    from app.services.events import iter_events
+
+    async for item in iter_events(feed, subscription, timeout=timeout):
+        assert item is not None, "no event before the timeout"
+        name, payload, _ = item
+        if name == "activity":
+            return payload
+
+
+def test_write_wakes_the_tailer(feed, writable_db):
+    """The event arrives on the commit's wake-up, well before the 60s poll"""
+    from app.services import service
+
+    student_id, department = first_student(writable_db["engine"])
+
+    async def run():
+        subscription = await feed.subscribe(summary=False)
+        await asyncio.to_thread(service.update_student, student_id, {"is_active": False})
+        event = await asyncio.wait_for(next_activity(feed, subscription), 2)
+        feed.unsubscribe(subscription)
+        return event
+
+    event = asyncio.run(run())
+    assert event["student_id"] == student_id and event["department"] == department
+    assert event["activity_type"] == "profile_update"
+    assert feed.stats["wakeups"] >= 1 and feed.report()["subscribers"] == 0
+
+
+def add_logins(student_id, count):
+    from app.models.models import ActivityLog, primary_session
+
+    with primary_session() as db:
+        logs = [ActivityLog(student_id=student_id, activity_type="login", description=f"login {i}")
+                for i in range(count)]
+        db.add_all(logs)
+        db.commit()
+        return [log.id for log in logs]
+
+
+def test_slow_subscriber_catches_up_from_the_table(feed, writable_db, monkeypatch):
+    """A full queue drops live events; the reader gets every one, in order, from the table instead"""
+    from app.services import events
+
+    monkeypatch.setattr(events, "EVENTS_QUEUE_SIZE", 4)
+    monkeypatch.setattr(feed, "notify", lambda: None)  # polls happen only when the test says so
+    student_id, _ = first_student(writable_db["engine"])
+
+    async def run():
+        subscription = await feed.subscribe(summary=False)
+        stream = events.iter_events(feed, subscription, timeout=0.05)
+        assert await anext(stream) is None  # caught up and reading the live queue
+        written = await asyncio.to_thread(add_logins, student_id, 10)
+        await feed._poll()
+        assert subscription.lagging and subscription.queue.qsize() == 4
+        assert feed.report()["lagging"] == 1 and feed.stats["lagged"] == 1
+        received = []
+        while len(received) < len(written):
+            item = await asyncio.wait_for(anext(stream), 2)
+            if item is not None:
+                received.append(item[1]["id"])
+        assert not subscription.lagging
+        feed.unsubscribe(subscription)
+        return written, received
+
+    written, received = asyncio.run(run())
+    assert received == written
+
+
+def test_department_filter_keeps_deletions(feed, writable_db, monkeypatch):
+    """A deleted student's row is gone when the event is read; the deletion still reaches the filtered feed"""
+    from app.services import service
+
+    monkeypatch.setattr(feed, "notify", lambda: None)
+    student_id, department = first_student(writable_db["engine"])
+    with writable_db["engine"].connect() as conn:
+        other_id = conn.exec_driver_sql(
+            "SELECT student_id FROM students WHERE department != ? ORDER BY id LIMIT 1", (department,)).scalar_one()
+
+    async def run():
+        live = await feed.subscribe(departments={department.lower()}, summary=False)
+        start = feed.cursor
+        await asyncio.to_thread(service.update_student, other_id, {"is_active": False})
+        await asyncio.to_thread(service.delete_student, student_id)
+        await feed._poll()
+        queued = []
+        while not live.queue.empty():
+            queued.append(live.queue.get_nowait())
+        # A reconnect replays from the table, through the same filter
+        replayed = await feed.subscribe(last_event_id=start, departments={department.lower()}, summary=False)
+        from_table = [event async for event in replayed.replay()]
+        feed.unsubscribe(live)
+        feed.unsubscribe(replayed)
+        return queued, from_table
+
+    queued, from_table = asyncio.run(run())
+    assert len(queued) == 1
+    name, deleted = queued[0]
+    assert name == "activity" and deleted["activity_type"] == "student_deleted"
+    assert deleted["student_id"] == student_id
+    assert from_table == [deleted]
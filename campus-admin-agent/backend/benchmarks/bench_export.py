@@ -0,0 +1,98 @@
+"""Export round trips: every format decodes back to the rows in the table.
+
+Parquet and Arrow checks are skipped when pyarrow is not installed.
+
+Run from the backend directory:
+    pytest benchmarks/bench_export.py
+"""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services import export
+
+
+def table_rows(engine, table):
+    from sqlalchemy import select
+
+    model, columns, _ = export.EXPORT_TABLES[table]
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(select(*(getattr(model, c) for c in columns)).order_by(model.id))]
+
+
+def decode(fmt, data, columns):
+    """The exported rows as dicts, with values as the format stores them"""
+    if fmt == "csv":
+        header, *rows = csv.reader(io.StringIO(data.decode()))
+        assert tuple(header) == columns
+        return [dict(zip(columns, row)) for row in rows]
+    if fmt == "ndjson":
+        return [json.loads(line) for line in data.decode().splitlines()]
+    import pyarrow as pa
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(io.BytesIO(data)).to_pylist()
+    return pa.ipc.open_stream(data).read_all().to_pylist()
+
+
+def expected(fmt, rows, columns):
+    if fmt == "csv":
+        return [{c: "" if v is None else str(export._text(v)) for c, v in zip(columns, row)} for row in rows]
+    if fmt == "ndjson":
+        return [{c: export._text(v) for c, v in zip(columns, row)} for row in rows]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson", "parquet", "arrow"])
+def test_round_trip(scaled_db, fmt):
+    if fmt in export.COLUMNAR_FORMATS:
+        pytest.importorskip("pyarrow")
+    columns = export.EXPORT_TABLES["students"][1]
+    data = b"".join(export.stream_export("students", fmt))
+    assert decode(fmt, data, columns) == expected(fmt, table_rows(scaled_db["engine"], "students"), columns)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_gzip_round_trip(scaled_db, fmt):
+    columns = export.EXPORT_TABLES["students"][1]
+    data = gzip.decompress(b"".join(export.stream_export("students", fmt, compress=True)))
+    assert decode(fmt, data, columns) == expected(fmt, table_rows(scaled_db["engine"], "students"), columns)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "parquet", "arrow"])
+def test_export_spanning_chunks(scaled_db, fmt):
+    """Chunk boundaries neither drop nor repeat rows; columnar files get one batch per chunk"""
+    if fmt in export.COLUMNAR_FORMATS:
+        pytest.importorskip("pyarrow")
+    columns = export.EXPORT_TABLES["students"][1]
+    chunk_rows = 300
+    chunks = -(-scaled_db["students"] // chunk_rows)
+    pieces = list(export.stream_export("students", fmt, chunk_rows=chunk_rows))
+    data = b"".join(pieces)
+    assert len(pieces) >= chunks
+    assert decode(fmt, data, columns) == expected(fmt, table_rows(scaled_db["engine"], "students"), columns)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == chunks
+    elif fmt == "arrow":
+        import pyarrow as pa
+        assert len(list(pa.ipc.open_stream(data))) == chunks
+
+
+def test_partitioned_export(scaled_db, tmp_path):
+    """Monthly files hold every activity row once, each in the file for its month"""
+    columns = export.EXPORT_TABLES["activity_logs"][1]
+    files = export.export_to_directory("activity_logs", str(tmp_path), "csv", partition="month", chunk_rows=5000)
+    assert sum(f["rows"] for f in files) == scaled_db["activity_logs"]
+    exported = []
+    for f in files:
+        with open(f["path"], "rb") as handle:
+            rows = decode("csv", handle.read(), columns)
+        assert len(rows) == f["rows"]
+        assert all(row["timestamp"].startswith(f["partition"]) for row in rows)
+        exported.extend(rows)
+    rows = table_rows(scaled_db["engine"], "activity_logs")
+    assert sorted(exported, key=lambda row: int(row["id"])) == expected("csv", rows, columns)
@@ -0,0 +1,100 @@
+"""Parallel fan-out checks: answer order, concurrency and partial failures.
+
+`Runner.run` is replaced by a stub that reports one LLM call to the run hooks,
+so no LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_fanout.py
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from agents.usage import Usage
+
+from app.agent import fanout
+from app.services.usage import TokenBudgetExceeded, UsageTracker
+
+QUESTION = "How many students are in CS and when does the library close?"
+
+
+@pytest.fixture
+def stub_runner(monkeypatch):
+    """Runner.run stand-in: `behaviour[agent name]` is a delay in seconds or an exception to raise"""
+    behaviour = {}
+    budgets = {}
+
+    async def run(agent, query, context=None, hooks=None, **options):
+        budgets[agent.name] = hooks.max_tokens
+        await hooks.on_agent_start(context, agent)
+        await hooks.on_llm_start(context, agent, None, [])
+        outcome = behaviour.get(agent.name, 0.0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        await asyncio.sleep(outcome)
+        await hooks.on_llm_end(context, agent, SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=5)))
+        await hooks.on_agent_end(context, agent, None)
+        usage = Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15)
+        return SimpleNamespace(final_output=f"{agent.name}: {query}", context_wrapper=SimpleNamespace(usage=usage))
+
+    monkeypatch.setattr(fanout.Runner, "run", run)
+    return SimpleNamespace(behaviour=behaviour, budgets=budgets)
+
+
+def run_question(hooks=None):
+    hooks = hooks or UsageTracker("fanout-test", "/chat", max_tokens=1000)
+    return asyncio.run(fanout.run_fanout(fanout.plan_fanout(QUESTION), None, hooks)), hooks
+
+
+def test_plan_keeps_question_order():
+    branches = fanout.plan_fanout(QUESTION)
+    assert [b.agent for b in branches] == [fanout.campus_analytics_agent, fanout.campus_info_agent]
+    assert branches[0].query == "How many students are in CS"
+    assert branches[1].query == "when does the library close"
+    assert fanout.plan_fanout("How many students are in CS?") == []
+
+
+def test_branches_run_concurrently_in_question_order(stub_runner):
+    analytics, info = fanout.campus_analytics_agent.name, fanout.campus_info_agent.name
+    # The first branch finishes last
+    stub_runner.behaviour.update({analytics: 0.3, info: 0.0})
+    started = time.perf_counter()
+    result, hooks = run_question()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5, f"branches ran one after the other ({elapsed:.2f}s)"
+    assert result.final_output == f"{analytics}: How many students are in CS\n\n{info}: when does the library close"
+    assert [b["agent"] for b in result.branches] == [analytics, info]
+    assert result.last_agent is fanout.campus_info_agent
+    assert result.usage.total_tokens == 30 and hooks.total_tokens == 30
+    # Each branch gets an equal share of the request's token budget
+    assert stub_runner.budgets == {analytics: 500, info: 500}
+
+
+def test_failed_branch_does_not_sink_the_others(stub_runner):
+    analytics, info = fanout.campus_analytics_agent.name, fanout.campus_info_agent.name
+    stub_runner.behaviour[analytics] = RuntimeError("database unavailable")
+    result, hooks = run_question()
+
+    first, second = result.final_output.split("\n\n")
+    assert first == "I couldn't complete this part of your request: \"How many students are in CS\"."
+    assert second == f"{info}: when does the library close"
+    assert result.branches[0]["error"] == "database unavailable" and "response" not in result.branches[0]
+    assert result.branches[1]["response"] == second
+    assert result.usage.total_tokens == 15
+
+
+def test_budget_errors_are_reported_as_such(stub_runner):
+    stub_runner.behaviour[fanout.campus_info_agent.name] = TokenBudgetExceeded("Request exceeded 500 tokens")
+    result, _ = run_question()
+    assert result.branches[1]["error"] == "budget_exceeded"
+
+
+def test_every_branch_failing_fails_the_request(stub_runner):
+    stub_runner.behaviour.update({
+        fanout.campus_analytics_agent.name: RuntimeError("first"),
+        fanout.campus_info_agent.name: RuntimeError("second"),
+    })
+    with pytest.raises(RuntimeError, match="first"):
+        run_question()
@@ -0,0 +1,83 @@
+"""Speculative prefetch must overlap the first LLM call, not delay it.
+
+The prefetched tool's database call is replaced by a blocking sleep and the
+LLM call by an asyncio sleep of the same length. When the tool runs off the
+event loop the two overlap and the request takes about one of them.
+
+Run from the backend directory:
+    pytest benchmarks/bench_prefetch.py
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+DB_SECONDS = 0.3
+LLM_SECONDS = 0.3
+
+
+def test_prefetch_overlaps_llm_call(monkeypatch):
+    from app.agent import prefetch
+    from app.services import service
+
+    def slow_departments():
+        time.sleep(DB_SECONDS)  # a blocking SQLAlchemy query
+        return [{"department": "Physics", "count": 1}]
+
+    monkeypatch.setattr(service, "students_by_department", slow_departments)
+    monkeypatch.setattr(prefetch, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(prefetch.prefetch_stats, "should_prefetch", lambda name: True)
+
+    async def request():
+        context = SimpleNamespace(tool_cache=None)
+        cache = prefetch.start_prefetch(context, "department breakdown please")
+        started = time.perf_counter()
+        # The first LLM call: the request goes out once the loop gets to it, then waits for the reply
+        await asyncio.sleep(0)
+        await asyncio.sleep(LLM_SECONDS)
+        llm_done = time.perf_counter() - started
+        key = prefetch.tool_cache_key(prefetch.get_students_by_department, "{}")
+        result = await cache.get(key)
+        return llm_done, time.perf_counter() - started, result
+
+    llm_done, total, result = asyncio.run(request())
+    assert result["success"] and result["data"]["departments"][0]["department"] == "Physics"
+    assert llm_done < LLM_SECONDS + 0.1, f"LLM call delayed to {llm_done:.2f}s by the prefetch"
+    assert total < DB_SECONDS + LLM_SECONDS - 0.1, f"prefetch and LLM call ran back to back ({total:.2f}s)"
+
+
+def test_cache_key_matches_strict_model_arguments():
+    """Strict schemas make optional parameters required, so the model sends them as null"""
+    from app.agent.tool_cache import tool_cache_key
+    from app.Tools.Campus_analytics_tools import get_active_students_last_7_days, get_recent_onboarded_students
+
+    assert tool_cache_key(get_active_students_last_7_days, "{}") == \
+        tool_cache_key(get_active_students_last_7_days, '{"fields": null, "cursor": null}')
+    assert tool_cache_key(get_recent_onboarded_students, "{}") == \
+        tool_cache_key(get_recent_onboarded_students, '{"limit": 5, "fields": null}')
+    assert tool_cache_key(get_recent_onboarded_students, "{}") != \
+        tool_cache_key(get_recent_onboarded_students, '{"limit": 5, "fields": ["name"]}')
+
+
+def test_every_prefetch_rule_is_hit_by_the_model_call(scaled_db):
+    """Each rule's prefetch serves the call a strict-mode model makes for that tool"""
+    from agents.tool_context import ToolContext
+    from app.agent import agent  # noqa: F401  wraps the tools with the cache
+    from app.agent import prefetch
+
+    async def model_call(tool, cache):
+        schema = tool.params_json_schema
+        # Strict mode: every property is required, unset ones are sent at their default or as null
+        arguments = {name: schema["properties"][name].get("default") for name in schema.get("required", [])}
+        ctx = ToolContext(context=SimpleNamespace(tool_cache=cache), tool_name=tool.name, tool_call_id="model")
+        return await tool.on_invoke_tool(ctx, json.dumps(arguments))
+
+    async def run():
+        for _, tool, arguments in prefetch.PREFETCH_RULES:
+            cache = prefetch.RequestToolCache()
+            cache.prefetch(tool, arguments)
+            result = await model_call(tool, cache)
+            assert result["success"], result
+            assert cache.used == set(cache.prefetched), f"prefetch of {tool.name} was not used"
+
+    asyncio.run(run())
@@ -0,0 +1,173 @@
+"""Read/write routing checks against a primary and a read replica.
+
+Both databases are small SQLite files: the replica is a copy of the primary
+made with `app.models.replica`, so it only has what the primary had when it
+was copied. No LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_routing.py
+"""
+import itertools
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from benchmarks.conftest import QueryCounter
+
+
+class StatementLog:
+    """SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+
+@pytest.fixture
+def replicated_db(tmp_path, monkeypatch):
+    """Bind the app to a seeded primary with one read replica copied from it"""
+    from benchmarks.seed_data import seed
+    from app.models import models
+    from app.models.replica import copy_database
+
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_path = tmp_path / "replica.db"
+    seed(primary_url, 300, 1_000, reset=True, verbose=False)
+    copy_database(primary_url, str(replica_path))
+
+    primary = create_engine(primary_url)
+    replica = create_engine(f"sqlite:///{replica_path}")
+    original_bind = models.SessionLocal.kw.get("bind")
+    models.SessionLocal.configure(bind=primary)
+    monkeypatch.setattr(models, "read_engines", [replica])
+    monkeypatch.setattr(models, "_replicas", itertools.cycle([replica]))
+    yield {
+        "primary_url": primary_url,
+        "replica_path": replica_path,
+        "primary": primary,
+        "replica": replica,
+        "primary_queries": QueryCounter(primary),
+        "replica_log": StatementLog(replica),
+    }
+    models.SessionLocal.configure(bind=original_bind)
+    primary.dispose()
+    replica.dispose()
+
+
+def first_student(db) -> dict:
+    with db["primary"].connect() as conn:
+        row = conn.exec_driver_sql("SELECT student_id, name FROM students ORDER BY id LIMIT 1").one()
+    return {"student_id": row[0], "name": row[1]}
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+def test_search_on_replica_without_index(replicated_db):
+    """The replica was copied before the primary built the index: search scans it with LIKE"""
+    from app.services import service
+
+    student = first_student(replicated_db)
+    results = service.search_students(student["name"], 3)
+    assert results and results[0]["name"] == student["name"]
+    statements = replicated_db["replica_log"].statements
+    assert statements and not any("students_fts MATCH" in s for s in statements)
+
+
+def test_search_api_on_replica_without_index(replicated_db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    student = first_student(replicated_db)
+    response = TestClient(app).get("/api/students", params={"q": student["name"], "limit": 3})
+    assert response.status_code == 200, response.text
+    assert response.json()["items"][0]["student_id"] == student["student_id"]
+
+
+def test_search_uses_replicated_index(replicated_db):
+    """Once the index has reached the replica, queries there use it"""
+    from app.models.replica import copy_database
+    from app.services import search, service
+
+    student = first_student(replicated_db)
+    service.search_students(student["name"], 3)  # builds the index on the primary
+    copy_database(replicated_db["primary_url"], str(replicated_db["replica_path"]))
+    search._missing.clear()
+    replicated_db["replica_log"].statements.clear()
+
+    results = service.search_students(student["name"], 3)
+    assert results[0]["name"] == student["name"]
+    assert any("students_fts MATCH" in s for s in replicated_db["replica_log"].statements)
+
+
+# =============================================================================
+# ROUTING
+# =============================================================================
+
+def test_reads_go_to_replica(replicated_db):
+    from app.services import service
+
+    before = replicated_db["primary_queries"].count
+    assert service.count_students()["total_students"] == 300
+    assert replicated_db["primary_queries"].count == before
+    assert replicated_db["replica_log"].statements
+
+
+def test_session_reads_primary_after_its_write(replicated_db):
+    from app.models.models import SessionLocal, Student
+
+    with SessionLocal() as db:
+        assert db.query(Student).count() == 300  # replica
+        db.add(Student(name="Pinned Student", student_id="PIN001", department="Physics", email="pin@x.com"))
+        db.flush()
+        replica_reads = len(replicated_db["replica_log"].statements)
+        # The replica cannot see the uncommitted row; the primary transaction can
+        assert db.query(Student).count() == 301
+        assert len(replicated_db["replica_log"].statements) == replica_reads
+        db.rollback()
+        assert db.query(Student).count() == 300  # still pinned to the primary
+
+
+def test_read_your_writes_window(replicated_db, monkeypatch):
+    from app.models import models
+    from app.services import service
+
+    monkeypatch.setattr(models, "READ_YOUR_WRITES_SECONDS", 0.3)
+    new = {"name": "Window Student", "student_id": "RYW001", "department": "Physics", "email": "ryw@x.com"}
+    token = models.consistency_key.set("session-a")
+    try:
+        service.create_student(new)
+        assert service.get_student_data("RYW001")["name"] == "Window Student"  # primary
+        models.consistency_key.set("session-b")
+        with pytest.raises(service.StudentNotFound):
+            service.get_student_data("RYW001")  # another caller reads the stale replica
+        models.consistency_key.set("session-a")
+        time.sleep(0.4)
+        with pytest.raises(service.StudentNotFound):
+            service.get_student_data("RYW001")  # window over: back on the replica
+    finally:
+        models.consistency_key.reset(token)
+
+
+def test_write_window_follows_the_client_to_another_worker(replicated_db):
+    """Workers share no memory: the window reaches the next worker in a cookie"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models import models
+
+    student = first_student(replicated_db)
+    client = TestClient(app)
+    response = client.patch(f"/api/students/{student['student_id']}", json={"name": "Cookie Student"})
+    assert response.status_code == 200
+    assert float(response.cookies[models.READ_YOUR_WRITES_COOKIE]) > time.time()
+
+    models._recent_writes.clear()  # the next request lands on a worker that did not see the write
+    assert client.get(f"/api/students/{student['student_id']}").json()["name"] == "Cookie Student"
+    client.cookies.clear()
+    assert client.get(f"/api/students/{student['student_id']}").json()["name"] == student["name"]  # stale replica
+    assert models.READ_YOUR_WRITES_COOKIE not in client.get("/api/analytics/summary").cookies
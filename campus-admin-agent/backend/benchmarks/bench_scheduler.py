@@ -0,0 +1,72 @@
+"""Admission scheduler checks against a stubbed LLM transport.
+
+The provider is an httpx.MockTransport, so no network or LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_scheduler.py
+"""
+import asyncio
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def fresh_scheduler(monkeypatch):
+    """A new scheduler in place of the shared one, so earlier tests do not leak into it"""
+    from app.agent import llm
+    from app.services.scheduler import AdmissionScheduler
+
+    scheduler = AdmissionScheduler(max_concurrent=8, per_minute=0)
+    monkeypatch.setattr(llm, "scheduler", scheduler)
+    return scheduler
+
+
+def throttled_transport(statuses):
+    """Answers with the given statuses in turn (429s carry Retry-After: 0)"""
+    remaining = list(statuses)
+
+    def handler(request):
+        status = remaining.pop(0)
+        return httpx.Response(status, headers={"retry-after": "0"} if status == 429 else {}, json={})
+
+    return httpx.MockTransport(handler)
+
+
+def test_one_429_halves_the_limit_once(fresh_scheduler):
+    """A run that fails on a 429 is reported by the transport, not again when its lease is released"""
+    from openai import RateLimitError
+    from app.agent.llm import RetryTransport
+    from app.services.scheduler import Lane
+
+    async def run():
+        lease = await fresh_scheduler.acquire(Lane.INTERACTIVE)
+        transport = RetryTransport(throttled_transport([429]), retries=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post("http://llm.test/v1/chat/completions")
+        assert response.status_code == 429
+        lease.release(RateLimitError("throttled", response=response, body=None))
+
+    asyncio.run(run())
+    assert fresh_scheduler.limit == 4
+    assert fresh_scheduler._throttles == 1
+    assert fresh_scheduler.active == 0
+
+
+def test_retried_429_counts_once(fresh_scheduler):
+    """A 429 that the transport retries past still reduces the limit exactly once"""
+    from app.agent.llm import RetryTransport
+    from app.services.scheduler import Lane
+
+    async def run():
+        lease = await fresh_scheduler.acquire(Lane.INTERACTIVE)
+        transport = RetryTransport(throttled_transport([429, 200]), retries=1)
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post("http://llm.test/v1/chat/completions")
+        assert response.status_code == 200
+        assert fresh_scheduler.limit == 4
+        lease.release()
+
+    asyncio.run(run())
+    # The successful run grows the halved limit back by one step
+    assert 4 < fresh_scheduler.limit < 5
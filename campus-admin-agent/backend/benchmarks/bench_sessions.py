@@ -0,0 +1,59 @@
+"""Conversation session checks: tool cache invalidation and history compaction.
+
+Sessions live in a temporary SQLite store; no LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_sessions.py
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def session_store(tmp_path, monkeypatch):
+    from app.services import sessions
+
+    store = sessions.SessionStore(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(sessions, "_store", store)
+    return store
+
+
+def test_write_clears_every_session_tool_cache(session_store, writable_db, monkeypatch):
+    """A write made outside the session (here the REST API) drops cached reads once the app has started"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import service, sessions
+
+    monkeypatch.setattr(service, "write_listeners", [])
+    with writable_db["engine"].connect() as conn:
+        student_id = conn.exec_driver_sql("SELECT student_id FROM students ORDER BY id LIMIT 1").scalar_one()
+    _, cache = sessions.open_session("cache-a")
+    _, other = sessions.open_session("cache-b")
+    asyncio.run(cache.set("get_total_students:{}", {"success": True}))
+    asyncio.run(other.set("get_total_students:{}", {"success": True}))
+    # Importing the sessions module registers nothing; app startup does
+    assert service.write_listeners == []
+
+    with TestClient(app) as client:
+        assert client.patch(f"/api/students/{student_id}", json={"is_active": True}).status_code == 200
+    assert len(service.write_listeners) == 1
+    assert asyncio.run(cache.get("get_total_students:{}")) is None
+    assert asyncio.run(other.get("get_total_students:{}")) is None
+
+
+def test_compaction_summary_is_a_marked_assistant_message(session_store):
+    from app.services.sessions import BudgetedSession, SUMMARY_MARKER
+
+    session = BudgetedSession("compact", session_store, token_budget=200, summary_tokens=80)
+    for turn in range(10):
+        asyncio.run(session.add_items([
+            {"role": "user", "content": f"Question {turn}: " + "details " * 20},
+            {"role": "assistant", "content": f"Answer {turn}: " + "facts " * 20},
+        ]))
+    items = asyncio.run(session.get_items())
+    first = items[0]
+    assert first["role"] == "assistant" and first["content"].startswith(SUMMARY_MARKER)
+    assert "user: Question" in first["content"]
+    # The kept history still starts with a real user turn after the summary
+    assert items[1]["role"] == "user" and items[1]["content"].startswith("Question")
@@ -0,0 +1,95 @@
+"""Request coalescing checks: which queries may share a run, and stream cleanup.
+
+No LLM is involved; the shared stream is a stub producer.
+
+Run from the backend directory:
+    pytest benchmarks/bench_singleflight.py
+"""
+import asyncio
+import gc
+
+import pytest
+
+from app.api.singleflight import SingleFlight, coalesce_key
+
+
+@pytest.mark.parametrize("query", [
+    "How many students are in Physics?",
+    "list the active students",
+    "Which department has the most students?",
+])
+def test_lookups_are_coalesced(query):
+    assert coalesce_key("/chat", query, None) == coalesce_key("/chat", query.upper(), None) is not None
+
+
+@pytest.mark.parametrize("query", [
+    "set Ali's department to CS",
+    "Ali is in CS now",
+    "put Ali in Computer Science",
+    "What if you move Ali to CS?",
+])
+def test_anything_but_a_lookup_runs_alone(query):
+    assert coalesce_key("/chat", query, None) is None
+
+
+def test_lookups_in_a_session_run_alone():
+    assert coalesce_key("/chat", "How many students are there?", "session-1") is None
+
+
+def _producer(started: asyncio.Event, cancelled: asyncio.Event):
+    async def factory(client):
+        async def chunks():
+            started.set()
+            try:
+                while not await client.is_disconnected():
+                    yield "tick"
+                    await asyncio.sleep(0.01)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return chunks()
+    return factory
+
+
+@pytest.mark.parametrize("close", ["aclose", "drop"])
+def test_unread_subscription_stops_the_run(close):
+    """A client that leaves before reading anything still releases the shared run"""
+
+    async def run():
+        flights = SingleFlight()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+        stream = await flights.stream("key", _producer(started, cancelled))
+        await asyncio.wait_for(started.wait(), 1)
+        if close == "aclose":
+            await stream.aclose()
+        else:
+            del stream
+            gc.collect()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert flights._streams == {}
+
+    asyncio.run(run())
+
+
+def test_joined_subscriber_keeps_the_run_alive():
+    async def run():
+        flights = SingleFlight()
+        started, cancelled = asyncio.Event(), asyncio.Event()
+        first = await flights.stream("key", _producer(started, cancelled))
+        second = await flights.stream("key", _producer(started, cancelled))
+        await first.aclose()
+        chunks = [chunk async for chunk in _take(second, 3)]
+        assert chunks == ["tick"] * 3 and not cancelled.is_set()
+        await second.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(run())
+
+
+async def _take(stream, count):
+    async for chunk in stream:
+        yield chunk
+        count -= 1
+        if not count:
+            return
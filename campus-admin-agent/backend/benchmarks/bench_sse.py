@@ -0,0 +1,128 @@
+"""Server-Sent Events framing and client-disconnect handling for /chat/stream.
+
+The agent run is a stub with the `Runner.run_streamed` result interface, so
+no LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_sse.py
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.api.sse import format_sse, stream_agent_run
+
+
+def parse_sse(frames):
+    """(id, event, data) per frame; comments (keep-alives) come back as ("comment", text)"""
+    events = []
+    for frame in "".join(frames).split("\n\n"):
+        if not frame:
+            continue
+        if frame.startswith(":"):
+            events.append(("comment", frame[1:].strip()))
+            continue
+        fields = {"id": None, "event": None, "data": []}
+        for line in frame.split("\n"):
+            name, _, value = line.partition(": ")
+            if name == "data":
+                fields["data"].append(value)
+            else:
+                fields[name] = value
+        events.append((fields["id"], fields["event"], "\n".join(fields["data"])))
+    return events
+
+
+def text_delta(delta):
+    return SimpleNamespace(type="raw_response_event", data=SimpleNamespace(type="response.output_text.delta", delta=delta))
+
+
+def tool_called(name, arguments):
+    item = SimpleNamespace(agent=SimpleNamespace(name="Analytics"), raw_item=SimpleNamespace(name=name, arguments=arguments))
+    return SimpleNamespace(type="run_item_stream_event", name="tool_called", item=item)
+
+
+class StubRun:
+    """Streamed run result: yields `events`, then waits `hang` seconds before finishing"""
+
+    def __init__(self, events, hang=0.0):
+        self.events = events
+        self.hang = hang
+        self.final_output = "42 students"
+        self.last_agent = SimpleNamespace(name="Analytics")
+        self.cancelled = False
+        self.stream_cancelled = asyncio.Event()
+
+    async def stream_events(self):
+        try:
+            for event in self.events:
+                yield event
+            await asyncio.sleep(self.hang)
+        except asyncio.CancelledError:
+            self.stream_cancelled.set()
+            raise
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Client:
+    def __init__(self):
+        self.gone = False
+
+    async def is_disconnected(self):
+        return self.gone
+
+
+def test_format_sse_splits_multiline_data():
+    assert format_sse("a\nb", event="delta", event_id=3) == "id: 3\nevent: delta\ndata: a\ndata: b\n\n"
+    assert parse_sse([format_sse({"x": 1}, event="done")]) == [(None, "done", '{"x": 1}')]
+
+
+def test_stream_frames_events_in_order():
+    run = StubRun([text_delta("Hello\nthere"), tool_called("get_total_students", "{}"), text_delta(" done")])
+    closed = []
+
+    async def on_complete(result):
+        return {"usage": {"total_tokens": 7}}
+
+    async def on_close(outcome, error):
+        closed.append(outcome)
+
+    async def collect():
+        frames = [f async for f in stream_agent_run(Client(), run, on_complete=on_complete, on_close=on_close)]
+        await asyncio.sleep(0)
+        return frames
+
+    events = parse_sse(asyncio.run(collect()))
+    assert [(i, e) for i, e, _ in events] == [("1", "delta"), ("2", "tool_call"), ("3", "delta"), ("4", "done")]
+    assert json.loads(events[0][2]) == {"delta": "Hello\nthere"}
+    assert json.loads(events[1][2])["tool"] == "get_total_students"
+    assert json.loads(events[3][2]) == {"final_output": "42 students", "last_agent": "Analytics",
+                                         "usage": {"total_tokens": 7}}
+    assert closed == ["ok"]
+
+
+def test_disconnect_cancels_the_run():
+    """Once is_disconnected() turns true the stream ends and the producer is cancelled"""
+    run = StubRun([text_delta("partial")], hang=30)
+    client = Client()
+    closed = []
+
+    async def on_close(outcome, error):
+        closed.append(outcome)
+
+    async def consume():
+        frames = []
+        async for frame in stream_agent_run(client, run, heartbeat=0.05, on_close=on_close):
+            frames.append(frame)
+            if len(frames) == 2:  # the delta, then one keep-alive
+                client.gone = True
+        await asyncio.wait_for(run.stream_cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return frames
+
+    events = parse_sse(asyncio.run(asyncio.wait_for(consume(), 5)))
+    assert events[0][1] == "delta" and events[1] == ("comment", "keep-alive")
+    assert len(events) == 2
+    assert run.cancelled and closed == ["cancelled"]
@@ -0,0 +1,33 @@
+"""Startup-time regression check for the API.
+
+New pods must be ready well under a second, so importing `app.main` and
+building the app must stay cheap and must not load the agents SDK, openai,
+langchain or the agent definitions (they load on first use or at warm-up).
+
+Run from the backend directory:
+    pytest benchmarks/bench_startup.py
+    STARTUP_BUDGET_SECONDS=0.6 pytest benchmarks/bench_startup.py
+"""
+import os
+
+import pytest
+
+from benchmarks.startup import measure
+
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "1.0"))
+
+
+@pytest.fixture(scope="module")
+def startup_report():
+    return measure(runs=3)
+
+
+def test_cold_start_within_budget(startup_report):
+    assert startup_report["median_s"] < STARTUP_BUDGET_SECONDS, (
+        f"cold start {startup_report['median_s']:.3f}s exceeds {STARTUP_BUDGET_SECONDS}s; "
+        f"run `python -m benchmarks.startup` for the import profile"
+    )
+
+
+def test_heavy_modules_stay_lazy(startup_report):
+    assert startup_report["loaded"] == []
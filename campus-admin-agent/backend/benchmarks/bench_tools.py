@@ -0,0 +1,232 @@
+"""Microbenchmarks for the agent tools, invoked directly without the LLM.
+
+Each tool is called through its `FunctionTool.on_invoke_tool`, exactly as the
+agent runner would, against seeded datasets at several scales. Timings come
+from pytest-benchmark; the number of SQL statements per call is recorded in
+`extra_info` so it shows up in `--benchmark-json` output.
+
+Run from the backend directory:
+    pytest benchmarks/bench_tools.py --benchmark-only
+    BENCH_SCALES=small,medium,large pytest benchmarks/bench_tools.py --benchmark-json bench.json
+"""
+import asyncio
+import itertools
+import json
+
+import pytest
+
+from agents.tool_context import ToolContext
+
+from app.Tools.Campus_analytics_tools import (
+    get_total_students, get_students_by_department, get_recent_onboarded_students,
+    get_active_students_last_7_days, query_campus_data
+)
+from app.Tools.student_management_tool import (
+    add_student, get_student, update_student, delete_student, list_students, search_students
+)
+from app.Tools.FAQ_tools import (
+    get_library_name, get_cafeteria_name, get_cafeteria_timings, get_library_hours, get_lunch_timing
+)
+
+_loop = asyncio.new_event_loop()
+_ids = itertools.count(1)
+
+
+def invoke(tool, **arguments):
+    """Run a FunctionTool the way the agent runner does and return its output"""
+    ctx = ToolContext(context=None, tool_name=tool.name, tool_call_id=f"bench-{next(_ids)}")
+    return _loop.run_until_complete(tool.on_invoke_tool(ctx, json.dumps(arguments)))
+
+
+def run_and_count(benchmark, db, tool, **arguments):
+    """Benchmark `tool` and record the statements issued by a single call"""
+    before = db["queries"].count
+    result = invoke(tool, **arguments)
+    benchmark.extra_info.update({
+        "scale": db["scale"],
+        "students": db["students"],
+        "activity_logs": db["activity_logs"],
+        "queries_per_call": db["queries"].count - before,
+    })
+    assert result["success"], result["message"]
+    benchmark(invoke, tool, **arguments)
+    return result
+
+
+def existing_student_id(db) -> str:
+    with db["engine"].connect() as conn:
+        return conn.exec_driver_sql("SELECT student_id FROM students ORDER BY id LIMIT 1").scalar_one()
+
+
+# =============================================================================
+# CAMPUS ANALYTICS TOOLS
+# =============================================================================
+
+def test_get_total_students(benchmark, scaled_db):
+    run_and_count(benchmark, scaled_db, get_total_students)
+
+
+def test_get_students_by_department(benchmark, scaled_db):
+    run_and_count(benchmark, scaled_db, get_students_by_department)
+
+
+@pytest.mark.parametrize("limit", [5, 100])
+def test_get_recent_onboarded_students(benchmark, scaled_db, limit):
+    run_and_count(benchmark, scaled_db, get_recent_onboarded_students, limit=limit)
+
+
+def test_get_active_students_last_7_days(benchmark, scaled_db):
+    result = run_and_count(benchmark, scaled_db, get_active_students_last_7_days)
+    benchmark.extra_info["rows_returned"] = result["data"]["count"]
+
+
+QUERY_SPECS = {
+    "students_by_month": {
+        "source": "students",
+        "filters": [{"field": "is_active", "op": "eq", "value": True}, {"field": "created_at", "op": "gte", "value": "now-365d"}],
+        "group_by": [{"field": "created_at", "bucket": "month"}],
+        "aggregates": [{"func": "count"}],
+    },
+    "active_by_department": {
+        "source": "activity_logs",
+        "filters": [{"field": "timestamp", "op": "gte", "value": "now-7d"}],
+        "group_by": [{"field": "student.department"}],
+        "aggregates": [{"func": "count_distinct", "field": "student_id"}],
+        "sort": [{"field": "count_distinct_student_id", "direction": "desc"}],
+    },
+    "logins_by_week": {
+        "source": "activity_logs",
+        "filters": [{"field": "activity_type", "op": "eq", "value": "login"}],
+        "group_by": [{"field": "timestamp", "bucket": "week"}],
+        "aggregates": [{"func": "count"}],
+    },
+}
+
+
+@pytest.mark.parametrize("spec", sorted(QUERY_SPECS))
+def test_query_campus_data(benchmark, scaled_db, spec):
+    result = run_and_count(benchmark, scaled_db, query_campus_data, spec=QUERY_SPECS[spec])
+    benchmark.extra_info["rows_returned"] = result["data"]["row_count"]
+
+
+def test_query_week_buckets_are_mondays(scaled_db):
+    from datetime import date
+    from app.services.query_spec import compile_query
+    from app.utils.pydentic_model import QuerySpec
+
+    result = invoke(query_campus_data, spec=QUERY_SPECS["logins_by_week"])
+    assert result["success"], result["message"]
+    rows = result["data"]["rows"]
+    weeks = [row[0] if isinstance(row, list) else row["timestamp_week"] for row in rows]
+    assert weeks and all(date.fromisoformat(week).weekday() == 0 for week in weeks)
+    # Postgres labels weeks the same way
+    statement, _, _ = compile_query(QuerySpec(**QUERY_SPECS["logins_by_week"]), "postgresql")
+    assert "to_char(date_trunc('week', activity_logs.timestamp), 'YYYY-MM-DD')" in str(statement)
+
+
+def test_query_rejects_duplicate_group_by(scaled_db):
+    spec = {**QUERY_SPECS["students_by_month"], "group_by": [{"field": "department"}, {"field": "department"}]}
+    # The validation error goes back to the model as the tool output
+    assert "may appear only once" in str(invoke(query_campus_data, spec=spec))
+
+
+def test_query_relative_months_are_calendar_months(scaled_db, monkeypatch):
+    from datetime import datetime
+    from app.services import query_spec
+
+    monkeypatch.setattr(query_spec, "get_pkt_time", lambda: datetime(2025, 3, 31, 10, 30))
+    column = query_spec.Student.created_at
+    assert query_spec._coerce(column, "now-1mo") == datetime(2025, 2, 28, 10, 30)
+    assert query_spec._coerce(column, "now-13mo") == datetime(2024, 2, 29, 10, 30)
+    assert query_spec._coerce(column, "now - 3MO") == datetime(2024, 12, 31, 10, 30)
+    assert query_spec._coerce(column, "now-2w") == datetime(2025, 3, 17, 10, 30)
+    # "m" could mean minutes or months; the model is told to pick
+    spec = {**QUERY_SPECS["students_by_month"], "filters": [{"field": "created_at", "op": "gte", "value": "now-3m"}]}
+    assert "use 'mo' for calendar months" in str(invoke(query_campus_data, spec=spec))
+
+
+# =============================================================================
+# STUDENT MANAGEMENT TOOLS
+# =============================================================================
+
+def test_get_student(benchmark, scaled_db):
+    run_and_count(benchmark, scaled_db, get_student, student_id=existing_student_id(scaled_db))
+
+
+def test_list_students(benchmark, scaled_db):
+    result = run_and_count(benchmark, scaled_db, list_students)
+    benchmark.extra_info["rows_returned"] = result["data"]["total_count"]
+
+
+@pytest.mark.parametrize("query", ["exact", "typo"])
+def test_search_students(benchmark, scaled_db, query):
+    with scaled_db["engine"].connect() as conn:
+        name = conn.exec_driver_sql("SELECT name FROM students ORDER BY id LIMIT 1").scalar_one()
+    text = name if query == "exact" else name[:-2] + "xq"
+    result = run_and_count(benchmark, scaled_db, search_students, query=text)
+    benchmark.extra_info["rows_returned"] = result["data"]["total_count"]
+
+
+def test_search_api_applies_filters(scaled_db):
+    """`q` on GET /api/students still honours department and is_active, and returns the timestamps"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with scaled_db["engine"].connect() as conn:
+        name, department, is_active = conn.exec_driver_sql(
+            "SELECT name, department, is_active FROM students ORDER BY id LIMIT 1").one()
+    client = TestClient(app)
+    params = {"q": name, "department": department.upper(), "is_active": bool(is_active)}
+    items = client.get("/api/students", params=params).json()["items"]
+    assert items and items[0]["name"] == name and items[0]["created_at"]
+    assert all(i["department"] == department and i["is_active"] == bool(is_active) for i in items)
+    other = client.get("/api/students", params={**params, "is_active": not is_active}).json()["items"]
+    assert name not in [i["name"] for i in other]
+
+
+def test_update_student(benchmark, writable_db):
+    run_and_count(benchmark, writable_db, update_student,
+                  student_id=existing_student_id(writable_db), field="department", new_value="Computer Science")
+
+
+def _new_student_args():
+    n = next(_ids)
+    return {
+        "name": f"Bench Student {n}",
+        "student_id": f"BENCH{n:08d}",
+        "department": "Computer Science",
+        "email": f"bench.student.{n}@smit.edu.pk",
+    }
+
+
+def test_add_student(benchmark, writable_db):
+    before = writable_db["queries"].count
+    assert invoke(add_student, **_new_student_args())["success"]
+    benchmark.extra_info.update({"scale": writable_db["scale"], "queries_per_call": writable_db["queries"].count - before})
+    benchmark.pedantic(lambda args: invoke(add_student, **args),
+                       setup=lambda: ((_new_student_args(),), {}), rounds=50)
+
+
+def test_delete_student(benchmark, writable_db):
+    def setup():
+        args = _new_student_args()
+        assert invoke(add_student, **args)["success"]
+        return (args["student_id"],), {}
+
+    (student_id,), _ = setup()
+    before = writable_db["queries"].count
+    assert invoke(delete_student, student_id=student_id)["success"]
+    benchmark.extra_info.update({"scale": writable_db["scale"], "queries_per_call": writable_db["queries"].count - before})
+    benchmark.pedantic(lambda sid: invoke(delete_student, student_id=sid), setup=setup, rounds=50)
+
+
+# =============================================================================
+# CAMPUS FAQ TOOLS (static, scale independent)
+# =============================================================================
+
+@pytest.mark.parametrize("tool", [
+    get_library_name, get_cafeteria_name, get_cafeteria_timings, get_library_hours, get_lunch_timing
+], ids=lambda t: t.name)
+def test_faq_tool(benchmark, tool):
+    assert invoke(tool)["success"]
+    benchmark(invoke, tool)
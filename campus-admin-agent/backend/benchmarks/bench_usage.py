@@ -0,0 +1,134 @@
+"""Token accounting checks: budgets are enforced and every request is recorded.
+
+`Runner.run` is replaced by a stub that reports LLM calls to the run hooks,
+and usage goes to a temporary SQLite store; no LLM is involved.
+
+Run from the backend directory:
+    pytest benchmarks/bench_usage.py
+"""
+import asyncio
+import functools
+from types import SimpleNamespace
+
+import pytest
+from agents.usage import Usage
+from fastapi import HTTPException
+
+from app.services import usage
+from app.services.usage import TokenBudgetExceeded, UsageTracker
+
+AGENT = SimpleNamespace(name="Campus Analytics", model="gemini-2.0-flash")
+
+
+def llm_response(input_tokens, output_tokens):
+    return SimpleNamespace(usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
+
+@pytest.fixture
+def usage_store(tmp_path, monkeypatch):
+    store = usage.UsageStore(str(tmp_path / "usage.db"))
+    monkeypatch.setattr(usage, "_store", store)
+    monkeypatch.setattr(usage, "minute_window", usage.MinuteWindow())
+    return store
+
+
+@pytest.fixture
+def stub_runner(monkeypatch):
+    """Runner.run stand-in making `calls[query]` LLM calls of 40 input + 20 output tokens each"""
+    from app.api import runs
+
+    calls = {}
+
+    async def run(agent, query, context=None, hooks=None, **options):
+        await hooks.on_agent_start(context, agent)
+        for _ in range(calls.get(query, 1)):
+            await hooks.on_llm_start(context, agent, None, [])
+            await hooks.on_llm_end(context, agent, llm_response(40, 20))
+        await hooks.on_agent_end(context, agent, None)
+        requests = calls.get(query, 1)
+        result_usage = Usage(requests=requests, input_tokens=40 * requests, output_tokens=20 * requests,
+                             total_tokens=60 * requests)
+        return SimpleNamespace(final_output=f"answer to {query}", context_wrapper=SimpleNamespace(usage=result_usage))
+
+    monkeypatch.setattr(runs.Runner, "run", run)
+    return SimpleNamespace(runs=runs, calls=calls)
+
+
+def rows(store, table):
+    conn = store._connect()
+    return conn.execute(f"SELECT request_id, route, status, input_tokens, output_tokens, llm_calls FROM {table}").fetchall()
+
+
+def test_request_budget_stops_the_next_llm_call():
+    tracker = UsageTracker("budget", "/chat", max_tokens=100)
+
+    async def run():
+        for _ in range(2):
+            await tracker.on_llm_start(None, AGENT, None, [])
+            await tracker.on_llm_end(None, AGENT, llm_response(40, 20))
+        with pytest.raises(TokenBudgetExceeded):
+            await tracker.on_llm_start(None, AGENT, None, [])
+
+    asyncio.run(run())
+    assert tracker.total_tokens == 120 and tracker.agents[AGENT.name]["llm_calls"] == 2
+
+
+def test_minute_budget_degrades_then_rejects(usage_store, monkeypatch):
+    monkeypatch.setattr(usage, "MAX_TOKENS_PER_MINUTE", 1000)
+    usage.minute_window.add(500)
+    assert usage.admit_run() is False
+    usage.minute_window.add(350)
+    assert usage.admit_run() is True  # past USAGE_DEGRADE_RATIO
+    usage.minute_window.add(200)
+    with pytest.raises(usage.RateBudgetExceeded) as raised:
+        usage.admit_run()
+    assert 1 <= raised.value.retry_after <= 61
+
+
+def test_exhausted_minute_budget_is_a_429(usage_store, stub_runner, monkeypatch):
+    from app.api.schemas import ChatRequest
+
+    monkeypatch.setattr(usage, "MAX_TOKENS_PER_MINUTE", 100)
+    usage.minute_window.add(100)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(stub_runner.runs.run_agent("/analytics", ChatRequest(query="summarise enrolment")))
+    assert raised.value.status_code == 429 and "Retry-After" in raised.value.headers
+    assert rows(usage_store, "usage_requests") == []
+
+
+def test_every_request_is_recorded(usage_store, stub_runner):
+    from app.api.schemas import ChatRequest
+
+    stub_runner.calls["summarise enrolment"] = 2
+
+    async def run():
+        return await asyncio.gather(
+            stub_runner.runs.run_agent("/analytics", ChatRequest(query="summarise enrolment")),
+            stub_runner.runs.run_agent("/students", ChatRequest(query="hello")),
+        )
+
+    analytics, students = asyncio.run(run())
+    recorded = {row[0]: row[1:] for row in rows(usage_store, "usage_requests")}
+    assert recorded == {
+        analytics["accounting"]["request_id"]: ("/analytics", "ok", 80, 40, 2),
+        students["accounting"]["request_id"]: ("/students", "ok", 40, 20, 1),
+    }
+    assert analytics["usage"]["total_tokens"] == 120 and analytics["accounting"]["llm_calls"] == 2
+    by_route = {row["key"]: row for row in usage_store.aggregate("route")}
+    assert by_route["/analytics"]["requests"] == 1 and by_route["/analytics"]["input_tokens"] == 80
+    assert by_route["/students"]["requests"] == 1 and by_route["/students"]["output_tokens"] == 20
+    assert usage.minute_window.total() == 180
+
+
+def test_budget_exceeded_run_is_recorded(usage_store, stub_runner, monkeypatch):
+    from app.api.schemas import ChatRequest
+
+    monkeypatch.setattr(stub_runner.runs, "UsageTracker", functools.partial(UsageTracker, max_tokens=100))
+    stub_runner.calls["list every student"] = 5
+    response = asyncio.run(stub_runner.runs.run_agent("/students", ChatRequest(query="list every student")))
+
+    assert response["budget_exceeded"] and response["response"] == usage.BUDGET_EXCEEDED_MESSAGE
+    # The third call would start past the budget: two were made and paid for
+    assert response["accounting"]["llm_calls"] == 2
+    assert rows(usage_store, "usage_requests") == \
+        [(response["accounting"]["request_id"], "/students", "budget_exceeded", 80, 40, 2)]
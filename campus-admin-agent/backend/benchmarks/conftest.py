@@ -0,0 +1,94 @@
+"""Shared fixtures for the pytest-benchmark suites.
+
+Datasets are generated once per scale with `benchmarks.seed_data` and cached
+under `BENCH_DATA_DIR` (default: the system temp dir). Select scales with
+`BENCH_SCALES=small,medium,large`; `large` is 100k students / 10M activity logs.
+Benchmarks that write use `writable_db`, a per-test copy, so the cached
+datasets always stay as seeded.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# name -> (students, activity_logs)
+SCALES = {
+    "small": (1_000, 20_000),
+    "medium": (10_000, 1_000_000),
+    "large": (100_000, 10_000_000),
+}
+SELECTED_SCALES = [s.strip() for s in os.getenv("BENCH_SCALES", "small,medium").split(",") if s.strip()]
+BENCH_SEED = int(os.getenv("BENCH_SEED", "42"))
+# Anchor data at the start of the current PKT day so "last 7 days" windows stay meaningful;
+# the anchor date is part of the cache key, so a dataset is regenerated at most once a day.
+BENCH_ANCHOR = datetime.now(timezone(timedelta(hours=5))).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+DATA_DIR = Path(os.getenv("BENCH_DATA_DIR", Path(tempfile.gettempdir()) / "campus-admin-bench"))
+
+# The app reads its configuration at import time, so point it somewhere harmless first
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+os.environ["DATABASE-URI"] = f"sqlite:///{DATA_DIR / 'bootstrap.db'}"
+os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+os.environ["OPENAI_AGENTS_DISABLE_TRACING"] = "1"
+
+
+def dataset_url(scale: str) -> str:
+    """Return the URL of the seeded dataset for `scale`, generating it on first use"""
+    students, activity_logs = SCALES[scale]
+    path = DATA_DIR / f"{scale}-{BENCH_SEED}-{BENCH_ANCHOR:%Y%m%d}.db"
+    marker = path.with_suffix(".ready")
+    url = f"sqlite:///{path}"
+    if not marker.exists():
+        from benchmarks.seed_data import seed
+        seed(url, students, activity_logs, seed=BENCH_SEED, anchor=BENCH_ANCHOR, reset=True, verbose=False)
+        marker.touch()
+    return url
+
+
+class QueryCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture(scope="session", params=SELECTED_SCALES)
+def scaled_db(request):
+    """Bind the app's `SessionLocal` to the dataset for one scale"""
+    from sqlalchemy import create_engine
+    from app.models.models import SessionLocal
+
+    scale = request.param
+    engine = create_engine(dataset_url(scale))
+    SessionLocal.configure(bind=engine)
+    counter = QueryCounter(engine)
+    students, activity_logs = SCALES[scale]
+    yield {"scale": scale, "students": students, "activity_logs": activity_logs, "queries": counter, "engine": engine}
+    engine.dispose()
+
+
+@pytest.fixture
+def writable_db(scaled_db, tmp_path):
+    """Like `scaled_db`, but bound to a private copy of the dataset that the test may change"""
+    from sqlalchemy import create_engine
+    from app.models.models import SessionLocal
+    from app.models.replica import copy_database
+
+    path = tmp_path / f"{scaled_db['scale']}.db"
+    copy_database(str(scaled_db["engine"].url), str(path))
+    engine = create_engine(f"sqlite:///{path}")
+    SessionLocal.configure(bind=engine)
+    yield {**scaled_db, "queries": QueryCounter(engine), "engine": engine}
+    SessionLocal.configure(bind=scaled_db["engine"])
+    engine.dispose()
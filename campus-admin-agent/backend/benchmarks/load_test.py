@@ -0,0 +1,308 @@
+"""Offline load test for the LLM-backed API routes.
+
+Starts the mock LLM (`benchmarks.mock_llm`) and the FastAPI app on loopback
+ports, then drives `/chat`, `/chat/stream`, `/students` and `/analytics` with
+concurrent clients. Reports throughput, p50/p95/p99 latency, time-to-first-token
+for streams and event-loop lag of the app server. Nothing leaves the machine.
+
+Run from the backend directory:
+    python -m benchmarks.load_test --concurrency 32 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SCENARIO = Path(__file__).resolve().parent / "scenarios" / "default.json"
+BUNDLED_DB = BACKEND_DIR / "campus_admin.db"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.mock_llm import MockLLMConfig, create_mock_app  # noqa: E402
+
+
+# =============================================================================
+# SERVER HELPERS
+# =============================================================================
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Run an ASGI app under uvicorn on its own thread and event loop"""
+
+    def __init__(self, app, port: int):
+        self.port = port
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 10.0) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+class LoopLagProbe:
+    """Measures how late a periodic timer fires on the server's event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = 0.01):
+        self.loop = loop
+        self.interval = interval
+        self.samples: List[float] = []
+        self._running = False
+
+    async def _probe(self):
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._running = True
+        asyncio.run_coroutine_threadsafe(self._probe(), self.loop)
+
+    def stop(self):
+        self._running = False
+
+
+# =============================================================================
+# LOAD GENERATION
+# =============================================================================
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def build_workload(scenario: Dict[str, Any], total: int, seed: int, endpoints: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Weighted, reproducible list of requests drawn from the scenario"""
+    candidates = [r for r in scenario["requests"] if not endpoints or r["endpoint"] in endpoints]
+    if not candidates:
+        raise ValueError("No scenario requests match the selected endpoints")
+    rng = random.Random(seed)
+    weights = [r.get("weight", 1) for r in candidates]
+    return rng.choices(candidates, weights=weights, k=total)
+
+
+async def run_one(client: httpx.AsyncClient, item: Dict[str, Any]) -> Dict[str, Any]:
+    endpoint = item["endpoint"]
+    started = time.perf_counter()
+    ttft = None
+    try:
+        if endpoint == "/chat/stream":
+            async with client.stream("POST", endpoint, json={"query": item["query"]}) as response:
+                async for line in response.aiter_lines():
+                    # time-to-first-token: the first text delta, not tool/handoff events
+                    if ttft is None and line == "event: delta":
+                        ttft = time.perf_counter() - started
+                status = response.status_code
+        else:
+            response = await client.post(endpoint, json={"query": item["query"]})
+            status = response.status_code
+        error = None if status < 400 else f"HTTP {status}"
+    except Exception as e:
+        status, error = None, f"{type(e).__name__}: {e}"
+    return {
+        "endpoint": endpoint,
+        "latency": time.perf_counter() - started,
+        "ttft": ttft,
+        "status": status,
+        "error": error,
+    }
+
+
+async def drive(base_url: str, workload: List[Dict[str, Any]], concurrency: int, timeout: float) -> Dict[str, Any]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    results: List[Dict[str, Any]] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append(await run_one(client, item))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return {"results": results, "wall_time": wall}
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def summarize(run: Dict[str, Any], lag_samples: List[float], llm_calls: int) -> Dict[str, Any]:
+    by_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for result in run["results"]:
+        by_endpoint[result["endpoint"]].append(result)
+    wall = run["wall_time"]
+
+    def stats(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        ok = [r for r in results if not r["error"]]
+        latencies = [r["latency"] for r in ok]
+        ttfts = [r["ttft"] for r in ok if r["ttft"] is not None]
+        summary = {
+            "requests": len(results),
+            "errors": len(results) - len(ok),
+            "throughput_rps": round(len(ok) / wall, 2) if wall else None,
+            "p50_ms": _ms(percentile(latencies, 50)),
+            "p95_ms": _ms(percentile(latencies, 95)),
+            "p99_ms": _ms(percentile(latencies, 99)),
+        }
+        if ttfts:
+            summary.update({
+                "ttft_p50_ms": _ms(percentile(ttfts, 50)),
+                "ttft_p95_ms": _ms(percentile(ttfts, 95)),
+                "ttft_p99_ms": _ms(percentile(ttfts, 99)),
+            })
+        return summary
+
+    return {
+        "wall_time_s": round(wall, 3),
+        "llm_calls": llm_calls,
+        "overall": stats(run["results"]),
+        "endpoints": {endpoint: stats(results) for endpoint, results in sorted(by_endpoint.items())},
+        "event_loop_lag": {
+            "samples": len(lag_samples),
+            "mean_ms": _ms(statistics.fmean(lag_samples)) if lag_samples else None,
+            "p99_ms": _ms(percentile(lag_samples, 99)),
+            "max_ms": _ms(max(lag_samples)) if lag_samples else None,
+        },
+        "errors": sorted({r["error"] for r in run["results"] if r["error"]})[:10],
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "ttft_p50_ms", "ttft_p95_ms", "ttft_p99_ms"]
+    header = f"{'endpoint':<14}" + "".join(f"{c:>15}" for c in columns)
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, stats in rows:
+        print(f"{name:<14}" + "".join(f"{str(stats.get(c, '-')):>15}" for c in columns))
+    print("-" * len(header))
+    lag = report["event_loop_lag"]
+    print(f"wall time: {report['wall_time_s']}s | LLM calls: {report['llm_calls']} | "
+          f"event-loop lag mean/p99/max: {lag['mean_ms']}/{lag['p99_ms']}/{lag['max_ms']} ms")
+    for error in report["errors"]:
+        print(f"error: {error}")
+    print("=" * len(header))
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def prepare_environment(mock_port: int, database_url: Optional[str], workdir: str):
+    """Point the app at the mock LLM and a disposable database before importing it"""
+    if not database_url:
+        db_path = Path(workdir) / "campus_admin.db"
+        shutil.copy(BUNDLED_DB, db_path)
+        database_url = f"sqlite:///{db_path}"
+    os.environ["DATABASE-URI"] = database_url
+    os.environ["GEMINI_API_KEY"] = "mock-key"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{mock_port}/v1/"
+    os.environ["OPENAI_AGENTS_DISABLE_TRACING"] = "1"
+    # Measure steady state: load the agents before the server reports ready
+    os.environ.setdefault("APP_WARMUP", "eager")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against a local mock LLM")
+    parser.add_argument("--scenario", default=str(DEFAULT_SCENARIO))
+    parser.add_argument("--requests", type=int, default=200, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--endpoints", nargs="*", help="Restrict to these endpoints (e.g. /chat /analytics)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock LLM latency per call (s)")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Mock LLM streaming rate")
+    parser.add_argument("--database-url", help="Use an existing (e.g. seeded) database instead of a copy of the bundled one")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request client timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.scenario, encoding="utf-8") as fh:
+        scenario = json.load(fh)
+    workload = build_workload(scenario, args.requests, args.seed, args.endpoints)
+
+    mock_config = MockLLMConfig.from_scenario(
+        args.scenario,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    )
+    mock_app = create_mock_app(mock_config)
+    mock_server = ServerThread(mock_app, free_port()).start()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_environment(mock_server.port, args.database_url, workdir)
+        from app.main import app  # imported late so it picks up the benchmark environment
+
+        app_server = ServerThread(app, free_port()).start()
+        probe = LoopLagProbe(app_server.loop)
+        probe.start()
+        try:
+            run = asyncio.run(drive(f"http://127.0.0.1:{app_server.port}", workload, args.concurrency, args.timeout))
+        finally:
+            probe.stop()
+            app_server.stop()
+            mock_server.stop()
+
+    report = summarize(run, probe.samples, mock_app.state.calls)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json_path"}
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Local stand-in for the OpenAI-compatible chat-completions API.
+
+The agents talk to Gemini through `AsyncOpenAI`; pointing `GEMINI_BASE_URL`
+at this server makes every run deterministic and offline. Latency, token
+rate and tool calls are configurable so load tests can model a real provider.
+
+Run standalone:
+    python -m benchmarks.mock_llm --port 8100 --latency 0.2 --tokens-per-second 80
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_REPLY = (
+    "Here is the information you asked for. The campus services are available "
+    "as listed above, and I can help with anything else related to campus administration."
+)
+
+
+@dataclass
+class MockLLMConfig:
+    """Behaviour of the mock provider"""
+    latency: float = 0.05            # seconds before the first token / full response
+    latency_jitter: float = 0.0      # uniform +/- jitter applied to latency
+    tokens_per_second: float = 0.0   # 0 streams everything at once
+    reply: str = DEFAULT_REPLY
+    rules: List[Dict[str, Any]] = field(default_factory=list)
+    seed: Optional[int] = None
+    fail_every: int = 0              # every Nth call fails with fail_status (0 never)
+    fail_status: int = 429
+    retry_after: float = 1.0         # Retry-After sent with failures
+
+    @classmethod
+    def from_scenario(cls, path: str, **overrides) -> "MockLLMConfig":
+        """Build a config from a scenario JSON file (see `scenarios/default.json`)"""
+        with open(path, encoding="utf-8") as fh:
+            scenario = json.load(fh)
+        config = cls(rules=scenario.get("rules", []), reply=scenario.get("default_reply", DEFAULT_REPLY))
+        for key, value in overrides.items():
+            if value is not None:
+                setattr(config, key, value)
+        return config
+
+
+# =============================================================================
+# SCRIPTED RESPONSES
+# =============================================================================
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _estimate_tokens(payload: Any) -> int:
+    return max(1, len(json.dumps(payload, default=str)) // 4)
+
+
+def plan_response(config: MockLLMConfig, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Decide the next assistant turn for a chat-completions request.
+
+    Each rule is `{"match": str, "tool_calls": [{"name", "arguments"}], "reply": str}`.
+    The first rule whose `match` appears in the latest user message is used; its
+    tool calls are issued one per turn, skipping tools the request does not offer
+    and tools already called since that user message. Once nothing is left to
+    call, the rule's reply (or the default reply) is returned as text.
+    """
+    messages = body.get("messages", [])
+    user_text = next(
+        (_message_text(m) for m in reversed(messages) if m.get("role") == "user"), ""
+    ).lower()
+    available = {
+        tool.get("function", {}).get("name")
+        for tool in body.get("tools") or []
+    }
+    # Only the current turn counts, so replayed session history does not suppress calls
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    already_called = {
+        call.get("function", {}).get("name")
+        for m in messages[last_user + 1:] if m.get("role") == "assistant"
+        for call in m.get("tool_calls") or []
+    }
+
+    for rule in config.rules:
+        if rule.get("match", "").lower() not in user_text:
+            continue
+        for call in rule.get("tool_calls", []):
+            if call["name"] in available and call["name"] not in already_called:
+                arguments = call.get("arguments", {})
+                if not isinstance(arguments, str):
+                    arguments = json.dumps(arguments)
+                return {"tool_call": {"name": call["name"], "arguments": arguments}}
+        return {"text": rule.get("reply", config.reply)}
+    return {"text": config.reply}
+
+
+# =============================================================================
+# APP
+# =============================================================================
+
+def create_mock_app(config: MockLLMConfig) -> FastAPI:
+    """Build the FastAPI app that serves `/v1/chat/completions`"""
+    app = FastAPI(title="Mock LLM")
+    app.state.config = config
+    app.state.calls = 0
+    counter = itertools.count(1)
+    rng = random.Random(config.seed)
+
+    def _latency() -> float:
+        jitter = rng.uniform(-config.latency_jitter, config.latency_jitter) if config.latency_jitter else 0.0
+        return max(0.0, config.latency + jitter)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "calls": app.state.calls}
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        if config.fail_every and app.state.calls % config.fail_every == 0:
+            await asyncio.sleep(_latency())
+            return JSONResponse(
+                {"error": {"message": "Resource has been exhausted", "code": config.fail_status}},
+                status_code=config.fail_status,
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+        completion_id = f"chatcmpl-mock-{next(counter)}"
+        model = body.get("model", "mock-model")
+        created = int(time.time())
+        plan = plan_response(config, body)
+        prompt_tokens = _estimate_tokens(body.get("messages", []))
+
+        if "tool_call" in plan:
+            call = plan["tool_call"]
+            tool_call = {
+                "id": f"call_{completion_id}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": call["arguments"]},
+            }
+            pieces: List[str] = []
+            completion_tokens = _estimate_tokens(tool_call)
+            finish_reason = "tool_calls"
+        else:
+            tool_call = None
+            pieces = [word + " " for word in plan["text"].split()]
+            completion_tokens = len(pieces)
+            finish_reason = "stop"
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(_latency() + (completion_tokens / config.tokens_per_second if config.tokens_per_second else 0))
+            message: Dict[str, Any] = {"role": "assistant", "content": "".join(pieces).strip() or None}
+            if tool_call:
+                message["tool_calls"] = [tool_call]
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            })
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def event_stream():
+            await asyncio.sleep(_latency())
+            yield chunk({"role": "assistant", "content": ""})
+            if tool_call:
+                yield chunk({"tool_calls": [{"index": 0, **tool_call}]})
+            delay = 1.0 / config.tokens_per_second if config.tokens_per_second else 0.0
+            for piece in pieces:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--scenario", help="Scenario JSON with scripted tool-call rules")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every Nth call (simulate provider throttling)")
+    parser.add_argument("--fail-status", type=int, default=429)
+    args = parser.parse_args()
+
+    overrides = dict(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+        fail_every=args.fail_every,
+        fail_status=args.fail_status,
+    )
+    if args.scenario:
+        config = MockLLMConfig.from_scenario(args.scenario, **overrides)
+    else:
+        config = MockLLMConfig(**overrides)
+
+    import uvicorn
+    uvicorn.run(create_mock_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
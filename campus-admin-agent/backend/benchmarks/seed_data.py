@@ -0,0 +1,283 @@
+"""Synthetic campus dataset generator.
+
+Bulk-loads realistic students and activity logs so the tools can be measured at
+production scale (100k students / 10M activity logs). Output is reproducible
+from `--seed` and `--anchor`. SQLite is loaded with batched `executemany` on the
+raw DBAPI connection, Postgres with `COPY ... FROM STDIN`.
+
+Run from the backend directory:
+    python -m benchmarks.seed_data --database-url sqlite:///./bench.db --students 100000 --activity-logs 10000000 --reset
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# =============================================================================
+# DISTRIBUTIONS
+# =============================================================================
+
+# (department, code, share of enrolment)
+DEPARTMENTS: Sequence[Tuple[str, str, float]] = (
+    ("Computer Science", "CS", 0.26),
+    ("Software Engineering", "SE", 0.15),
+    ("Data Science", "DS", 0.12),
+    ("Artificial Intelligence", "AI", 0.10),
+    ("Business Administration", "BA", 0.10),
+    ("Electrical Engineering", "EE", 0.08),
+    ("Graphic Design", "GD", 0.07),
+    ("Cyber Security", "CY", 0.07),
+    ("Mathematics", "MA", 0.05),
+)
+
+# (activity_type, share of events)
+ACTIVITY_TYPES: Sequence[Tuple[str, float]] = (
+    ("login", 0.52),
+    ("course_access", 0.20),
+    ("assignment_submitted", 0.10),
+    ("email_sent", 0.07),
+    ("attendance_marked", 0.06),
+    ("profile_update", 0.04),
+    ("student_created", 0.01),
+)
+
+ACTIVITY_DESCRIPTIONS = {
+    "login": "Logged in to the student portal",
+    "course_access": "Opened course material",
+    "assignment_submitted": "Submitted an assignment",
+    "email_sent": "Email notification sent",
+    "attendance_marked": "Attendance marked for class",
+    "profile_update": "Updated profile details",
+    "student_created": "Student record created",
+}
+
+FIRST_NAMES = (
+    "Ahmed", "Ali", "Ayesha", "Bilal", "Daniyal", "Fatima", "Hamza", "Hassan", "Hira", "Imran",
+    "Iqra", "Junaid", "Kashif", "Laiba", "Maham", "Mariam", "Muhammad", "Noor", "Omar", "Rabia",
+    "Rehan", "Saad", "Sana", "Sara", "Shahid", "Sidra", "Talha", "Usman", "Zainab", "Zara",
+    "John", "Emily", "David", "Sophia", "Michael", "Olivia", "Daniel", "Emma", "James", "Mia",
+)
+
+LAST_NAMES = (
+    "Khan", "Ahmed", "Ali", "Hussain", "Raza", "Sheikh", "Siddiqui", "Qureshi", "Malik", "Butt",
+    "Chaudhry", "Iqbal", "Javed", "Mirza", "Rauf", "Rehman", "Saeed", "Shah", "Tariq", "Zafar",
+    "Smith", "Johnson", "Brown", "Williams", "Jones", "Miller", "Davis", "Wilson", "Taylor", "Clark",
+)
+
+STUDENT_COLUMNS = ("student_id", "name", "department", "email", "is_active", "created_at", "updated_at")
+ACTIVITY_COLUMNS = ("student_id", "activity_type", "description", "timestamp")
+
+
+# =============================================================================
+# GENERATORS
+# =============================================================================
+
+def generate_students(rng: random.Random, count: int, start_index: int, anchor: datetime, history_days: int) -> Iterator[tuple]:
+    """Yield student rows; enrolment grows towards the anchor date"""
+    departments = [d for d, _, _ in DEPARTMENTS]
+    codes = {d: c for d, c, _ in DEPARTMENTS}
+    weights = [w for _, _, w in DEPARTMENTS]
+    for index in range(start_index, start_index + count):
+        department = rng.choices(departments, weights)[0]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # random() ** 1.5 skews offsets towards 0, i.e. more recent onboardings
+        created_at = anchor - timedelta(days=history_days * rng.random() ** 1.5, seconds=rng.randrange(86400))
+        updated_at = created_at + timedelta(days=rng.random() * (anchor - created_at).days)
+        yield (
+            f"{codes[department]}{created_at.year}{index:07d}",
+            f"{first} {last}",
+            department,
+            f"{first}.{last}.{index}@smit.edu.pk".lower(),
+            rng.random() < 0.88,
+            created_at,
+            updated_at,
+        )
+
+
+def generate_activity_logs(rng: random.Random, count: int, student_ids: List[str], anchor: datetime,
+                           history_days: int, batch_size: int) -> Iterator[List[tuple]]:
+    """Yield batches of activity rows.
+
+    A few students generate most of the traffic (power-law pick over the roster)
+    and event times decay exponentially away from the anchor, so "last 7 days"
+    windows hold a realistic fraction of the log.
+    """
+    types = [t for t, _ in ACTIVITY_TYPES]
+    weights = [w for _, w in ACTIVITY_TYPES]
+    roster = len(student_ids)
+    history_seconds = history_days * 86400
+    mean_age = history_seconds / 8
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        picked_types = rng.choices(types, weights, k=size)
+        batch = []
+        for activity_type in picked_types:
+            age = min(rng.expovariate(1 / mean_age), history_seconds)
+            batch.append((
+                student_ids[int(roster * rng.random() ** 2.5)],
+                activity_type,
+                ACTIVITY_DESCRIPTIONS[activity_type],
+                anchor - timedelta(seconds=age),
+            ))
+        remaining -= size
+        yield batch
+
+
+def _batched(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# =============================================================================
+# BULK LOADERS
+# =============================================================================
+
+def _format_sqlite(row: tuple) -> tuple:
+    # Match SQLAlchemy's SQLite DateTime storage format so ORM queries compare correctly
+    return tuple(v.strftime("%Y-%m-%d %H:%M:%S.%f") if isinstance(v, datetime) else v for v in row)
+
+
+class BulkLoader:
+    """Fast insert path for the target dialect"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+
+    def __enter__(self):
+        self.raw = self.engine.raw_connection()
+        self.cursor = self.raw.cursor()
+        if self.dialect == "sqlite":
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=OFF")
+            self.cursor.execute("PRAGMA cache_size=-200000")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.raw.commit()
+        else:
+            self.raw.rollback()
+        self.cursor.close()
+        self.raw.close()
+
+    def insert(self, table: str, columns: Sequence[str], rows: List[tuple]):
+        if self.dialect == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(v.isoformat(sep=" ") if isinstance(v, datetime) else v for v in row)
+            buffer.seek(0)
+            self.cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        elif self.dialect == "sqlite":
+            placeholders = ", ".join("?" for _ in columns)
+            self.cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                [_format_sqlite(row) for row in rows],
+            )
+        else:
+            from sqlalchemy import insert
+            from app.models.models import Base
+            with self.engine.begin() as conn:
+                conn.execute(insert(Base.metadata.tables[table]), [dict(zip(columns, row)) for row in rows])
+            return
+        self.raw.commit()
+
+
+# =============================================================================
+# ENTRY POINTS
+# =============================================================================
+
+def seed(database_url: str, students: int, activity_logs: int, seed: int = 42, anchor: Optional[datetime] = None,
+         history_days: int = 730, batch_size: int = 50_000, reset: bool = False, verbose: bool = True) -> dict:
+    """Populate `database_url` and return a summary of what was written"""
+    os.environ["DATABASE-URI"] = database_url
+    from sqlalchemy import create_engine, func, select
+    from app.models.models import Base, Student
+    from app.utils.pydentic_model import get_pkt_time
+
+    engine = create_engine(database_url)
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    anchor = anchor or get_pkt_time().replace(tzinfo=None)
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        start_index = conn.execute(select(func.coalesce(func.max(Student.id), 0))).scalar_one()
+
+    started = time.perf_counter()
+    student_ids: List[str] = []
+    with BulkLoader(engine) as loader:
+        for batch in _batched(generate_students(rng, students, start_index, anchor, history_days), batch_size):
+            student_ids.extend(row[0] for row in batch)
+            loader.insert("students", STUDENT_COLUMNS, batch)
+        student_time = time.perf_counter() - started
+        if verbose:
+            print(f"students: {students:,} rows in {student_time:.1f}s")
+
+        written = 0
+        if student_ids:
+            for batch in generate_activity_logs(rng, activity_logs, student_ids, anchor, history_days, batch_size):
+                loader.insert("activity_logs", ACTIVITY_COLUMNS, batch)
+                written += len(batch)
+                if verbose and written % (batch_size * 20) == 0:
+                    print(f"activity_logs: {written:,}/{activity_logs:,}")
+    total_time = time.perf_counter() - started
+    if verbose:
+        print(f"activity_logs: {written:,} rows in {total_time - student_time:.1f}s")
+    engine.dispose()
+    return {
+        "database_url": database_url,
+        "students": students,
+        "activity_logs": written,
+        "seed": seed,
+        "anchor": anchor.isoformat(),
+        "seconds": round(total_time, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate a synthetic campus dataset")
+    parser.add_argument("--database-url", required=True, help="Target database, e.g. sqlite:///./bench.db")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--activity-logs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=datetime.fromisoformat,
+                        help="Fixed 'now' for generated timestamps (ISO format); defaults to current PKT time")
+    parser.add_argument("--history-days", type=int, default=730, help="How far back generated data goes")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate the tables first")
+    args = parser.parse_args()
+
+    seed(
+        args.database_url,
+        students=args.students,
+        activity_logs=args.activity_logs,
+        seed=args.seed,
+        anchor=args.anchor,
+        history_days=args.history_days,
+        batch_size=args.batch_size,
+        reset=args.reset,
+    )
+
+
+if __name__ == "__main__":
+    main()
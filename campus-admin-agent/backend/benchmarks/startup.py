@@ -0,0 +1,108 @@
+"""Cold-start profile of the API: what importing and building the app costs.
+
+Each run starts a fresh interpreter with `python -X importtime`, imports
+`app.main` and calls `create_app()`, then reports the wall time, the slowest
+imports (cumulative and self time) and any heavy module that was loaded
+although it should only load on first use.
+
+Run from the backend directory:
+    python -m benchmarks.startup --runs 5 --top 15
+    python -m benchmarks.startup --budget 1.0   # exit 1 if the median exceeds 1s
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that must not load while the app starts (see APP_WARMUP in app/main.py)
+LAZY_MODULES = ("agents", "openai", "langchain_community", "app.agent.agent", "app.api.runs")
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+from app.main import create_app
+create_app()
+elapsed = time.perf_counter() - started
+print(json.dumps({{"startup_s": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of `-X importtime` output as {module, self_ms, cumulative_ms}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": module.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+def measure_once() -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {
+            **os.environ,
+            "DATABASE-URI": f"sqlite:///{Path(workdir) / 'startup.db'}",
+            "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "startup-probe"),
+        }
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def measure(runs: int = 3) -> Dict[str, Any]:
+    """Median cold start over `runs` fresh interpreters, with the import profile of the last one"""
+    samples = [measure_once() for _ in range(runs)]
+    return {
+        "runs": runs,
+        "median_s": round(statistics.median(s["startup_s"] for s in samples), 4),
+        "max_s": round(max(s["startup_s"] for s in samples), 4),
+        "loaded": sorted({m for s in samples for m in s["loaded"]}),
+        "imports": samples[-1]["imports"],
+    }
+
+
+def print_report(report: Dict[str, Any], top: int):
+    print(f"cold start: median {report['median_s'] * 1000:.1f} ms, max {report['max_s'] * 1000:.1f} ms "
+          f"over {report['runs']} runs")
+    print(f"lazy modules loaded at startup: {', '.join(report['loaded']) or 'none'}")
+    for key, title in (("cumulative_ms", "cumulative"), ("self_ms", "self")):
+        print(f"\nslowest imports ({title}):")
+        for row in sorted(report["imports"], key=lambda r: r[key], reverse=True)[:top]:
+            print(f"  {row[key]:9.1f} ms  {row['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API cold start")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Imports to list")
+    parser.add_argument("--budget", type=float, help="Fail if the median startup exceeds this many seconds")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    print_report(report, args.top)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.budget is not None and (report["median_s"] > args.budget or report["loaded"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
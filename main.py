@@ -1,24 +1,21 @@
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from agents import Runner
+"""Run the Campus Admin Agent API from the repository root.
 
-from pydantic import BaseModel
-from backend.agent import handoff_agent, student_management_agent, campus_analytics_agent   # if you actually have backend/agent.py
-from openai.types.responses import ResponseTextDeltaEvent
+    uvicorn main:app
+    python main.py
 
-app = FastAPI()
+The application lives in campus-admin-agent/backend (package `app`).
+"""
+import os
+import sys
 
-# Example CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "campus-admin-agent", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
-# /chat: Normal chat (async/await)
-class ChatRequest(BaseModel):
-    query: str
+from app.main import app, create_app  # noqa: E402,F401
 
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "8000")))